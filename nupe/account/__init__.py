@@ -0,0 +1 @@
+default_app_config = "nupe.account.apps.AccountConfig"
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class AccountConfig(AppConfig):
     name = "nupe.account"
+
+    def ready(self):
+        import nupe.account.schema  # noqa
+        import nupe.account.signals.authentication  # noqa
+        import nupe.account.signals.permissions  # noqa
@@ -0,0 +1,235 @@
+import hashlib
+import logging
+import pickle  # nosec
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from oauth2_provider.contrib.rest_framework import OAuth2Authentication
+from oauth2_provider.models import AccessToken
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "oauth2:token"
+
+
+def get_token_key(token: str) -> str:
+    """
+    Retorna:
+        str: hash do token, o token não é armazenado no cache
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def get_bearer_token(request):
+    """
+    Retorna:
+        str: token do cabeçalho 'Authorization: Bearer <token>', ou None
+    """
+    scheme, _, token = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+
+    return token.strip()
+
+
+class TokenCache:
+    """
+    Cache dos tokens de acesso validados, em memória (LRU) em cada processo e, com TOKEN_CACHE_SHARED, também
+    no cache compartilhado entre os processos (CACHES). Cada token é mantido no máximo por TOKEN_CACHE_TIMEOUT
+    segundos e nunca depois da sua expiração (ACCESS_TOKEN_EXPIRE_SECONDS)
+
+    O token é armazenado serializado (pickle) junto com a conta e a pessoa, e cada requisição recebe uma nova
+    cópia dos objetos, então alterações em um objeto (como o cache de permissões) não passam para outra
+    requisição
+
+    Atributos:
+        hits: quantidade de tokens encontrados em memória
+
+        shared_hits: quantidade de tokens encontrados no cache compartilhado
+
+        misses: quantidade de tokens consultados no banco de dados
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        """
+        Retorna:
+            AccessToken: token com a conta (user) e a pessoa carregadas, ou None caso não esteja em cache
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None and entry[0] <= monotonic():
+                del self.entries[key]
+                entry = None
+
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+
+        content = entry and entry[2]
+
+        if content is None and settings.TOKEN_CACHE_SHARED:
+            content = cache.get(f"{CACHE_PREFIX}:{key}")
+
+            if content is not None:
+                with self.lock:
+                    self.shared_hits += 1
+
+        if content is None:
+            with self.lock:
+                self.misses += 1
+
+        self.log_stats()
+
+        if content is None:
+            return None
+
+        access_token = pickle.loads(content)  # nosec
+
+        if entry is None:
+            self.set_local(key, access_token, content)
+
+        return access_token
+
+    def set(self, key: str, access_token: AccessToken):
+        content = pickle.dumps(access_token)
+
+        self.set_local(key, access_token, content)
+
+        if settings.TOKEN_CACHE_SHARED:
+            cache.set(f"{CACHE_PREFIX}:{key}", content, timeout=self.get_timeout(access_token))
+
+    def set_local(self, key: str, access_token: AccessToken, content: bytes):
+        timeout = min(self.get_timeout(access_token), settings.TOKEN_CACHE_TIMEOUT)
+
+        if timeout <= 0:
+            return
+
+        with self.lock:
+            self.entries[key] = (monotonic() + timeout, access_token.user_id, content)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > settings.TOKEN_CACHE_MAX_SIZE:
+                self.entries.popitem(last=False)
+
+    def get_timeout(self, access_token: AccessToken) -> float:
+        """
+        Retorna:
+            float: segundos até a expiração do token
+        """
+        return (access_token.expires - timezone.now()).total_seconds()
+
+    def invalidate_tokens(self, tokens: list):
+        """
+        Remove os tokens do cache, como na revogação ou alteração de um token
+
+        Argumentos:
+            tokens (list): tokens de acesso
+        """
+        keys = [get_token_key(token) for token in tokens]
+
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+        if settings.TOKEN_CACHE_SHARED:
+            cache.delete_many([f"{CACHE_PREFIX}:{key}" for key in keys])
+
+    def invalidate_accounts(self, accounts_ids: list):
+        """
+        Remove do cache os tokens das contas, que possuem uma cópia desatualizada da conta e da pessoa
+
+        Argumentos:
+            accounts_ids (list): identificadores das contas
+        """
+        accounts_ids = set(accounts_ids)
+
+        if not accounts_ids:
+            return
+
+        with self.lock:
+            for key, entry in list(self.entries.items()):
+                if entry[1] in accounts_ids:
+                    del self.entries[key]
+
+        if settings.TOKEN_CACHE_SHARED:
+            tokens = AccessToken.objects.filter(user_id__in=accounts_ids).values_list("token", flat=True)
+            cache.delete_many([f"{CACHE_PREFIX}:{get_token_key(token)}" for token in tokens])
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def get_stats(self) -> dict:
+        """
+        Retorna:
+            dict: quantidade de tokens em memória, acertos, falhas e a taxa de acerto do processo
+        """
+        with self.lock:
+            hits = self.hits + self.shared_hits
+            total = hits + self.misses
+
+            return {
+                "size": len(self.entries),
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / total if total else 0.0,
+            }
+
+    def log_stats(self):
+        """
+        Registra no log a taxa de acerto a cada TOKEN_CACHE_STATS_INTERVAL consultas
+        """
+        interval = settings.TOKEN_CACHE_STATS_INTERVAL
+
+        if interval and (self.hits + self.shared_hits + self.misses) % interval == 0:
+            logger.info("Cache de tokens: %s", self.get_stats())
+
+
+token_cache = TokenCache()
+
+
+class CachedOAuth2Authentication(OAuth2Authentication):
+    """
+    Autenticação pelo token de acesso (OAuth2) que mantém em cache os tokens validados com a conta e a pessoa
+    (Account.person), então uma requisição com o token em cache é autenticada sem consultas ao banco de dados
+
+    Os tokens revogados ou alterados e os tokens das contas ou pessoas alteradas são removidos do cache pelos
+    signals (nupe.account.signals.authentication). Com vários processos, um token revogado continua válido nos
+    outros processos por no máximo TOKEN_CACHE_TIMEOUT segundos
+
+    Os tokens inválidos, sem conta (client credentials) ou fora do cabeçalho 'Authorization' são verificados
+    pela OAuth2Authentication, que informa o erro na resposta
+    """
+
+    def authenticate(self, request):
+        token = get_bearer_token(request)
+
+        if token is None:
+            return super().authenticate(request)
+
+        key = get_token_key(token)
+        access_token = token_cache.get(key)
+
+        if access_token is None:
+            access_token = AccessToken.objects.select_related("user__person").filter(token=token).first()
+
+            if access_token is None or access_token.user is None or not access_token.is_valid():
+                return super().authenticate(request)
+
+            token_cache.set(key, access_token)
+
+        return access_token.user, access_token
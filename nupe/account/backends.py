@@ -0,0 +1,88 @@
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from nupe.core.utils.cache import is_shared_cache
+
+CACHE_PREFIX = "permissions"
+
+# versão das permissões de todas as contas, alterada quando as permissões de um grupo mudam
+GLOBAL_VERSION_KEY = f"{CACHE_PREFIX}:version"
+
+
+def get_account_version_key(account_id: int) -> str:
+    return f"{CACHE_PREFIX}:version:{account_id}"
+
+
+def get_permissions_key(user_obj) -> str:
+    """
+    Obtém a chave das permissões da conta, composta pela versão global, pela versão da conta e pelo status da
+    conta (is_superuser, is_active), que altera as permissões retornadas pelo ModelBackend. As versões são
+    lidas em uma única consulta ao cache e são aleatórias, então uma versão removida do cache não reutiliza as
+    permissões de uma versão anterior
+
+    Retorna:
+        str: chave das permissões da conta no cache
+    """
+    account_id = user_obj.pk
+    keys = [GLOBAL_VERSION_KEY, get_account_version_key(account_id)]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid4().hex, timeout=None)
+            versions[key] = cache.get(key)
+
+    status = f"{int(user_obj.is_superuser)}{int(user_obj.is_active)}"
+
+    return f"{CACHE_PREFIX}:{versions[keys[0]]}:{versions[keys[1]]}:{account_id}:{status}"
+
+
+def invalidate_permissions(accounts_ids: list = None):
+    """
+    Invalida as permissões em cache, alterando a versão das contas informadas ou a versão global
+
+    Argumentos:
+        accounts_ids (list): identificadores das contas, ou None para invalidar as permissões de todas as contas
+    """
+    if accounts_ids is None:
+        cache.set(GLOBAL_VERSION_KEY, uuid4().hex, timeout=None)
+    else:
+        cache.set_many({get_account_version_key(account_id): uuid4().hex for account_id in accounts_ids}, timeout=None)
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    Mantém em cache as permissões (do usuário e dos grupos) de cada conta, verificadas em todas as requisições
+    pela DjangoActionPermissions com o 'perms_map_action' das views. Uma conta com as permissões em cache é
+    autorizada sem consultas ao banco de dados
+
+    As permissões são invalidadas pelos signals (nupe.account.signals.permissions) quando as permissões ou os
+    grupos da conta mudam, quando a conta é salva, ou quando as permissões de um grupo mudam. O status da conta
+    (is_active, is_superuser) também faz parte da chave do cache
+
+    As permissões só são mantidas em cache com um cache compartilhado entre os processos (CACHES), já que os
+    signals invalidam somente o cache em que são executados. Com o cache em memória (locmem), as permissões são
+    consultadas no banco de dados a cada requisição, como no ModelBackend
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+
+        if not is_shared_cache():
+            return super().get_all_permissions(user_obj, obj)
+
+        if not hasattr(user_obj, "_perm_cache"):
+            key = get_permissions_key(user_obj)
+            permissions = cache.get(key)
+
+            if permissions is None:
+                permissions = super().get_all_permissions(user_obj)
+                cache.set(key, permissions, timeout=settings.PERMISSIONS_CACHE_TIMEOUT)
+
+            user_obj._perm_cache = permissions
+
+        return user_obj._perm_cache
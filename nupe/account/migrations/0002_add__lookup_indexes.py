@@ -0,0 +1,15 @@
+from django.db import migrations
+
+from nupe.core.utils.indexes import TrigramIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("account", "0001_add__account"),
+    ]
+
+    operations = [
+        # search_fields da view (icontains)
+        TrigramIndex(model_name="account", field_name="email", name="account_account_email_trgm_idx"),
+    ]
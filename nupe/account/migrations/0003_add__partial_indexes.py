@@ -0,0 +1,66 @@
+# Generated by Django 2.2.28 on 2026-10-18 15:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("account", "0002_add__lookup_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="account",
+            name="function",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="workers",
+                related_query_name="worker",
+                to="core.Function",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="account",
+            name="local_job",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="workers",
+                related_query_name="worker",
+                to="core.Campus",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="account",
+            name="sector",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="workers",
+                related_query_name="worker",
+                to="core.Sector",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="account",
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True), fields=["local_job"], name="account_local_job_live_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="account",
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True), fields=["function"], name="account_function_live_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="account",
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True), fields=["sector"], name="account_sector_live_idx"
+            ),
+        ),
+    ]
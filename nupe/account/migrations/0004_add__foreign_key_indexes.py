@@ -0,0 +1,45 @@
+# Generated by Django 2.2.28 on 2026-10-18 16:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("account", "0003_add__partial_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="account",
+            name="function",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="workers",
+                related_query_name="worker",
+                to="core.Function",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="account",
+            name="local_job",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="workers",
+                related_query_name="worker",
+                to="core.Campus",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="account",
+            name="sector",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="workers",
+                related_query_name="worker",
+                to="core.Sector",
+            ),
+        ),
+    ]
@@ -3,6 +3,8 @@ from django.contrib.auth.models import PermissionsMixin
 from django.db import models
 from safedelete.models import SOFT_DELETE_CASCADE, SafeDeleteManager, SafeDeleteModel
 
+from nupe.core.utils.indexes import live_index
+
 
 class AccountManager(BaseUserManager, SafeDeleteManager):
     use_in_migrations = True
@@ -94,6 +96,13 @@ class Account(AbstractBaseUser, PermissionsMixin, SafeDeleteModel):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["person", "function", "sector"]
 
+    class Meta:
+        indexes = [
+            live_index("local_job", name="account_local_job_live_idx"),
+            live_index("function", name="account_function_live_idx"),
+            live_index("sector", name="account_sector_live_idx"),
+        ]
+
     def __str__(self):
         return self.email
 
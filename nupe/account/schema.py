@@ -0,0 +1,11 @@
+from drf_spectacular.contrib.django_oauth_toolkit import DjangoOAuthToolkitScheme
+
+
+class CachedOAuth2AuthenticationScheme(DjangoOAuthToolkitScheme):
+    """
+    Esquema de segurança 'oauth2' do schema OpenAPI (drf-spectacular) para a CachedOAuth2Authentication, o mesmo
+    da OAuth2Authentication do django-oauth-toolkit. O drf-spectacular não aplica as extensões às subclasses, e a
+    extensão é registrada ao importar o módulo
+    """
+
+    target_class = "nupe.account.authentication.CachedOAuth2Authentication"
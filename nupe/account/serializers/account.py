@@ -2,6 +2,7 @@ from rest_framework.serializers import CharField, ModelSerializer
 
 from nupe.account.models import Account
 from nupe.core.serializers.person import PersonDetailSerializer
+from nupe.core.utils.values import ValuesSerializer, campus_name, full_name
 
 
 class AccountSerializer(ModelSerializer):
@@ -90,6 +91,26 @@ class AccountListSerializer(ModelSerializer):
         fields = ["id", "full_name", "email", "local_job"]
 
 
+class AccountListValuesSerializer(ValuesSerializer):
+    """
+    Versão somente leitura do AccountListSerializer para as listagens, com o mesmo resultado
+    """
+
+    fields = {
+        "id": "id",
+        "full_name": full_name("person__"),
+        "email": "email",
+        "local_job": "local_job__name",
+    }
+    extra_fields = ["local_job__institution__name"]
+
+    def to_representation(self, row: dict) -> dict:
+        data = super().to_representation(row)
+        data["local_job"] = campus_name(row["local_job__institution__name"], row["local_job__name"])
+
+        return data
+
+
 class CurrentAccountSerializer(ModelSerializer):
     """
     Retorna informações sobre o usuário logado atual
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+from oauth2_provider.models import AccessToken
+
+from nupe.account.authentication import token_cache
+from nupe.account.models import Account
+from nupe.core.models import Person
+
+
+def invalidate_cached_token(sender, instance, **kwargs):
+    """
+    Quando um token é revogado (removido) ou alterado, o token é removido do cache
+    """
+    token_cache.invalidate_tokens([instance.token])
+
+
+def invalidate_cached_account_tokens(sender, instance, **kwargs):
+    """
+    Quando uma conta é salva ou removida (incluindo a remoção do safedelete), os tokens da conta são removidos
+    do cache, para que a conta desativada ou alterada não seja utilizada na autenticação
+    """
+    token_cache.invalidate_accounts([instance.pk])
+
+
+def invalidate_cached_person_tokens(sender, instance, **kwargs):
+    """
+    A pessoa é carregada junto com a conta, então os tokens da conta da pessoa também são removidos do cache
+    """
+    token_cache.invalidate_accounts(Account.objects.filter(person=instance).values_list("pk", flat=True))
+
+
+post_save.connect(invalidate_cached_token, sender=AccessToken, dispatch_uid="access_token_cache_post_save")
+post_delete.connect(invalidate_cached_token, sender=AccessToken, dispatch_uid="access_token_cache_post_delete")
+post_save.connect(invalidate_cached_account_tokens, sender=Account, dispatch_uid="account_tokens_post_save")
+post_delete.connect(invalidate_cached_account_tokens, sender=Account, dispatch_uid="account_tokens_post_delete")
+post_save.connect(invalidate_cached_person_tokens, sender=Person, dispatch_uid="person_tokens_post_save")
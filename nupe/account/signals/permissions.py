@@ -0,0 +1,70 @@
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from nupe.account.backends import invalidate_permissions
+from nupe.account.models import Account
+
+M2M_CHANGES = ["post_add", "post_remove", "post_clear"]
+
+
+def invalidate_account_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Quando os grupos ou as permissões de uma conta mudam, invalida as permissões em cache da conta. Pelo lado
+    inverso (group.user_set, permission.user_set), invalida as contas alteradas, ou todas as contas quando a
+    relação é limpa ('clear' não informa as contas)
+    """
+    if action not in M2M_CHANGES:
+        return
+
+    if not reverse:
+        invalidate_permissions([instance.pk])
+    elif pk_set:
+        invalidate_permissions(list(pk_set))
+    elif action == "post_clear":
+        invalidate_permissions()
+
+
+def invalidate_saved_account_permissions(sender, instance, **kwargs):
+    """
+    Invalida as permissões em cache a cada vez que a conta é salva, já que o status da conta (is_superuser,
+    is_active) altera as permissões. Uma nova conta também não reutiliza as permissões em cache de uma conta
+    removida com o mesmo identificador
+    """
+    invalidate_permissions([instance.pk])
+
+
+def invalidate_group_permissions(sender, action, **kwargs):
+    """
+    Quando as permissões de um grupo mudam, invalida as permissões em cache de todas as contas
+    """
+    if action in M2M_CHANGES:
+        invalidate_permissions()
+
+
+def invalidate_all_permissions(sender, **kwargs):
+    """
+    A remoção de um grupo ou de uma permissão remove as relações sem enviar o signal m2m_changed
+    """
+    invalidate_permissions()
+
+
+m2m_changed.connect(
+    invalidate_account_permissions, sender=Account.groups.through, dispatch_uid="account_groups_permissions"
+)
+m2m_changed.connect(
+    invalidate_account_permissions,
+    sender=Account.user_permissions.through,
+    dispatch_uid="account_user_permissions_permissions",
+)
+post_save.connect(invalidate_saved_account_permissions, sender=Account, dispatch_uid="account_permissions_post_save")
+m2m_changed.connect(
+    invalidate_group_permissions, sender=Group.permissions.through, dispatch_uid="group_permissions_permissions"
+)
+
+for model in [Group, Permission]:
+    post_delete.connect(
+        invalidate_all_permissions, sender=model, dispatch_uid=f"{model._meta.model_name}_permissions_post_delete"
+    )
+
+# o codename de uma permissão pode ser alterado
+post_save.connect(invalidate_all_permissions, sender=Permission, dispatch_uid="permission_permissions_post_save")
@@ -9,12 +9,15 @@ from nupe.account.models import Account
 from nupe.account.serializers.account import (
     AccountDetailSerializer,
     AccountListSerializer,
+    AccountListValuesSerializer,
     AccountSerializer,
     CurrentAccountSerializer,
 )
+from nupe.core.utils.pagination import PageNumberKeysetPagination
+from nupe.core.utils.values import ValuesListMixin
 
 
-class AccountViewSet(ModelViewSet):
+class AccountViewSet(ValuesListMixin, ModelViewSet):
     """
     list: retorna todas as contas do banco de dados. RF.SIS.005, RF.SIS.006, RF.SIS.007, RF.SIS.008
 
@@ -35,6 +38,7 @@ class AccountViewSet(ModelViewSet):
     search_fields = ["email", "person__first_name", "person__last_name"]  # RF.SIS.008
     ordering_fields = ["email", "person__first_name", "person__last_name"]  # RF.SIS.007
     ordering = ["person__first_name", "person__last_name"]
+    pagination_class = PageNumberKeysetPagination  # ?pagination=cursor
 
     http_method_names = ["get", "post", "patch", "delete"]
 
@@ -52,6 +56,7 @@ class AccountViewSet(ModelViewSet):
         "create": AccountSerializer,
         "partial_update": AccountSerializer,
     }
+    per_action_values_serializer = {"list": AccountListValuesSerializer}
 
     def get_serializer_class(self):
         return self.per_action_serializer.get(self.action)
@@ -5,4 +5,9 @@ class CoreConfig(AppConfig):
     name = "nupe.core"
 
     def ready(self):
+        import nupe.core.signals.attendance  # noqa
+        import nupe.core.signals.cache  # noqa
+        import nupe.core.signals.database  # noqa
         import nupe.core.signals.institution  # noqa
+        import nupe.core.signals.person  # noqa
+        import nupe.core.signals.reason  # noqa
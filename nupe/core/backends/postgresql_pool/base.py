@@ -0,0 +1,102 @@
+import os
+from threading import Lock
+
+from django.db.backends.postgresql.base import Database
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgreSQLDatabaseWrapper
+
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+_pools = {}
+_pools_lock = Lock()
+
+
+def get_pool(conn_params: dict, size: int) -> ThreadedConnectionPool:
+    """
+    Obtém o pool de conexões do processo para os parâmetros de conexão, criado somente no primeiro uso. Os
+    processos criados pelo gunicorn (fork) não compartilham as conexões do processo principal
+
+    Argumentos:
+        conn_params (dict): parâmetros de conexão do psycopg2
+
+        size (int): quantidade máxima de conexões abertas do pool
+
+    Retorna:
+        ThreadedConnectionPool: pool de conexões compartilhado entre as threads do processo
+    """
+    key = (os.getpid(), tuple(sorted((name, str(value)) for name, value in conn_params.items())))
+
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ThreadedConnectionPool(1, size, **conn_params)
+
+        return _pools[key]
+
+
+class DatabaseWrapper(PostgreSQLDatabaseWrapper):
+    """
+    Backend do PostgreSQL que reutiliza as conexões de um pool do processo (DB_POOL_SIZE), ao invés de abrir
+    uma conexão por thread. Com CONN_MAX_AGE igual a 0, a conexão volta para o pool ao final de cada
+    requisição e pode ser utilizada por outra thread (gunicorn com '--threads')
+
+    Uma conexão do pool é verificada antes do uso com DB_CONN_HEALTH_CHECKS, e as conexões com erro são
+    descartadas. Quando todas as conexões estão em uso, a requisição recebe um erro, então DB_POOL_SIZE deve
+    ser maior ou igual à quantidade de threads de cada worker
+
+    Exemplo:
+        DB_POOL_SIZE=8 gunicorn nupe.wsgi --workers 4 --threads 8
+    """
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(conn_params, self.settings_dict["POOL_SIZE"])
+
+        # cada conexão descartada abre uma nova conexão, até a quantidade máxima do pool
+        for _ in range(self.settings_dict["POOL_SIZE"] + 1):
+            try:
+                connection = pool.getconn()
+            except PoolError as error:
+                raise Database.OperationalError(f"Nenhuma conexão disponível no pool: {error}") from error
+
+            if not self.settings_dict["CONN_HEALTH_CHECKS"] or self.is_connection_usable(connection):
+                break
+
+            pool.putconn(connection, close=True)
+        else:
+            raise Database.OperationalError("Nenhuma conexão do pool respondeu à verificação")
+
+        options = self.settings_dict["OPTIONS"]
+        self.isolation_level = options.get("isolation_level", connection.isolation_level)
+
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+
+        return connection
+
+    def is_connection_usable(self, connection) -> bool:
+        """
+        Verifica a conexão com 'SELECT 1'. Uma conexão nova do psycopg2 não está em autocommit, então a consulta
+        abre uma transação, desfeita logo em seguida: com a transação em aberto, o 'set_session' e o
+        'set_autocommit' do Django não podem ser executados
+        """
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+
+            if not connection.autocommit:
+                connection.rollback()
+        except Database.Error:
+            return False
+        else:
+            return True
+
+    def _close(self):
+        """
+        Devolve a conexão para o pool ao invés de fechar. O pool desfaz a transação em aberto, e as conexões
+        fechadas ou com erro são descartadas
+        """
+        if self.connection is None:
+            return
+
+        pool = get_pool(self.get_connection_params(), self.settings_dict["POOL_SIZE"])
+
+        with self.wrap_database_errors:
+            pool.putconn(self.connection, close=bool(self.connection.closed) or self.errors_occurred)
@@ -1,4 +1,4 @@
-from nupe.core.filters.attendance import AttendanceFilter
+from nupe.core.filters.attendance import AttendanceFilter, AttendanceStatisticFilter
 from nupe.core.filters.course import AcademicEducationFilter, GradeFilter
 from nupe.core.filters.institution import CampusFilter, InstitutionFilter
 from nupe.core.filters.location import CityFilter, LocationFilter, StateFilter
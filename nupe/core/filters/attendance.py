@@ -1,6 +1,7 @@
-from django_filters import CharFilter, FilterSet
+from django_filters import CharFilter, DateFilter, FilterSet, NumberFilter
 
-from nupe.core.models import Attendance
+from nupe.core.models import Attendance, AttendanceReason, AttendanceStatistic
+from nupe.core.utils.tree import subtree_filter
 
 
 class AttendanceFilter(FilterSet):
@@ -26,6 +27,8 @@ class AttendanceFilter(FilterSet):
         severity: igual ao char fornecido
 
         status: igual ao char fornecido
+
+        attendance_reason_ancestor: motivo com o id fornecido ou qualquer um dos seus descendentes
     """
 
     student_name = CharFilter(field_name="student__person__first_name", lookup_expr="iexact")
@@ -33,6 +36,7 @@ class AttendanceFilter(FilterSet):
     attendant_name = CharFilter(field_name="attendants__person__first_name", lookup_expr="iexact")
     attendant_last_name = CharFilter(field_name="attendants__person__last_name", lookup_expr="iexact")
     severity = CharFilter(field_name="attendance_severity")
+    attendance_reason_ancestor = NumberFilter(method="get_attendance_reason_subtree")
 
     class Meta:
         model = Attendance
@@ -45,4 +49,42 @@ class AttendanceFilter(FilterSet):
             "attendant_last_name",
             "status",
             "severity",
+            "attendance_reason_ancestor",
         ]
+
+    def get_attendance_reason_subtree(self, queryset, name, value):
+        # os motivos da subárvore são buscados em uma subconsulta, então o índice de 'attendance_reason' dos
+        # atendimentos é utilizado ao invés de comparar o caminho de cada atendimento
+        attendance_reasons = AttendanceReason.objects.filter(subtree_filter(value)).values("pk")
+
+        return queryset.filter(attendance_reason__in=attendance_reasons)
+
+
+class AttendanceStatisticFilter(FilterSet):
+    """
+    Filtros para se utilizar nas requisições da action 'stats' do endpoint de Attendance
+
+    Exemplo:
+        /api/v1/attendance/stats?campus=1&month_after=2020-01-01
+
+    Parâmetros:
+        campus: igual ao id fornecido
+
+        attendance_reason: igual ao id fornecido
+
+        severity: igual ao char fornecido
+
+        status: igual ao char fornecido
+
+        month_after: mês igual ou posterior a data fornecida
+
+        month_before: mês igual ou anterior a data fornecida
+    """
+
+    severity = CharFilter(field_name="attendance_severity")
+    month_after = DateFilter(field_name="month", lookup_expr="gte")
+    month_before = DateFilter(field_name="month", lookup_expr="lte")
+
+    class Meta:
+        model = AttendanceStatistic
+        fields = ["campus", "attendance_reason", "severity", "status", "month_after", "month_before"]
@@ -1,6 +1,7 @@
 from django_filters import FilterSet, NumberFilter
 
 from nupe.core.models import AttendanceReason
+from nupe.core.utils.tree import subtree_filter
 
 
 class AttendanceReasonFilter(FilterSet):
@@ -16,13 +17,19 @@ class AttendanceReasonFilter(FilterSet):
 
     Parâmetros:
         father_reason: igual ao id fornecido
+
+        ancestor: motivo com o id fornecido e todos os seus descendentes, em qualquer nível
     """
 
     father_reason = NumberFilter(method="get_sons")
+    ancestor = NumberFilter(method="get_subtree")
 
     class Meta:
         model = AttendanceReason
-        fields = ["father_reason"]
+        fields = ["father_reason", "ancestor"]
 
     def get_sons(self, queryset, name, value):
         return AttendanceReason.objects.filter(father_reason=value)
+
+    def get_subtree(self, queryset, name, value):
+        return AttendanceReason.objects.filter(subtree_filter(value))
@@ -0,0 +1,133 @@
+from datetime import date
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from model_bakery import baker
+
+from nupe.core.models import AcademicEducationCampus, Person, Student
+
+
+class Command(BaseCommand):
+    """
+    Mede o tempo e a quantidade de consultas ao remover e restaurar um objeto da model AcademicEducationCampus
+    com muitos estudantes, comparando os signals atuais (uma consulta 'UPDATE' para todos os estudantes) com a
+    atualização de cada estudante individualmente. Os objetos são criados dentro de uma transação que é
+    desfeita ao final, então o banco de dados não é alterado
+
+    Exemplo:
+        ./manage.py benchmark_academic_education_campus_signals --students 100000
+    """
+
+    help = "Mede o tempo dos signals de remoção e restauração de uma formação acadêmica no campus"
+
+    BATCH_SIZE = 5000
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=100000, help="quantidade de estudantes criados")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            academic_education_campus = self.create_students(quantity=options["students"])
+
+            results = {
+                "por estudante": self.measure(academic_education_campus, self.delete_per_student),
+                "em conjunto": self.measure(academic_education_campus, self.delete_with_signals),
+            }
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{connection.vendor}, {options['students']} estudantes")
+        self.stdout.write(
+            f"{'estratégia':<20}{'remoção (ms)':>15}{'consultas':>12}{'restauração (ms)':>20}{'consultas':>12}"
+        )
+
+        for name, (delete, undelete) in results.items():
+            self.stdout.write(f"{name:<20}{delete[0]:>15.2f}{delete[1]:>12}{undelete[0]:>20.2f}{undelete[1]:>12}")
+
+    def create_students(self, quantity: int) -> AcademicEducationCampus:
+        academic_education_campus = baker.make(AcademicEducationCampus)
+
+        for start in range(0, quantity, self.BATCH_SIZE):
+            indexes = range(start, min(start + self.BATCH_SIZE, quantity))
+            persons = Person.objects.bulk_create(
+                [
+                    Person(
+                        first_name="Estudante",
+                        last_name=str(index),
+                        cpf=f"{index:011d}",
+                        birthday_date=date(2000, 1, 1),
+                        gender="M",
+                    )
+                    for index in indexes
+                ]
+            )
+
+            # nem todos os bancos de dados retornam os identificadores no 'bulk_create' (como o SQLite)
+            persons_ids = Person.objects.filter(cpf__in=[person.cpf for person in persons]).values_list(
+                "id", flat=True
+            )
+
+            Student.objects.bulk_create(
+                [
+                    Student(
+                        registration=str(person_id),
+                        person_id=person_id,
+                        academic_education_campus=academic_education_campus,
+                        ingress_date=date(2020, 1, 1),
+                    )
+                    for person_id in persons_ids
+                ]
+            )
+
+        return academic_education_campus
+
+    def measure(self, academic_education_campus: AcademicEducationCampus, strategy) -> tuple:
+        """
+        Remove e restaura o objeto com a estratégia informada
+
+        Retorna:
+            tuple: tempo em milissegundos e quantidade de consultas da remoção e da restauração
+        """
+        results = []
+
+        for step in strategy(academic_education_campus):
+            # contador ao invés do CaptureQueriesContext, que armazena no máximo 9000 consultas
+            queries = []
+
+            def count_query(execute, sql, params, many, context):
+                queries.append(sql)
+
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count_query):
+                start = perf_counter()
+                step()
+                duration = (perf_counter() - start) * 1000
+
+            results.append((duration, len(queries)))
+
+        return tuple(results)
+
+    def delete_with_signals(self, academic_education_campus: AcademicEducationCampus) -> list:
+        return [academic_education_campus.delete, academic_education_campus.undelete]
+
+    def delete_per_student(self, academic_education_campus: AcademicEducationCampus) -> list:
+        """
+        Estratégia anterior dos signals, que carrega e salva cada estudante
+        """
+
+        def delete():
+            for student in Student.objects.filter(academic_education_campus=academic_education_campus):
+                student._academic_education_campus_deleted_id = academic_education_campus.id
+                student.academic_education_campus = None
+                student.save(force_update=True)
+
+        def undelete():
+            for student in Student.objects.filter(academic_education_campus__isnull=True):
+                if student._academic_education_campus_deleted_id == academic_education_campus.id:
+                    student.academic_education_campus = academic_education_campus
+                    student._academic_education_campus_deleted_id = None
+                    student.save(force_update=True)
+
+        return [delete, undelete]
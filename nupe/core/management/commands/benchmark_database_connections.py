@@ -0,0 +1,203 @@
+from datetime import date, timedelta
+from threading import Lock, Thread
+from time import perf_counter
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+from oauth2_provider.models import AccessToken, Application
+from safedelete.config import HARD_DELETE
+
+from nupe.account.models import Account
+from nupe.core.models import Function, Person, Sector, Student
+
+POOL_ENGINE = "nupe.core.backends.postgresql_pool"
+
+
+class Command(BaseCommand):
+    """
+    Mede as requisições por segundo da listagem de estudantes (/api/v1/student/) com cada configuração das
+    conexões com o banco de dados: uma conexão por requisição (CONN_MAX_AGE=0), conexões persistentes, e
+    conexões persistentes com verificação (DB_CONN_HEALTH_CHECKS). Com o pool configurado (DB_POOL_SIZE), mede o
+    pool com e sem verificação
+
+    As requisições passam pelo WSGIHandler em várias threads, como um worker do gunicorn com '--threads', e os
+    signals de início e fim das requisições abrem, fecham ou devolvem as conexões como em produção. A conta, o
+    token e os estudantes são criados antes da medição e removidos ao final
+
+    Exemplo:
+        ./manage.py benchmark_database_connections --requests 2000 --threads 8
+
+        DB_POOL_SIZE=8 ./manage.py benchmark_database_connections --requests 2000 --threads 8
+    """
+
+    help = "Mede as requisições por segundo com conexões por requisição, persistentes e com pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000, help="quantidade de requisições de cada medição")
+        parser.add_argument("--threads", type=int, default=4, help="quantidade de threads simultâneas")
+        parser.add_argument("--students", type=int, default=100, help="quantidade de estudantes criados")
+
+    def handle(self, *args, **options):
+        database = connections.databases[DEFAULT_DB_ALIAS]
+        original = {key: database.get(key) for key in ["CONN_MAX_AGE", "CONN_HEALTH_CHECKS"]}
+
+        if database["ENGINE"] == POOL_ENGINE:
+            modes = {
+                f"pool ({database['POOL_SIZE']} conexões)": (0, False),
+                "pool com verificação": (0, True),
+            }
+        else:
+            modes = {
+                "por requisição": (0, False),
+                "persistente": (None, False),
+                "persistente com verificação": (None, True),
+            }
+
+        self.opened = 0
+        self.lock = Lock()
+        connection_created.connect(self.count_connection, dispatch_uid="benchmark_database_connections")
+
+        token, persons_ids = self.create_data(options["students"])
+        results = {}
+
+        try:
+            for name, (max_age, health_checks) in modes.items():
+                database.update(CONN_MAX_AGE=max_age, CONN_HEALTH_CHECKS=health_checks)
+
+                with override_settings(DB_CONN_HEALTH_CHECKS=health_checks):
+                    results[name] = self.measure(token, options["requests"], options["threads"])
+        finally:
+            database.update(original)
+            connection_created.disconnect(dispatch_uid="benchmark_database_connections")
+            self.delete_data(token, persons_ids)
+
+        self.stdout.write(
+            f"{connections[DEFAULT_DB_ALIAS].vendor}, {options['requests']} requisições, {options['threads']} threads"
+        )
+        self.stdout.write(f"{'conexões':<35}{'requisições/s':>15}{'conexões abertas':>20}")
+
+        for name, (requests_per_second, opened) in results.items():
+            self.stdout.write(f"{name:<35}{requests_per_second:>15.1f}{opened:>20}")
+
+    def count_connection(self, **kwargs):
+        with self.lock:
+            self.opened += 1
+
+    def measure(self, token: str, quantity: int, threads: int) -> tuple:
+        """
+        Retorna:
+            tuple: requisições por segundo e quantidade de conexões abertas
+        """
+        handler = WSGIHandler()
+        environ = RequestFactory().get(reverse("student-list"), HTTP_AUTHORIZATION=f"Bearer {token}").environ
+        environ["HTTP_HOST"] = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS[0] != "*" else "localhost"
+        errors = []
+
+        def start_response(status, headers, exc_info=None):
+            if not status.startswith("200"):
+                errors.append(status)
+
+        def worker(quantity: int):
+            for _ in range(quantity):
+                response = handler(dict(environ), start_response)
+                b"".join(response)
+                # envia o signal request_finished, que fecha ou devolve a conexão
+                response.close()
+
+            # a thread termina, então as conexões persistentes também são fechadas
+            connections.close_all()
+
+        self.opened = 0
+        workers = [
+            Thread(target=worker, args=(quantity // threads + (index < quantity % threads),))
+            for index in range(threads)
+        ]
+
+        start = perf_counter()
+
+        for thread in workers:
+            thread.start()
+
+        for thread in workers:
+            thread.join()
+
+        duration = perf_counter() - start
+
+        if errors:
+            raise CommandError(f"{len(errors)} requisições falharam, a primeira com o status {errors[0]}")
+
+        return quantity / duration, self.opened
+
+    def create_data(self, quantity: int) -> tuple:
+        """
+        Retorna:
+            tuple: token de acesso da conta com permissão para listar os estudantes e os identificadores das
+            pessoas criadas
+        """
+        suffix = uuid4().hex[:8]
+        persons = Person.objects.bulk_create(
+            [
+                Person(
+                    first_name="Estudante",
+                    last_name=str(index),
+                    cpf=f"9{suffix[:2]}{index:08d}",
+                    birthday_date=date(2000, 1, 1),
+                    gender="M",
+                )
+                for index in range(quantity + 1)
+            ]
+        )
+        persons_ids = list(
+            Person.objects.filter(cpf__in=[person.cpf for person in persons]).values_list("id", flat=True)
+        )
+
+        Student.objects.bulk_create(
+            [
+                Student(registration=f"9{suffix[:2]}{person_id}", person_id=person_id, ingress_date=date(2020, 1, 1))
+                for person_id in persons_ids[1:]
+            ]
+        )
+
+        account = Account.objects.create_user(
+            email=f"benchmark-{suffix}@nupe.example",
+            password=uuid4().hex,
+            person_id=persons_ids[0],
+            function=baker.make(Function),
+            sector=baker.make(Sector),
+        )
+        account.user_permissions.add(Permission.objects.get(content_type__app_label="core", codename="view_student"))
+
+        access_token = AccessToken.objects.create(
+            user=account,
+            token=uuid4().hex,
+            application=Application.objects.create(
+                name=f"benchmark-{suffix}",
+                client_type=Application.CLIENT_CONFIDENTIAL,
+                authorization_grant_type=Application.GRANT_PASSWORD,
+            ),
+            expires=timezone.now() + timedelta(hours=1),
+            scope="read write",
+        )
+
+        return access_token.token, persons_ids
+
+    def delete_data(self, token: str, persons_ids: list):
+        access_token = AccessToken.objects.select_related("user", "application").get(token=token)
+        account, application = access_token.user, access_token.application
+
+        access_token.delete()
+        application.delete()
+        Student.all_objects.filter(person_id__in=persons_ids).delete(force_policy=HARD_DELETE)
+        Account.objects.filter(pk=account.pk).delete(force_policy=HARD_DELETE)
+        Function.all_objects.filter(pk=account.function_id).delete(force_policy=HARD_DELETE)
+        Sector.all_objects.filter(pk=account.sector_id).delete(force_policy=HARD_DELETE)
+        Person.all_objects.filter(pk__in=persons_ids).delete(force_policy=HARD_DELETE)
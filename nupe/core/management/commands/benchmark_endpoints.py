@@ -0,0 +1,101 @@
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from model_bakery import baker
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APIClient
+
+from nupe.account.models import Account
+from nupe.core.utils.benchmark import (
+    BASELINE_PATH,
+    compare_query_counts,
+    compare_with_baseline,
+    load_baseline,
+    measure_endpoints,
+    save_baseline,
+    seed_data,
+)
+
+
+class Command(BaseCommand):
+    """
+    Mede a quantidade de consultas, as latências p50 e p95 e o tamanho da resposta de todas as actions de
+    leitura das viewsets registradas nos routers (core, account e file), com os dados do comando 'populate'
+    e 'scale' conjuntos de objetos relacionados. As actions são medidas primeiro com páginas de um objeto, e
+    depois com o dobro de objetos e páginas completas: uma action em que a quantidade de consultas aumenta possui
+    consultas N+1
+
+    Com '--check' o comando falha quando há consultas N+1, quando a quantidade de consultas é maior que a da
+    baseline (nupe/resources/datas/core/endpoints_baseline.json) ou quando a latência p95 é maior que a da
+    baseline multiplicada por '--latency-tolerance'. A latência depende da máquina, então a baseline deve ser
+    atualizada com '--update-baseline' na mesma máquina em que o comando é verificado
+
+    Os objetos são criados dentro de uma transação que é desfeita ao final, então o banco de dados não é
+    alterado
+
+    Exemplo:
+        ./manage.py benchmark_endpoints --scale 100 --repeat 20
+
+        ./manage.py benchmark_endpoints --check --latency-tolerance 1.5
+    """
+
+    help = "Mede as consultas, a latência e o tamanho da resposta de todas as actions de leitura"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=int, default=50, help="quantidade de conjuntos de objetos criados")
+        parser.add_argument("--repeat", type=int, default=20, help="quantidade de requisições de cada medição")
+        parser.add_argument("--check", action="store_true", help="falha caso alguma action piore")
+        parser.add_argument(
+            "--latency-tolerance", type=float, default=None, help="multiplicador máximo da latência p95 da baseline"
+        )
+        parser.add_argument("--update-baseline", action="store_true", help="armazena as medições como baseline")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            # superusuário, as permissões não geram consultas
+            account = baker.make(Account, is_superuser=True)
+            client = APIClient(HTTP_HOST=self.get_host())
+            client.force_authenticate(user=account)
+
+            seed_data(options["scale"], account=account)
+
+            with patch.object(PageNumberPagination, "page_size", 1):
+                results = measure_endpoints(client, repeat=1)
+
+            seed_data(options["scale"], account=account)
+            scaled_results = measure_endpoints(client, repeat=options["repeat"])
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{options['scale'] * 2} conjuntos de objetos, {options['repeat']} requisições")
+        self.stdout.write(f"{'endpoint':<35}{'status':>8}{'consultas':>11}{'p50 (ms)':>11}{'p95 (ms)':>11}{'KiB':>9}")
+
+        for name, result in scaled_results.items():
+            self.stdout.write(
+                f"{name:<35}{result['status']:>8}{result['queries']:>11}{result['p50']:>11.2f}"
+                f"{result['p95']:>11.2f}{result['size'] / 1024:>9.1f}"
+            )
+
+        if options["update_baseline"]:
+            save_baseline(BASELINE_PATH, scaled_results)
+            self.stdout.write(self.style.SUCCESS(f"Baseline atualizada: {BASELINE_PATH}"))
+
+        if options["check"]:
+            errors = compare_query_counts(results, scaled_results)
+            errors += compare_with_baseline(scaled_results, load_baseline(BASELINE_PATH), options["latency_tolerance"])
+
+            if errors:
+                raise CommandError("\n".join(errors))
+
+            self.stdout.write(self.style.SUCCESS("Nenhuma action piorou"))
+
+    def get_host(self) -> str:
+        """
+        Retorna:
+            str: primeiro host permitido (ALLOWED_HOSTS), as requisições para outros hosts são recusadas
+        """
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "*"
+
+        return "localhost" if host == "*" else host.lstrip(".")
@@ -0,0 +1,100 @@
+from io import BytesIO
+from statistics import median
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from model_bakery import baker
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from nupe.core.models import AccountAttendance, Attendance, Responsible
+from nupe.core.serializers.attendance import AttendanceReportSerializer
+from nupe.core.utils.parsers import ORJSONParser
+from nupe.core.utils.queries import prefetch_attendance_report
+from nupe.core.utils.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    """
+    Mede o tempo para renderizar e interpretar o json do relatório de atendimentos (AttendanceReportSerializer)
+    com o JSONRenderer/JSONParser do DRF e com o ORJSONRenderer/ORJSONParser, e verifica se os dois renderers
+    geram os mesmos bytes. Os atendimentos são criados dentro de uma transação que é desfeita ao final, então o
+    banco de dados não é alterado
+
+    Exemplo:
+        ./manage.py benchmark_json_renderers --attendances 1000 --repeat 20
+    """
+
+    help = "Mede o tempo do JSONRenderer e do ORJSONRenderer com o relatório de atendimentos"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--attendances", type=int, default=500, help="quantidade de atendimentos criados")
+        parser.add_argument("--repeat", type=int, default=10, help="quantidade de execuções de cada medição")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.create_attendances(quantity=options["attendances"])
+            queryset = prefetch_attendance_report(Attendance.objects.all())
+            data = AttendanceReportSerializer(instance=queryset, many=True).data
+
+            transaction.set_rollback(True)
+
+        content = JSONRenderer().render(data)
+        repeat = options["repeat"]
+
+        results = {
+            "renderização": (
+                self.measure(lambda: JSONRenderer().render(data), repeat),
+                self.measure(lambda: ORJSONRenderer().render(data), repeat),
+            ),
+            "interpretação": (
+                self.measure(lambda: JSONParser().parse(BytesIO(content)), repeat),
+                self.measure(lambda: ORJSONParser().parse(BytesIO(content)), repeat),
+            ),
+        }
+
+        self.stdout.write(
+            f"{options['attendances']} atendimentos, {len(content) / 1024:.0f} KiB (mediana de {repeat})"
+        )
+        self.stdout.write(f"{'etapa':<20}{'DRF (ms)':>15}{'orjson (ms)':>15}{'ganho':>10}")
+
+        for name, (drf, fast) in results.items():
+            self.stdout.write(f"{name:<20}{drf:>15.2f}{fast:>15.2f}{drf / fast:>9.1f}x")
+
+        self.stdout.write(f"mesmos bytes: {'sim' if ORJSONRenderer().render(data) == content else 'não'}")
+
+    def create_attendances(self, quantity: int):
+        """
+        Cria os atendimentos com todas as relações percorridas pelo serializer do relatório preenchidas. As
+        relações que não dependem do estudante são compartilhadas, evitando valores aleatórios repetidos nos
+        campos únicos (como a sigla do estado)
+        """
+        academic_education_campus = baker.make("core.AcademicEducationCampus")
+        account = baker.make("account.Account", _fill_optional=True)
+        attendance_reason = baker.make("core.AttendanceReason")
+
+        for _ in range(quantity):
+            student = baker.make(
+                "core.Student",
+                person=baker.make("core.Person", profile_image=None),
+                academic_education_campus=academic_education_campus,
+            )
+            baker.make(Responsible, student=student)
+
+            attendance = baker.make(Attendance, student=student, attendance_reason=attendance_reason)
+            baker.make(AccountAttendance, attendance=attendance, account=account)
+
+    def measure(self, function, repeat: int) -> float:
+        """
+        Retorna:
+            float: mediana do tempo de execução em milissegundos
+        """
+        durations = []
+
+        for _ in range(repeat):
+            start = perf_counter()
+            function()
+            durations.append((perf_counter() - start) * 1000)
+
+        return median(durations)
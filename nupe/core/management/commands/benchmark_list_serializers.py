@@ -0,0 +1,159 @@
+from datetime import date
+from statistics import median
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from model_bakery import baker
+from rest_framework.renderers import JSONRenderer
+
+from nupe.account.models import Account
+from nupe.account.serializers.account import AccountListSerializer, AccountListValuesSerializer
+from nupe.core.models import AccountAttendance, Attendance, Person, Student
+from nupe.core.serializers.attendance import AttendanceListSerializer, AttendanceListValuesSerializer
+from nupe.core.serializers.person import PersonListSerializer, PersonListValuesSerializer
+from nupe.core.serializers.student import StudentListSerializer, StudentListValuesSerializer
+from nupe.core.utils.queries import prefetch_account_list, prefetch_attendance_list, prefetch_student_list
+
+NAME_ORDERING = ["first_name", "last_name", "id"]
+
+
+class Command(BaseCommand):
+    """
+    Mede o tempo das listagens de pessoas, estudantes, contas e atendimentos com o ModelSerializer (com o plano
+    de consulta da view) e com o ValuesSerializer ('.values()'), incluindo as consultas, e verifica se os dois
+    geram o mesmo json. Os objetos são criados dentro de uma transação que é desfeita ao final, então o banco de
+    dados não é alterado
+
+    Exemplo:
+        ./manage.py benchmark_list_serializers --rows 10000 --repeat 5
+    """
+
+    help = "Mede o tempo das listagens com o ModelSerializer e com o ValuesSerializer"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000, help="quantidade de objetos de cada listagem")
+        parser.add_argument("--repeat", type=int, default=5, help="quantidade de execuções de cada medição")
+
+    def handle(self, *args, **options):
+        listings = {
+            "pessoas": (Person.objects.order_by(*NAME_ORDERING), PersonListSerializer, PersonListValuesSerializer()),
+            "estudantes": (
+                prefetch_student_list(Student.objects.order_by(*[f"person__{field}" for field in NAME_ORDERING])),
+                StudentListSerializer,
+                StudentListValuesSerializer(),
+            ),
+            "contas": (
+                prefetch_account_list(Account.objects.order_by(*[f"person__{field}" for field in NAME_ORDERING])),
+                AccountListSerializer,
+                AccountListValuesSerializer(),
+            ),
+            "atendimentos": (
+                prefetch_attendance_list(Attendance.objects.order_by("attendance_severity", "id")),
+                AttendanceListSerializer,
+                AttendanceListValuesSerializer(),
+            ),
+        }
+        repeat = options["repeat"]
+        results = {}
+
+        with transaction.atomic():
+            self.create_data(quantity=options["rows"])
+
+            for name, (queryset, serializer_class, values_serializer) in listings.items():
+                model_data = serializer_class(instance=queryset.all(), many=True).data
+                values_data = values_serializer.serialize(values_serializer.get_queryset(queryset.all()))
+
+                results[name] = (
+                    self.measure(lambda: serializer_class(instance=queryset.all(), many=True).data, repeat),
+                    self.measure(
+                        lambda: values_serializer.serialize(values_serializer.get_queryset(queryset.all())), repeat
+                    ),
+                    len(model_data),
+                    JSONRenderer().render(model_data) == JSONRenderer().render(values_data),
+                )
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"mediana de {repeat} execuções, com as consultas")
+        self.stdout.write(
+            f"{'listagem':<15}{'linhas':>8}{'model (ms)':>15}{'values (ms)':>15}{'ganho':>10}  mesmo json"
+        )
+
+        for name, (model, values, rows, same) in results.items():
+            same = "sim" if same else "não"
+            self.stdout.write(f"{name:<15}{rows:>8}{model:>15.1f}{values:>15.1f}{model / values:>9.1f}x  {same}")
+
+    def create_data(self, quantity: int):
+        """
+        Cria as pessoas, os estudantes, as contas (com local de trabalho) e os atendimentos com um atendente
+        cada, com 'bulk_create' para que a criação não domine o tempo do comando
+        """
+        Person.objects.bulk_create(
+            [
+                Person(
+                    first_name=f"Pessoa {index % 100}",
+                    last_name=str(index),
+                    cpf=f"8{index:010d}",
+                    birthday_date=date(2000, 1, 1),
+                    gender="M" if index % 2 else "F",
+                    contact=None if index % 3 else "49999999999",
+                )
+                for index in range(quantity * 2)
+            ]
+        )
+        persons_ids = list(Person.objects.filter(cpf__startswith="8").order_by("cpf").values_list("id", flat=True))
+
+        Student.objects.bulk_create(
+            [
+                Student(registration=f"8{person_id}", person_id=person_id, ingress_date=date(2020, 1, 1))
+                for person_id in persons_ids[:quantity]
+            ]
+        )
+
+        account = baker.make(Account, _fill_optional=["local_job"])
+        Account.objects.bulk_create(
+            [
+                Account(
+                    email=f"benchmark-{person_id}@nupe.example",
+                    person_id=person_id,
+                    local_job_id=account.local_job_id if person_id % 2 else None,
+                    function_id=account.function_id,
+                    sector_id=account.sector_id,
+                )
+                for person_id in persons_ids[quantity:]
+            ]
+        )
+
+        attendance_reason = baker.make("core.AttendanceReason")
+        students_ids = Student.objects.filter(registration__startswith="8").values_list("id", flat=True)
+        Attendance.objects.bulk_create(
+            [
+                Attendance(
+                    student_id=student_id,
+                    attendance_reason=attendance_reason,
+                    attendance_severity=Attendance.ATTENDANCE_SEVERITY_CHOICES[student_id % 4][0],
+                )
+                for student_id in students_ids
+            ]
+        )
+        AccountAttendance.objects.bulk_create(
+            [
+                AccountAttendance(attendance_id=attendance_id, account=account)
+                for attendance_id in Attendance.objects.values_list("id", flat=True)
+            ]
+        )
+
+    def measure(self, function, repeat: int) -> float:
+        """
+        Retorna:
+            float: mediana do tempo de execução em milissegundos
+        """
+        durations = []
+
+        for _ in range(repeat):
+            start = perf_counter()
+            function()
+            durations.append((perf_counter() - start) * 1000)
+
+        return median(durations)
@@ -0,0 +1,112 @@
+import random
+from datetime import date
+from importlib import import_module
+from statistics import median
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from nupe.core.models import Person
+
+LOOKUP_INDEXES_MIGRATION = "nupe.core.migrations.0010_add__lookup_indexes"
+
+FIRST_NAMES = ["Luis", "Maria", "Ana", "João", "Pedro", "Julia", "Carlos", "Fernanda", "Lucas", "Beatriz"]
+LAST_NAMES = ["Guerreiro", "Silva", "Souza", "Oliveira", "Pereira", "Costa", "Rodrigues", "Almeida", "Lima"]
+
+
+class Command(BaseCommand):
+    """
+    Mede o tempo dos filtros 'iexact' e da busca ('icontains' do 'search_fields') de pessoas com e sem os
+    índices criados pela migration 0010_add__lookup_indexes. As pessoas são criadas e os índices são removidos
+    dentro de uma transação que é desfeita ao final, então o banco de dados não é alterado
+
+    Exemplo:
+        ./manage.py benchmark_lookup_indexes --persons 500000
+    """
+
+    help = "Mede o tempo dos filtros de pessoas com e sem os índices de busca"
+
+    BATCH_SIZE = 5000
+
+    def add_arguments(self, parser):
+        parser.add_argument("--persons", type=int, default=500000, help="quantidade de pessoas criadas")
+        parser.add_argument("--repeat", type=int, default=5, help="quantidade de execuções de cada consulta")
+        parser.add_argument("--seed", type=int, default=0, help="semente dos dados aleatórios")
+
+    def handle(self, *args, **options):
+        generator = random.Random(options["seed"])
+
+        with transaction.atomic():
+            self.create_persons(generator, quantity=options["persons"])
+            target = Person.objects.order_by("?").first()
+            queries = self.get_queries(target)
+
+            with_indexes = self.measure(queries, repeat=options["repeat"])
+            self.drop_person_indexes()
+            without_indexes = self.measure(queries, repeat=options["repeat"])
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{connection.vendor}, {options['persons']} pessoas (mediana de {options['repeat']})")
+        self.stdout.write(f"{'consulta':<30}{'sem índices (ms)':>20}{'com índices (ms)':>20}")
+
+        for name in queries:
+            self.stdout.write(f"{name:<30}{without_indexes[name]:>20.2f}{with_indexes[name]:>20.2f}")
+
+    def create_persons(self, generator: random.Random, quantity: int):
+        for start in range(0, quantity, self.BATCH_SIZE):
+            persons = [
+                Person(
+                    # sufixo numérico para que cada nome corresponda a uma pequena parte das pessoas
+                    first_name=f"{generator.choice(FIRST_NAMES)}{generator.randint(0, 999)}",
+                    last_name=f"{generator.choice(LAST_NAMES)}{generator.randint(0, 9999)}",
+                    cpf=f"{index:011d}",
+                    birthday_date=date(2000, 1, 1),
+                    gender=generator.choice(["M", "F"]),
+                )
+                for index in range(start, min(start + self.BATCH_SIZE, quantity))
+            ]
+            Person.objects.bulk_create(persons)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(Person._meta.db_table)}")
+
+    def get_queries(self, target: Person) -> dict:
+        fragment = target.last_name[-6:].lower()
+
+        return {
+            "first_name iexact": Person.objects.filter(first_name__iexact=target.first_name.upper()),
+            "last_name iexact": Person.objects.filter(last_name__iexact=target.last_name.lower()),
+            "search icontains": Person.objects.filter(
+                Q(first_name__icontains=fragment) | Q(last_name__icontains=fragment)
+            ),
+        }
+
+    def measure(self, queries: dict, repeat: int) -> dict:
+        """
+        Retorna:
+            dict: mediana do tempo de cada consulta em milissegundos
+        """
+        timings = {}
+
+        for name, queryset in queries.items():
+            durations = []
+
+            for _ in range(repeat):
+                start = perf_counter()
+                queryset.count()
+                durations.append((perf_counter() - start) * 1000)
+
+            timings[name] = median(durations)
+
+        return timings
+
+    def drop_person_indexes(self):
+        operations = import_module(LOOKUP_INDEXES_MIGRATION).Migration.operations
+
+        with connection.cursor() as cursor:
+            for operation in operations:
+                if operation.model_name == "person":
+                    cursor.execute(f"DROP INDEX IF EXISTS {connection.ops.quote_name(operation.name)}")
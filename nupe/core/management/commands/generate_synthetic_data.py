@@ -0,0 +1,426 @@
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from io import StringIO
+from math import ceil
+from random import Random
+from time import perf_counter
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+
+from nupe.account.models import Account
+from nupe.core.models import (
+    AcademicEducationCampus,
+    AccountAttendance,
+    Attendance,
+    AttendanceReason,
+    AttendanceStatistic,
+    Function,
+    Person,
+    Responsible,
+    Sector,
+    Student,
+)
+from nupe.core.utils.search import build_person_search_document
+from nupe.resources.datas.core.synthetic import (
+    attendance_reason_themes,
+    female_first_names,
+    group_annotations,
+    last_names,
+    male_first_names,
+    private_annotations,
+    public_annotations,
+)
+
+ATTENDANCES_PER_STUDENT = 4
+STUDENTS_PER_ATTENDANT = 250
+# filhos de cada motivo raiz e netos de cada filho
+REASON_TREE_WIDTHS = (4, 3)
+
+# cada semente possui uma faixa própria de cpfs, matrículas e e-mails, então sementes diferentes podem ser
+# geradas no mesmo banco de dados
+MAX_SEEDS = 100
+MAX_PERSONS_PER_SEED = 10 ** 7
+# coprimo de 10^9, embaralha os números base dos cpfs sem repeti-los
+CPF_MULTIPLIER = 387420489
+# números base com um único dígito repetido, que geram cpfs inválidos (ex.: 000.000.000-00). Cada faixa de uma
+# semente possui no máximo um desses números
+INVALID_CPF_NUMBERS = {digit * 111111111 for digit in range(10)}
+# objetos inseridos por comando, limitado pela quantidade máxima de parâmetros de cada banco de dados
+BATCH_SIZE = 1000
+
+STATUS_WEIGHTS = {
+    Attendance.OPEN: 15,
+    Attendance.ON_HOLD: 10,
+    Attendance.IN_PROGRESS: 15,
+    Attendance.CLOSED: 60,
+}
+SEVERITY_WEIGHTS = {Attendance.LOW: 40, Attendance.MEDIUM: 30, Attendance.HIGH: 20, Attendance.SERIOUS: 10}
+
+
+def generate_cpf(number: int) -> str:
+    """
+    Calcula os dígitos verificadores de um número base
+
+    Argumentos:
+        number (int): número base do cpf, com até nove dígitos
+
+    Retorna:
+        str: cpf válido com somente números
+    """
+    digits = [int(digit) for digit in f"{number:09d}"]
+
+    for length in (9, 10):
+        total = sum(digit * weight for digit, weight in zip(digits, range(length + 1, 1, -1)))
+        digits.append(total * 10 % 11 % 10)
+
+    return "".join(str(digit) for digit in digits)
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """
+    Desabilita o 'auto_now_add' dos campos, para que as datas geradas sejam mantidas
+    """
+    for field in fields:
+        field.auto_now_add = False
+
+    try:
+        yield
+
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    """
+    Gera uma grande quantidade de dados sintéticos e consistentes para testes de carga: pessoas com cpfs
+    válidos, estudantes nas formações acadêmicas dos campi, responsáveis dos estudantes menores de idade,
+    atendentes, árvores de motivos de atendimento e atendimentos com as anotações dos atendentes
+
+    A estrutura (campi, formações acadêmicas, funções e setores) é a do comando 'populate'. Os objetos são
+    gerados e inseridos com 'bulk_create' em blocos de '--chunk-size' estudantes, então a memória utilizada
+    não depende da escala. A mesma semente ('--seed') e o mesmo tamanho de bloco geram os mesmos dados, e
+    sementes diferentes podem ser geradas no mesmo banco de dados
+
+    O 'bulk_create' não dispara signals, então o documento de busca das pessoas é preenchido na criação, o
+    caminho dos motivos de atendimento é recalculado após a criação das árvores e os contadores pré-agregados
+    dos atendimentos (AttendanceStatistic) são recalculados ao final
+
+    Exemplo:
+        ./manage.py generate_synthetic_data --attendances 1000000 --seed 1
+
+    Raises:
+        CommandError: caso os parâmetros sejam inválidos ou os dados da semente já existam
+    """
+
+    help = "Gera dados sintéticos em grande quantidade para testes de carga"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--attendances", type=int, default=100000, help="quantidade de atendimentos")
+        parser.add_argument("--seed", type=int, default=0, help=f"semente dos dados, de 0 a {MAX_SEEDS - 1}")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="estudantes gerados e inseridos por vez")
+        parser.add_argument("--reasons", type=int, default=10, help="quantidade de motivos de atendimento raízes")
+
+    def handle(self, *args, **options):
+        self.seed = options["seed"]
+        self.chunk_size = options["chunk_size"]
+        self.random = Random(self.seed)
+        # as datas são relativas ao início do dia, então a mesma semente gera os mesmos dados durante o dia
+        self.today = date.today()
+        self.now = datetime.combine(self.today, datetime.min.time())
+        self.persons = 0
+        self.cpf_index = self.seed * MAX_PERSONS_PER_SEED
+
+        attendances = options["attendances"]
+        students = ceil(attendances / ATTENDANCES_PER_STUDENT)
+        attendants = max(ceil(students / STUDENTS_PER_ATTENDANT), 1)
+
+        self.validate(options, students * 2 + attendants)
+
+        if self.seed_exists():
+            raise CommandError(f"Os dados da semente {self.seed} já existem. Utilize outra semente (--seed)")
+
+        start = perf_counter()
+
+        with transaction.atomic():
+            call_command("populate", stdout=StringIO())
+
+            self.reasons = self.create_attendance_reasons(options["reasons"])
+            self.accounts = self.create_attendants(attendants)
+            self.academic_education_campi = list(
+                AcademicEducationCampus.objects.order_by("pk").values_list("pk", flat=True)
+            )
+
+            with explicit_dates(
+                Attendance._meta.get_field("opened_at"), AccountAttendance._meta.get_field("attendance_at")
+            ):
+                for first in range(0, students, self.chunk_size):
+                    last = min(first + self.chunk_size, students)
+                    self.create_students(range(first, last), students, attendances)
+                    self.stdout.write(f"{last}/{students} estudantes")
+
+            AttendanceStatistic.objects.rebuild()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{self.persons} pessoas, {students} estudantes, {attendants} atendentes, {len(self.reasons)} "
+                f"motivos e {attendances} atendimentos gerados em {perf_counter() - start:.1f} s"
+            )
+        )
+
+    def validate(self, options: dict, persons: int):
+        """
+        Argumentos:
+            persons (int): quantidade máxima de pessoas: estudantes, um responsável por estudante e atendentes
+
+        Raises:
+            CommandError: caso algum parâmetro seja inválido
+        """
+        if not 0 <= self.seed < MAX_SEEDS:
+            raise CommandError(f"A semente deve estar entre 0 e {MAX_SEEDS - 1}")
+
+        if options["attendances"] < 1 or self.chunk_size < 1 or options["reasons"] < 1:
+            raise CommandError("A quantidade de atendimentos, de motivos e o tamanho do bloco devem ser positivos")
+
+        # um número base da faixa pode ser pulado (next_cpf)
+        if persons > MAX_PERSONS_PER_SEED - 1:
+            raise CommandError(f"A escala excede a faixa de {MAX_PERSONS_PER_SEED - 1} pessoas da semente")
+
+    def seed_exists(self) -> bool:
+        """
+        Verifica se os dados da semente já existem pelos primeiros objetos gerados com campos únicos, incluindo os
+        objetos mascarados. Os dados de cada semente são gerados em uma única transação, então existem por
+        completo ou não existem
+
+        Retorna:
+            bool: se os dados da semente já foram gerados
+        """
+        return (
+            AttendanceReason.all_objects.filter(name=self.get_reason_name(0)).exists()
+            or Account.all_objects.filter(email=self.get_attendant_email(0)).exists()
+            or Student.all_objects.filter(registration=self.get_registration(0)).exists()
+        )
+
+    def get_reason_name(self, index: int) -> str:
+        return f"{attendance_reason_themes[index % len(attendance_reason_themes)]} {self.seed}-{index + 1}"
+
+    def get_attendant_email(self, index: int) -> str:
+        return f"atendente.{self.seed}.{index}@nupe.example"
+
+    def get_registration(self, index: int) -> str:
+        return f"9{self.seed:02d}{index:08d}"
+
+    def bulk_create(self, model, objects: list) -> list:
+        """
+        Cria os objetos em lotes de até BATCH_SIZE objetos. Os bancos de dados que não retornam as chaves
+        primárias do 'bulk_create' (SQLite) as geram em ordem crescente, e o comando é executado dentro de uma
+        transação, então as chaves são buscadas pela ordem
+
+        Retorna:
+            list: chaves primárias na ordem dos objetos
+        """
+        manager = model._base_manager
+        batch_size = min(BATCH_SIZE, connection.ops.bulk_batch_size(model._meta.concrete_fields, objects))
+
+        if connection.features.can_return_ids_from_bulk_insert:
+            manager.bulk_create(objects, batch_size=batch_size)
+
+            return [instance.pk for instance in objects]
+
+        last_pk = manager.aggregate(last_pk=Max("pk"))["last_pk"] or 0
+        manager.bulk_create(objects, batch_size=batch_size)
+
+        return list(manager.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True))
+
+    def create_attendance_reasons(self, quantity: int) -> list:
+        """
+        Cria 'quantity' árvores de motivos de atendimento, um nível por vez
+
+        Retorna:
+            list: chaves primárias de todos os motivos criados
+        """
+        level = [
+            AttendanceReason(name=self.get_reason_name(index), description=f"Motivo sintético da semente {self.seed}",)
+            for index in range(quantity)
+        ]
+        fathers = list(zip(self.bulk_create(AttendanceReason, level), level))
+        reasons = [pk for pk, _ in fathers]
+
+        for width in REASON_TREE_WIDTHS:
+            level = [
+                AttendanceReason(
+                    name=f"{father.name}.{index + 1}", description=father.description, father_reason_id=father_pk
+                )
+                for father_pk, father in fathers
+                for index in range(width)
+            ]
+            fathers = list(zip(self.bulk_create(AttendanceReason, level), level))
+            reasons += [pk for pk, _ in fathers]
+
+        AttendanceReason.objects.rebuild_paths()
+
+        return reasons
+
+    def create_attendants(self, quantity: int) -> list:
+        """
+        Cria as contas dos atendentes, sem senha utilizável
+
+        Retorna:
+            list: chaves primárias das contas
+        """
+        campi = list(AcademicEducationCampus.objects.order_by("campus").values_list("campus", flat=True).distinct())
+        functions = list(Function.objects.order_by("pk").values_list("pk", flat=True))
+        sectors = list(Sector.objects.order_by("pk").values_list("pk", flat=True))
+
+        persons = self.create_persons([self.random.randint(25, 60) for _ in range(quantity)])
+
+        return self.bulk_create(
+            Account,
+            [
+                Account(
+                    email=self.get_attendant_email(index),
+                    person_id=person_id,
+                    local_job_id=self.random.choice(campi),
+                    function_id=self.random.choice(functions),
+                    sector_id=self.random.choice(sectors),
+                    password=make_password(None),
+                )
+                for index, person_id in enumerate(persons)
+            ],
+        )
+
+    def create_persons(self, ages: list) -> list:
+        """
+        Cria uma pessoa para cada idade, com o documento de busca preenchido
+
+        Retorna:
+            list: chaves primárias das pessoas
+        """
+        persons = []
+
+        for age in ages:
+            gender = self.random.choice(["F", "M"])
+            person = Person(
+                first_name=self.random.choice(female_first_names if gender == "F" else male_first_names),
+                last_name=f"{self.random.choice(last_names)} {self.random.choice(last_names)}",
+                cpf=self.next_cpf(),
+                birthday_date=self.today - timedelta(days=age * 365 + self.random.randint(0, 364)),
+                gender=gender,
+                contact=f"479{self.random.randint(0, 10 ** 8 - 1):08d}" if self.random.random() < 0.7 else None,
+            )
+            person.search_document = build_person_search_document(person)
+            persons.append(person)
+            self.persons += 1
+
+        return self.bulk_create(Person, persons)
+
+    def next_cpf(self) -> str:
+        """
+        Gera o cpf da próxima pessoa, embaralhando a próxima posição da faixa da semente. Os números base
+        inválidos (INVALID_CPF_NUMBERS) são pulados
+
+        Retorna:
+            str: cpf válido com somente números
+        """
+        while True:
+            number = self.cpf_index * CPF_MULTIPLIER % 10 ** 9
+            self.cpf_index += 1
+
+            if number not in INVALID_CPF_NUMBERS:
+                return generate_cpf(number)
+
+    def create_students(self, indexes: range, students: int, attendances: int):
+        """
+        Cria os estudantes do bloco, os responsáveis dos menores de idade e os atendimentos de cada estudante,
+        distribuindo os 'attendances' atendimentos igualmente entre os 'students' estudantes
+        """
+        ages = [self.random.randint(14, 30) for _ in indexes]
+        persons = self.create_persons(ages)
+
+        students_objects = []
+
+        for index, person_id, age in zip(indexes, persons, ages):
+            # ingresso a partir dos 14 anos, nos últimos 6 anos
+            ingress_days = self.random.randint(0, min(6, age - 14) * 365)
+            students_objects.append(
+                Student(
+                    registration=self.get_registration(index),
+                    person_id=person_id,
+                    academic_education_campus_id=self.random.choice(self.academic_education_campi),
+                    graduated=self.random.random() < 0.1,
+                    ingress_date=self.today - timedelta(days=ingress_days),
+                )
+            )
+
+        students_ids = self.bulk_create(Student, students_objects)
+
+        minors = [student_id for student_id, age in zip(students_ids, ages) if age < Responsible.MINIMUM_AGE]
+        responsibles = self.create_persons([self.random.randint(35, 60) for _ in minors])
+        self.bulk_create(
+            Responsible,
+            [
+                Responsible(student_id=student_id, person_id=person_id)
+                for student_id, person_id in zip(minors, responsibles)
+            ],
+        )
+
+        attendances_objects = []
+
+        for index, student_id, student in zip(indexes, students_ids, students_objects):
+            quantity = attendances // students + (1 if index < attendances % students else 0)
+            attendances_objects += [self.build_attendance(student_id, student) for _ in range(quantity)]
+
+        attendances_ids = self.bulk_create(Attendance, attendances_objects)
+        accounts_attendances = []
+
+        for attendance_id, attendance in zip(attendances_ids, attendances_objects):
+            # um atendente na maioria dos atendimentos, dois nos demais
+            quantity = min(len(self.accounts), 2 if self.random.random() < 0.2 else 1)
+            accounts_attendances += [
+                self.build_account_attendance(attendance_id, attendance, account_id)
+                for account_id in self.random.sample(self.accounts, quantity)
+            ]
+
+        self.bulk_create(AccountAttendance, accounts_attendances)
+
+    def build_attendance(self, student_id: int, student: Student) -> Attendance:
+        """
+        Atendimento aberto entre o ingresso do estudante e agora. Os atendimentos fechados possuem a data de
+        fechamento até 30 dias depois da abertura
+        """
+        ingress = datetime.combine(student.ingress_date, datetime.min.time())
+        opened_at = ingress + timedelta(seconds=self.random.randint(0, int((self.now - ingress).total_seconds())))
+        status = self.random.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()))[0]
+
+        return Attendance(
+            attendance_reason_id=self.random.choice(self.reasons),
+            attendance_severity=self.random.choices(list(SEVERITY_WEIGHTS), weights=list(SEVERITY_WEIGHTS.values()))[
+                0
+            ],
+            student_id=student_id,
+            status=status,
+            opened_at=opened_at,
+            closed_at=(
+                min(opened_at + timedelta(days=self.random.randint(0, 30)), self.now)
+                if status == Attendance.CLOSED
+                else None
+            ),
+        )
+
+    def build_account_attendance(self, attendance_id: int, attendance: Attendance, account_id: int):
+        """
+        Participação do atendente no atendimento, com as anotações preenchidas aleatoriamente
+        """
+        return AccountAttendance(
+            attendance_id=attendance_id,
+            account_id=account_id,
+            public_annotation=self.random.choice(public_annotations) if self.random.random() < 0.5 else None,
+            private_annotation=self.random.choice(private_annotations) if self.random.random() < 0.3 else None,
+            group_annotation=self.random.choice(group_annotations) if self.random.random() < 0.1 else None,
+            attendance_at=attendance.opened_at,
+        )
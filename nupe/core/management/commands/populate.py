@@ -1,5 +1,8 @@
+from collections import Counter
+
 import environ
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from django.db.utils import IntegrityError
 from model_bakery import baker
 
@@ -9,6 +12,7 @@ from nupe.core.models import (
     AcademicEducationCampus,
     Attendance,
     AttendanceReason,
+    AttendanceStatistic,
     Campus,
     City,
     Function,
@@ -20,6 +24,9 @@ from nupe.core.models import (
     State,
     Student,
 )
+from nupe.core.signals.cache import CACHED_MODELS
+from nupe.core.utils.cache import invalidate_model
+from nupe.core.utils.search import build_person_search_document
 from nupe.resources.datas.account.account import EMAIL, PASSWORD
 from nupe.resources.datas.core.populate import (
     academic_educations,
@@ -38,10 +45,35 @@ from nupe.resources.datas.core.populate import (
 env = environ.Env()
 
 
+def get_objects_by(queryset, field: str, values) -> dict:
+    """
+    Busca os objetos com uma única consulta
+
+    Argumentos:
+        queryset (QuerySet ou Manager): objetos em que a busca é feita
+
+        field (str): campo buscado, normalmente único
+
+        values (iterable): valores do campo
+
+    Retorna:
+        dict: objetos pelo valor do campo
+    """
+    return {getattr(instance, field): instance for instance in queryset.filter(**{f"{field}__in": set(values)})}
+
+
 class Command(BaseCommand):
     """
     Popula o banco de dados com informações mínimas.
 
+    Cada tabela é populada com um único 'bulk_create', ignorando os objetos que já existem (conflitos com os
+    campos únicos), e os objetos relacionados são buscados com uma consulta por tabela. O comando pode ser
+    executado novamente sem duplicar os objetos, e é executado em uma única transação
+
+    O 'bulk_create' não dispara signals, então o documento de busca das pessoas é montado antes da criação, o
+    caminho dos motivos de atendimento é recalculado, os contadores dos atendimentos criados são somados e as
+    respostas em cache das models populadas são invalidadas ao final
+
     Raises:
         CommandError: Algo de errado não está certo
     """
@@ -50,16 +82,20 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         try:
-            self.populate_locations()
-            self.populate_institutions()
-            self.populate_academic_education()
-            self.populate_sectors()
-            self.populate_functions()
-            self.populate_attendance_reasons()
-            self.populate_persons()
-            self.populate_students()
-            self.populate_attendances()
-            self.populate_superuser()
+            with transaction.atomic():
+                self.populate_locations()
+                self.populate_institutions()
+                self.populate_academic_education()
+                self.populate_sectors()
+                self.populate_functions()
+                self.populate_attendance_reasons()
+                self.populate_persons()
+                self.populate_students()
+                self.populate_attendances()
+                self.populate_superuser()
+
+            for model in CACHED_MODELS:
+                invalidate_model(model)
 
             self.stdout.write(self.style.SUCCESS("Tudo populado com sucesso! :D"))
 
@@ -84,90 +120,205 @@ class Command(BaseCommand):
         """
         Popula o banco de dados com base em uma lista pré-definida com nome, grau e qual campus oferece
         """
-        for academic_education_data in academic_educations:
-            grade, _ = Grade.objects.get_or_create(name=academic_education_data.get("grade"))
-
-            academic_education, _ = AcademicEducation.objects.get_or_create(
-                name=academic_education_data.get("name"), grade=grade
+        grade_names = [academic_education_data.get("grade") for academic_education_data in academic_educations]
+        Grade.objects.bulk_create([Grade(name=name) for name in dict.fromkeys(grade_names)], ignore_conflicts=True)
+        grades = get_objects_by(Grade.objects, "name", grade_names)
+
+        AcademicEducation.objects.bulk_create(
+            [
+                AcademicEducation(
+                    name=academic_education_data.get("name"), grade=grades[academic_education_data.get("grade")]
+                )
+                for academic_education_data in academic_educations
+            ],
+            ignore_conflicts=True,
+        )
+        academic_education_objects = {
+            (academic_education.name, academic_education.grade_id): academic_education
+            for academic_education in AcademicEducation.objects.filter(
+                name__in={academic_education_data.get("name") for academic_education_data in academic_educations}
             )
+        }
+        campi_objects = get_objects_by(
+            Campus.objects,
+            "name",
+            [academic_education_data.get("campus_name") for academic_education_data in academic_educations],
+        )
+
+        academic_education_campi = []
+
+        for academic_education_data in academic_educations:
             try:
-                AcademicEducationCampus.objects.get_or_create(
-                    academic_education=academic_education,
-                    campus=Campus.objects.get(name=academic_education_data.get("campus_name")),
+                academic_education_campi.append(
+                    AcademicEducationCampus(
+                        academic_education=academic_education_objects[
+                            (academic_education_data.get("name"), grades[academic_education_data.get("grade")].id)
+                        ],
+                        campus=campi_objects[academic_education_data.get("campus_name")],
+                    )
                 )
 
-            except Campus.DoesNotExist:
+            except KeyError:
                 message = "Campus não encontrado. Por favor, informe na lista para população."
 
                 raise ValueError(message)
 
+        AcademicEducationCampus.objects.bulk_create(academic_education_campi, ignore_conflicts=True)
+
     def populate_sectors(self):
         """
         Popula o banco de dados com base em uma lista pré-definida de setores
         """
-        for sector in sectors:
-            Sector.objects.get_or_create(**sector)
+        Sector.objects.bulk_create([Sector(**sector) for sector in sectors], ignore_conflicts=True)
 
     def populate_functions(self):
         """
         Popula o banco de dados com base em uma lista pré-definida de funções dos funcionários
         """
-        for function in functions:
-            Function.objects.get_or_create(**function)
+        Function.objects.bulk_create([Function(**function) for function in functions], ignore_conflicts=True)
 
     def populate_attendance_reasons(self):
         """
         Popula o banco de dados com base em uma lista pré-definida de motivos de atendimento
         """
-        for attendance_reason_data in attendance_reasons:
-            attendance_reason, _ = AttendanceReason.objects.get_or_create(name=attendance_reason_data.get("name"))
-
-            for son_attendance_reason_data in attendance_reason_data.get("sons"):
-                AttendanceReason.objects.get_or_create(
-                    name=son_attendance_reason_data.get("name"), father_reason=attendance_reason
+        AttendanceReason.objects.bulk_create(
+            [
+                AttendanceReason(name=attendance_reason_data.get("name"))
+                for attendance_reason_data in attendance_reasons
+            ],
+            ignore_conflicts=True,
+        )
+        fathers = get_objects_by(
+            AttendanceReason.objects,
+            "name",
+            [attendance_reason_data.get("name") for attendance_reason_data in attendance_reasons],
+        )
+
+        AttendanceReason.objects.bulk_create(
+            [
+                AttendanceReason(
+                    name=son_attendance_reason_data.get("name"),
+                    father_reason=fathers[attendance_reason_data.get("name")],
                 )
+                for attendance_reason_data in attendance_reasons
+                for son_attendance_reason_data in attendance_reason_data.get("sons")
+            ],
+            ignore_conflicts=True,
+        )
+
+        # o caminho materializado é mantido pelos signals, que o bulk_create não dispara
+        AttendanceReason.objects.rebuild_paths()
 
     def populate_persons(self):
-        for person in persons:
-            Person.objects.get_or_create(**person)
+        persons_objects = [Person(**person) for person in persons]
+
+        for person in persons_objects:
+            person.search_document = build_person_search_document(person)
+
+        Person.objects.bulk_create(persons_objects, ignore_conflicts=True)
 
     def populate_students(self):
+        persons_objects = get_objects_by(Person.objects, "cpf", [student.get("cpf") for student in students])
+        academic_education_campi = {
+            (academic_education_campus.academic_education.name, academic_education_campus.campus.name): (
+                academic_education_campus
+            )
+            for academic_education_campus in AcademicEducationCampus.objects.select_related(
+                "academic_education", "campus"
+            )
+        }
+
+        students_objects = []
+
         for student in students:
+            # cópia dos dados, para que o comando possa ser executado novamente no mesmo processo
+            student = dict(student)
             academic_education, campus_name = student.pop("academic_education_campus").split("-")
 
             try:
-                person = Person.objects.get(cpf=student.pop("cpf"))
-
-                academic_education_campus = AcademicEducationCampus.objects.get(
-                    academic_education__name=academic_education.strip(), campus__name=campus_name.strip()
-                )
+                person = persons_objects[student.pop("cpf")]
+                academic_education_campus = academic_education_campi[(academic_education.strip(), campus_name.strip())]
 
-                Student.objects.get_or_create(
-                    **student, person=person, academic_education_campus=academic_education_campus
-                )
-
-            except Person.DoesNotExist or AcademicEducationCampus.DoesNotExist:
+            except KeyError:
                 message = """Pessoa ou Formação Acadêmica do Campus não encontrado.
                 Por favor, informe na lista para população."""
 
                 raise ValueError(message)
 
+            students_objects.append(
+                Student(**student, person=person, academic_education_campus=academic_education_campus)
+            )
+
+        Student.objects.bulk_create(students_objects, ignore_conflicts=True)
+
     def populate_attendances(self):
-        for attendance in attendances:
-            try:
-                attendance_reason = AttendanceReason.objects.get(name=attendance.pop("attendance_reason"))
+        """
+        Cria somente os atendimentos que ainda não existem (mesmo estudante, motivo e severidade), já que os
+        atendimentos não possuem campos únicos, e soma os atendimentos criados aos contadores
+        """
+        attendance_reasons_objects = get_objects_by(
+            AttendanceReason.objects, "name", [attendance.get("attendance_reason") for attendance in attendances]
+        )
+        students_objects = get_objects_by(
+            Student.objects.select_related("academic_education_campus"),
+            "registration",
+            [attendance.get("registration") for attendance in attendances],
+        )
+        existing = set(
+            Attendance.objects.filter(student__in=students_objects.values()).values_list(
+                "student_id", "attendance_reason_id", "attendance_severity"
+            )
+        )
 
-                student = Student.objects.get(registration=attendance.pop("registration"))
+        attendances_objects = []
+
+        for attendance in attendances:
+            attendance = dict(attendance)
 
-                Attendance.objects.get_or_create(**attendance, attendance_reason=attendance_reason, student=student)
+            try:
+                attendance_reason = attendance_reasons_objects[attendance.pop("attendance_reason")]
+                student = students_objects[attendance.pop("registration")]
 
-            except AttendanceReason.DoesNotExist or Student.DoesNotExist:
+            except KeyError:
                 message = (
                     "Motivo de Atendimento ou Estudante não encontrado. Por favor, informe na lista para população."
                 )
 
                 raise ValueError(message)
 
+            key = (student.id, attendance_reason.id, attendance.get("attendance_severity"))
+
+            if key not in existing:
+                existing.add(key)
+                attendances_objects.append(
+                    Attendance(**attendance, attendance_reason=attendance_reason, student=student)
+                )
+
+        Attendance.objects.bulk_create(attendances_objects)
+
+        statistics = Counter(
+            (
+                attendance.opened_at.date().replace(day=1),
+                getattr(attendance.student.academic_education_campus, "campus_id", None),
+                attendance.attendance_reason_id,
+                attendance.attendance_severity,
+                attendance.status,
+            )
+            for attendance in attendances_objects
+        )
+
+        for (month, campus_id, attendance_reason_id, attendance_severity, status), total in statistics.items():
+            AttendanceStatistic.objects.increment(
+                {
+                    "month": month,
+                    "campus_id": campus_id,
+                    "attendance_reason_id": attendance_reason_id,
+                    "attendance_severity": attendance_severity,
+                    "status": status,
+                },
+                total,
+            )
+
     def populate_superuser(self):
         """
         Popula o banco de dados com um usuário comum padrão. Consulte o usuário e senha na documentação da API
@@ -179,9 +330,11 @@ class Command(BaseCommand):
             function, _ = Function.objects.get_or_create(name="Psicóloga(o)")
             sector, _ = Sector.objects.get_or_create(name="Coordenadoria-Geral de Assistência Estudantil")
 
-            Account.objects.create_superuser(
-                email=email, password=password, person=baker.make("core.Person"), function=function, sector=sector,
-            )
+            # o erro de integridade não invalida a transação de quem executa o comando
+            with transaction.atomic():
+                Account.objects.create_superuser(
+                    email=email, password=password, person=baker.make("core.Person"), function=function, sector=sector,
+                )
 
         except IntegrityError:
             message = f"Super Usuário já criado!\nEmail: {email}\nSenha: {password}\n"
@@ -189,37 +342,65 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING(message))
 
     def __campus_register(self):
-        for campus in campi:
-            try:
-                city_name, state_initials = campus.pop("location").split("-")
+        locations = {
+            (city_name, state_initials): location_id
+            for city_name, state_initials, location_id in Location.objects.values_list(
+                "city__name", "state__initials", "id"
+            )
+        }
+        institutions_objects = get_objects_by(
+            Institution.objects, "name", [campus.get("institution") for campus in campi]
+        )
+
+        campi_objects = []
 
-                location = Location.objects.get(city__name=city_name.strip(), state__initials=state_initials.strip())
-                institution = Institution.objects.get(name=campus.pop("institution"))
+        for campus in campi:
+            campus = dict(campus)
+            city_name, state_initials = campus.pop("location").split("-")
 
-                campus = Campus.objects.get_or_create(**campus, location=location, institution=institution)
+            try:
+                location_id = locations[(city_name.strip(), state_initials.strip())]
+                institution = institutions_objects[campus.pop("institution")]
 
-            except Location.DoesNotExist or Institution.DoesNotExist:
+            except KeyError:
                 message = "Localização não encontrada. Por favor, informe na lista para população."
 
                 raise ValueError(message)
 
+            campi_objects.append(Campus(**campus, location_id=location_id, institution=institution))
+
+        Campus.objects.bulk_create(campi_objects, ignore_conflicts=True)
+
     def __institution_register(self):
-        for institution in institutions:
-            Institution.objects.get_or_create(**institution)
+        Institution.objects.bulk_create(
+            [Institution(**institution) for institution in institutions], ignore_conflicts=True
+        )
 
     def __state_register(self):
-        for state in states:
-            State.objects.get_or_create(**state)
+        State.objects.bulk_create([State(**state) for state in states], ignore_conflicts=True)
 
     def __city_register(self):
-        for city_data in cities:
-            city, _ = City.objects.get_or_create(name=city_data.get("name"))
+        City.objects.bulk_create([City(name=city_data.get("name")) for city_data in cities], ignore_conflicts=True)
+
+        cities_objects = get_objects_by(City.objects, "name", [city_data.get("name") for city_data in cities])
+        states_objects = get_objects_by(
+            State.objects, "initials", [city_data.get("state_initials") for city_data in cities]
+        )
 
+        locations = []
+
+        for city_data in cities:
             try:
-                state = State.objects.get(initials=city_data.get("state_initials"))
-                state.cities.add(city)
+                locations.append(
+                    Location(
+                        city=cities_objects[city_data.get("name")],
+                        state=states_objects[city_data.get("state_initials")],
+                    )
+                )
 
-            except State.DoesNotExist:
+            except KeyError:
                 message = "Estado não cadastrado. Por favor, informe-o na lista para população."
 
                 raise ValueError(message)
+
+        Location.objects.bulk_create(locations, ignore_conflicts=True)
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from nupe.core.models import AttendanceStatistic
+
+
+class Command(BaseCommand):
+    """
+    Recalcula os contadores pré-agregados dos atendimentos (AttendanceStatistic) a partir dos atendimentos não
+    mascarados. Necessário após alterações em massa que não disparam signals, como 'update' e 'bulk_create'
+    """
+
+    help = "Recalcula os contadores pré-agregados dos atendimentos"
+
+    def handle(self, *args, **options):
+        AttendanceStatistic.objects.rebuild()
+
+        self.stdout.write(f"{AttendanceStatistic.objects.count()} agrupamentos recalculados")
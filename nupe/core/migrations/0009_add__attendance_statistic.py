@@ -0,0 +1,81 @@
+# Generated by Django 2.2.28 on 2026-10-18 15:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import TruncMonth
+
+
+def populate_attendance_statistic(apps, schema_editor):
+    """
+    Popula os agrupamentos a partir dos atendimentos já cadastrados e não mascarados
+    """
+    Attendance = apps.get_model("core", "Attendance")
+    AttendanceStatistic = apps.get_model("core", "AttendanceStatistic")
+
+    attendances = (
+        Attendance.objects.filter(deleted__isnull=True)
+        .order_by()
+        .values(
+            "attendance_reason_id",
+            "attendance_severity",
+            "status",
+            month=TruncMonth("opened_at", output_field=models.DateField()),
+            campus_id=F("student__academic_education_campus__campus_id"),
+        )
+        .annotate(total=Count("id"))
+    )
+
+    AttendanceStatistic.objects.bulk_create([AttendanceStatistic(**values) for values in attendances])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_add__attendance__account_attendance"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AttendanceStatistic",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("month", models.DateField()),
+                (
+                    "attendance_severity",
+                    models.CharField(
+                        choices=[("L", "Baixa"), ("M", "Média"), ("H", "Alta"), ("S", "Grave")], max_length=1
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("O", "Aberto"), ("OH", "Em Espera"), ("IP", "Em Atendimento"), ("C", "Fechado")],
+                        max_length=2,
+                    ),
+                ),
+                ("total", models.IntegerField(default=0)),
+                (
+                    "attendance_reason",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attendance_statistics",
+                        related_query_name="attendance_statistic",
+                        to="core.AttendanceReason",
+                    ),
+                ),
+                (
+                    "campus",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attendance_statistics",
+                        related_query_name="attendance_statistic",
+                        to="core.Campus",
+                    ),
+                ),
+            ],
+            options={"unique_together": {("month", "campus", "attendance_reason", "attendance_severity", "status")},},
+        ),
+        migrations.RunPython(populate_attendance_statistic, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+from nupe.core.utils.indexes import CaseInsensitiveIndex, TrigramIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_add__attendance_statistic"),
+    ]
+
+    operations = [
+        # filtros com lookup_expr='iexact'
+        CaseInsensitiveIndex(model_name="grade", field_name="name", name="core_grade_name_upper_idx"),
+        CaseInsensitiveIndex(
+            model_name="academiceducation", field_name="name", name="core_academiceducation_name_upper_idx"
+        ),
+        CaseInsensitiveIndex(model_name="institution", field_name="name", name="core_institution_name_upper_idx"),
+        CaseInsensitiveIndex(model_name="campus", field_name="name", name="core_campus_name_upper_idx"),
+        CaseInsensitiveIndex(model_name="campus", field_name="address", name="core_campus_address_upper_idx"),
+        CaseInsensitiveIndex(model_name="campus", field_name="number", name="core_campus_number_upper_idx"),
+        CaseInsensitiveIndex(model_name="person", field_name="first_name", name="core_person_first_name_upper_idx"),
+        CaseInsensitiveIndex(model_name="person", field_name="last_name", name="core_person_last_name_upper_idx"),
+        CaseInsensitiveIndex(model_name="city", field_name="name", name="core_city_name_upper_idx"),
+        CaseInsensitiveIndex(model_name="state", field_name="initials", name="core_state_initials_upper_idx"),
+        CaseInsensitiveIndex(model_name="function", field_name="name", name="core_function_name_upper_idx"),
+        CaseInsensitiveIndex(model_name="sector", field_name="name", name="core_sector_name_upper_idx"),
+        # search_fields das views (icontains)
+        TrigramIndex(model_name="grade", field_name="name", name="core_grade_name_trgm_idx"),
+        TrigramIndex(model_name="academiceducation", field_name="name", name="core_academiceducation_name_trgm_idx"),
+        TrigramIndex(model_name="institution", field_name="name", name="core_institution_name_trgm_idx"),
+        TrigramIndex(model_name="campus", field_name="name", name="core_campus_name_trgm_idx"),
+        TrigramIndex(model_name="person", field_name="first_name", name="core_person_first_name_trgm_idx"),
+        TrigramIndex(model_name="person", field_name="last_name", name="core_person_last_name_trgm_idx"),
+        TrigramIndex(model_name="function", field_name="name", name="core_function_name_trgm_idx"),
+        TrigramIndex(model_name="sector", field_name="name", name="core_sector_name_trgm_idx"),
+        TrigramIndex(model_name="attendancereason", field_name="name", name="core_attendancereason_name_trgm_idx"),
+    ]
@@ -0,0 +1,232 @@
+# Generated by Django 2.2.28 on 2026-10-18 15:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_add__lookup_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="academiceducation",
+            name="grade",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="academic_education",
+                to="core.Grade",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="academiceducationcampus",
+            name="academic_education",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="academic_education_campus",
+                to="core.AcademicEducation",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="academiceducationcampus",
+            name="campus",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="academic_education_campus",
+                to="core.Campus",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="accountattendance",
+            name="account",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="account_attendances",
+                related_query_name="account_attendance",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="accountattendance",
+            name="attendance",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="account_attendances",
+                related_query_name="account_attendance",
+                to="core.Attendance",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="attendance",
+            name="attendance_reason",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="attendances",
+                related_query_name="attendance",
+                to="core.AttendanceReason",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="attendance",
+            name="student",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="consultations",
+                related_query_name="consultation",
+                to="core.Student",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="attendancereason",
+            name="father_reason",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                default=None,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="sons_reasons",
+                related_query_name="son_reason",
+                to="core.AttendanceReason",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="responsible",
+            name="person",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="responsibles",
+                related_query_name="responsible",
+                to="core.Person",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="responsible",
+            name="student",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="responsibles",
+                related_query_name="responsible",
+                to="core.Student",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="student",
+            name="academic_education_campus",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="students",
+                related_query_name="student",
+                to="core.AcademicEducationCampus",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="student",
+            name="person",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="student_registrations",
+                related_query_name="student_registration",
+                to="core.Person",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="academiceducation",
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True), fields=["grade"], name="core_academicedu_gr_live_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="academiceducationcampus",
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True), fields=["academic_education"], name="core_aec_ae_live_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="academiceducationcampus",
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True), fields=["campus"], name="core_aec_campus_live_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="accountattendance",
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True), fields=["attendance"], name="core_accountatt_at_live_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="accountattendance",
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True), fields=["account"], name="core_accountatt_ac_live_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True),
+                fields=["attendance_reason"],
+                name="core_attendance_ar_live_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True), fields=["student"], name="core_attendance_st_live_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True),
+                fields=["attendance_severity", "id"],
+                name="core_attendance_sev_live_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="attendancereason",
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True), fields=["father_reason"], name="core_reason_father_live_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="responsible",
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True), fields=["student"], name="core_responsible_st_live_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="responsible",
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True), fields=["person"], name="core_responsible_pe_live_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="student",
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True), fields=["person"], name="core_student_person_live_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="student",
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True),
+                fields=["academic_education_campus"],
+                name="core_student_aec_live_idx",
+            ),
+        ),
+    ]
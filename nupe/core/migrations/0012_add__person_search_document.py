@@ -0,0 +1,68 @@
+# Generated by Django 2.2.28 on 2026-10-18 15:31
+
+import unicodedata
+
+from django.db import migrations, models
+
+from nupe.core.utils.indexes import RecreateCaseInsensitiveIndex, TrigramIndex
+
+# quantidade de pessoas atualizadas por consulta
+BATCH_SIZE = 1000
+
+
+def normalize(text: str) -> str:
+    """
+    Cópia de 'nupe.core.utils.search.normalize' no momento desta migration, para que alterações futuras
+    na busca não alterem o resultado da migration
+    """
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    without_accents = "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+    words = ("".join(char for char in word if char.isalnum()) for word in without_accents.split())
+
+    return " ".join(word for word in words if word)
+
+
+def populate_person_search_document(apps, schema_editor):
+    """
+    Monta o documento de busca das pessoas já cadastradas, incluindo as mascaradas. As pessoas são
+    percorridas e atualizadas em lotes, sem carregar todas na memória
+    """
+    Person = apps.get_model("core", "Person")
+    persons = []
+
+    for person in Person.objects.only("first_name", "last_name", "cpf").iterator(chunk_size=BATCH_SIZE):
+        person.search_document = normalize(f"{person.first_name} {person.last_name} {person.cpf}")
+        persons.append(person)
+
+        if len(persons) == BATCH_SIZE:
+            Person.objects.bulk_update(persons, ["search_document"])
+            persons = []
+
+    Person.objects.bulk_update(persons, ["search_document"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_add__partial_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="person",
+            name="search_document",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.RunPython(populate_person_search_document, reverse_code=migrations.RunPython.noop),
+        TrigramIndex(model_name="person", field_name="search_document", name="core_person_search_doc_trgm_idx"),
+        # tabelas recriadas pelo SQLite nesta migration e na migration 0011_add__partial_indexes
+        RecreateCaseInsensitiveIndex(
+            model_name="academiceducation", field_name="name", name="core_academiceducation_name_upper_idx"
+        ),
+        RecreateCaseInsensitiveIndex(
+            model_name="person", field_name="first_name", name="core_person_first_name_upper_idx"
+        ),
+        RecreateCaseInsensitiveIndex(
+            model_name="person", field_name="last_name", name="core_person_last_name_upper_idx"
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.28 on 2026-10-18 15:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_add__person_search_document"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="student",
+            name="academic_education_campus",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="students",
+                related_query_name="student",
+                to="core.AcademicEducationCampus",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="student",
+            index=models.Index(
+                condition=models.Q(_academic_education_campus_deleted_id__isnull=False),
+                fields=["_academic_education_campus_deleted_id"],
+                name="core_student_aec_deleted_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.28 on 2026-10-18 16:55
+
+from django.db import migrations, models
+
+from nupe.core.utils.tree import build_paths
+
+
+def populate_attendance_reason_path(apps, schema_editor):
+    """
+    Monta o caminho materializado dos motivos de atendimento já cadastrados, incluindo os mascarados
+    """
+    AttendanceReason = apps.get_model("core", "AttendanceReason")
+    # o manager padrão histórico (only_father) não possui o filtro dos motivos raízes nem dos mascarados
+    manager = AttendanceReason._default_manager
+    reasons = list(manager.only("father_reason"))
+    paths = build_paths({reason.pk: reason.father_reason_id for reason in reasons})
+
+    for reason in reasons:
+        reason.path = paths[reason.pk]
+
+    manager.bulk_update(reasons, ["path"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_alter__student_academic_education_campus"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attendancereason",
+            name="path",
+            field=models.CharField(blank=True, default="", editable=False, max_length=255),
+        ),
+        migrations.RunPython(populate_attendance_reason_path, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 2.2.28 on 2026-10-18 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0014_add__attendance_reason_path"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True),
+                fields=["student", "opened_at", "id"],
+                name="core_attendance_st_op_live_idx",
+            ),
+        ),
+        migrations.RemoveIndex(model_name="attendance", name="core_attendance_st_live_idx",),
+    ]
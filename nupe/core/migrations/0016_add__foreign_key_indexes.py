@@ -0,0 +1,138 @@
+# Generated by Django 2.2.28 on 2026-10-18 16:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from nupe.core.utils.indexes import RecreateCaseInsensitiveIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0015_alter__attendance_student_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="academiceducation",
+            name="grade",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, related_name="academic_education", to="core.Grade"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="academiceducationcampus",
+            name="academic_education",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="academic_education_campus",
+                to="core.AcademicEducation",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="academiceducationcampus",
+            name="campus",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT, related_name="academic_education_campus", to="core.Campus"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="accountattendance",
+            name="account",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="account_attendances",
+                related_query_name="account_attendance",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="accountattendance",
+            name="attendance",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="account_attendances",
+                related_query_name="account_attendance",
+                to="core.Attendance",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="attendance",
+            name="attendance_reason",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="attendances",
+                related_query_name="attendance",
+                to="core.AttendanceReason",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="attendance",
+            name="student",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="consultations",
+                related_query_name="consultation",
+                to="core.Student",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="attendancereason",
+            name="father_reason",
+            field=models.ForeignKey(
+                blank=True,
+                default=None,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="sons_reasons",
+                related_query_name="son_reason",
+                to="core.AttendanceReason",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="responsible",
+            name="person",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="responsibles",
+                related_query_name="responsible",
+                to="core.Person",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="responsible",
+            name="student",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="responsibles",
+                related_query_name="responsible",
+                to="core.Student",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="student",
+            name="academic_education_campus",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="students",
+                related_query_name="student",
+                to="core.AcademicEducationCampus",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="student",
+            name="person",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="student_registrations",
+                related_query_name="student_registration",
+                to="core.Person",
+            ),
+        ),
+        # tabela recriada pelo SQLite nesta migration
+        RecreateCaseInsensitiveIndex(
+            model_name="academiceducation", field_name="name", name="core_academiceducation_name_upper_idx"
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 2.2.28 on 2026-10-18 18:12
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_null_campus_duplicates(apps, schema_editor):
+    """
+    Unifica os agrupamentos sem campus duplicados por incrementos simultâneos, somando os contadores no
+    agrupamento mais antigo
+    """
+    AttendanceStatistic = apps.get_model("core", "AttendanceStatistic")
+
+    duplicates = (
+        AttendanceStatistic.objects.filter(campus__isnull=True)
+        .order_by()
+        .values("month", "attendance_reason_id", "attendance_severity", "status")
+        .annotate(quantity=Count("id"), first_id=Min("id"), sum_total=Sum("total"))
+        .filter(quantity__gt=1)
+    )
+
+    for duplicate in duplicates:
+        statistics = AttendanceStatistic.objects.filter(
+            campus__isnull=True,
+            month=duplicate["month"],
+            attendance_reason_id=duplicate["attendance_reason_id"],
+            attendance_severity=duplicate["attendance_severity"],
+            status=duplicate["status"],
+        )
+
+        statistics.filter(id=duplicate["first_id"]).update(total=duplicate["sum_total"])
+        statistics.exclude(id=duplicate["first_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0016_add__foreign_key_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_null_campus_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="attendancestatistic",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(campus__isnull=True),
+                fields=("month", "attendance_reason", "attendance_severity", "status"),
+                name="core_attstat_null_campus_uniq",
+            ),
+        ),
+    ]
@@ -1,4 +1,4 @@
-from nupe.core.models.attendance import AccountAttendance, Attendance
+from nupe.core.models.attendance import AccountAttendance, Attendance, AttendanceStatistic
 from nupe.core.models.course import AcademicEducation, AcademicEducationCampus, Grade
 from nupe.core.models.institution import Campus, Institution
 from nupe.core.models.job import Function, Sector
@@ -1,6 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncMonth
 from safedelete.models import SOFT_DELETE_CASCADE, SafeDeleteModel
 
+from nupe.core.utils.indexes import live_index
+
 
 class Attendance(SafeDeleteModel):
     """
@@ -75,7 +79,7 @@ class Attendance(SafeDeleteModel):
     _safedelete_policy = SOFT_DELETE_CASCADE
 
     attendance_reason = models.ForeignKey(
-        "core.AttendanceReason", related_name="attendances", related_query_name="attendance", on_delete=models.CASCADE
+        "core.AttendanceReason", related_name="attendances", related_query_name="attendance", on_delete=models.CASCADE,
     )
     attendance_severity = models.CharField(
         max_length=1, choices=ATTENDANCE_SEVERITY_CHOICES, help_text="Baixa = L, Média = M, Alta = H, Grave = S"
@@ -84,7 +88,7 @@ class Attendance(SafeDeleteModel):
         "account.Account", related_name="attendances", related_query_name="attendance", through="AccountAttendance"
     )
     student = models.ForeignKey(
-        "core.Student", related_name="consultations", related_query_name="consultation", on_delete=models.CASCADE
+        "core.Student", related_name="consultations", related_query_name="consultation", on_delete=models.CASCADE,
     )
     status = models.CharField(
         max_length=2,
@@ -95,6 +99,15 @@ class Attendance(SafeDeleteModel):
     opened_at = models.DateTimeField(auto_now_add=True)
     closed_at = models.DateTimeField(null=True, blank=True, default=None)
 
+    class Meta:
+        indexes = [
+            live_index("attendance_reason", name="core_attendance_ar_live_idx"),
+            # linha do tempo do estudante, também utilizado pelos filtros e relações somente pelo estudante
+            live_index("student", "opened_at", "id", name="core_attendance_st_op_live_idx"),
+            # ordenação padrão do endpoint, com o desempate da paginação por cursor
+            live_index("attendance_severity", "id", name="core_attendance_sev_live_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"""
         {self.student},
@@ -148,5 +161,143 @@ class AccountAttendance(SafeDeleteModel):
     attendance_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            live_index("attendance", name="core_accountatt_at_live_idx"),
+            live_index("account", name="core_accountatt_ac_live_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"Atendente: {self.account.full_name}, Anotação: {self.public_annotation}"
+
+
+class AttendanceStatisticManager(models.Manager):
+    def increment(self, key: dict, quantity: int = 1):
+        """
+        Soma a quantidade fornecida ao contador do agrupamento, criando o agrupamento caso não exista
+
+        Argumentos:
+            key (dict): valores do agrupamento (month, campus_id, attendance_reason_id, attendance_severity, status)
+
+            quantity (int): quantidade a ser somada, negativa para subtrair
+        """
+        with transaction.atomic():
+            statistic, _ = self.get_or_create(**key)
+
+            # atualização atômica no banco de dados, requisições simultâneas não sobrescrevem o contador
+            self.filter(pk=statistic.pk).update(total=F("total") + quantity)
+
+    def move_campus(self, attendances, from_campus_id, to_campus_id):
+        """
+        Move a contagem dos atendimentos fornecidos entre os agrupamentos de dois campus. Utilizado quando o campus
+        dos estudantes é alterado, já que os atendimentos são contabilizados pelo campus atual do estudante
+
+        Argumentos:
+            attendances (QuerySet): atendimentos não mascarados que mudaram de campus
+
+            from_campus_id (int): campus em que os atendimentos estavam contabilizados, nulo para sem curso
+
+            to_campus_id (int): campus em que os atendimentos passam a ser contabilizados, nulo para sem curso
+        """
+        if from_campus_id == to_campus_id:
+            return
+
+        groups = (
+            attendances.order_by()
+            .values(
+                "attendance_reason_id",
+                "attendance_severity",
+                "status",
+                month=TruncMonth("opened_at", output_field=models.DateField()),
+            )
+            .annotate(total=Count("id"))
+        )
+
+        with transaction.atomic():
+            for group in groups:
+                total = group.pop("total")
+
+                self.increment({**group, "campus_id": from_campus_id}, -total)
+                self.increment({**group, "campus_id": to_campus_id}, total)
+
+    def rebuild(self):
+        """
+        Recalcula todos os agrupamentos a partir dos atendimentos não mascarados. Utilizado para popular a tabela
+        e para corrigir os contadores após alterações que não disparam signals (como 'update' e 'bulk_create')
+        """
+        attendances = (
+            Attendance.objects.order_by()
+            .values(
+                "attendance_reason_id",
+                "attendance_severity",
+                "status",
+                month=TruncMonth("opened_at", output_field=models.DateField()),
+                campus_id=F("student__academic_education_campus__campus_id"),
+            )
+            .annotate(total=Count("id"))
+        )
+
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create([AttendanceStatistic(**values) for values in attendances])
+
+
+class AttendanceStatistic(models.Model):
+    """
+    Define a quantidade de atendimentos de um agrupamento, mantida pelos signals da model Attendance a cada
+    cadastro, atualização, remoção e restauração, e pelos signals das models Student e AcademicEducationCampus
+    quando o campus dos estudantes é alterado. Os atendimentos mascarados não são contabilizados
+
+    Exemplo:
+        'Outubro de 2020 - Campus Araquari - Motivo Ansiedade - Severidade Baixa - Aberto: 12'
+
+    Atributos:
+        month: primeiro dia do mês de abertura dos atendimentos
+
+        campus: campus do curso dos estudantes atendidos, nulo para estudantes sem curso
+
+        attendance_reason: motivo dos atendimentos
+
+        attendance_severity: severidade dos atendimentos
+
+        status: status dos atendimentos
+
+        total: quantidade de atendimentos
+    """
+
+    month = models.DateField()
+    campus = models.ForeignKey(
+        "core.Campus",
+        related_name="attendance_statistics",
+        related_query_name="attendance_statistic",
+        null=True,
+        on_delete=models.CASCADE,
+    )
+    attendance_reason = models.ForeignKey(
+        "core.AttendanceReason",
+        related_name="attendance_statistics",
+        related_query_name="attendance_statistic",
+        on_delete=models.CASCADE,
+    )
+    attendance_severity = models.CharField(max_length=1, choices=Attendance.ATTENDANCE_SEVERITY_CHOICES)
+    status = models.CharField(max_length=2, choices=Attendance.STATUS_CHOICES)
+    total = models.IntegerField(default=0)
+
+    objects = AttendanceStatisticManager()
+
+    class Meta:
+        unique_together = ["month", "campus", "attendance_reason", "attendance_severity", "status"]
+        constraints = [
+            # valores nulos não são comparados pelo 'unique_together', os agrupamentos de estudantes sem curso
+            # precisam de uma restrição própria para não serem duplicados por incrementos simultâneos
+            models.UniqueConstraint(
+                fields=["month", "attendance_reason", "attendance_severity", "status"],
+                condition=models.Q(campus__isnull=True),
+                name="core_attstat_null_campus_uniq",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return (
+            f"{self.month:%m/%Y}, Severidade: {self.attendance_severity}, Status: {self.status}, Total: {self.total}"
+        )
@@ -1,6 +1,8 @@
 from django.db import models
 from safedelete.models import SOFT_DELETE_CASCADE, SafeDeleteModel
 
+from nupe.core.utils.indexes import live_index
+
 
 class Grade(SafeDeleteModel):
     """
@@ -52,6 +54,7 @@ class AcademicEducation(SafeDeleteModel):
 
     class Meta:
         unique_together = ["name", "grade"]
+        indexes = [live_index("grade", name="core_academicedu_gr_live_idx")]
 
     def __str__(self) -> str:
         return f"{self.grade} em {self.name}"
@@ -78,12 +81,16 @@ class AcademicEducationCampus(SafeDeleteModel):
     _safedelete_policy = SOFT_DELETE_CASCADE  # mascara os objetos relacionados
 
     academic_education = models.ForeignKey(
-        "AcademicEducation", related_name="academic_education_campus", on_delete=models.CASCADE,
+        "AcademicEducation", related_name="academic_education_campus", on_delete=models.CASCADE
     )
-    campus = models.ForeignKey("Campus", related_name="academic_education_campus", on_delete=models.PROTECT,)
+    campus = models.ForeignKey("Campus", related_name="academic_education_campus", on_delete=models.PROTECT)
 
     class Meta:
         unique_together = ["academic_education", "campus"]
+        indexes = [
+            live_index("academic_education", name="core_aec_ae_live_idx"),
+            live_index("campus", name="core_aec_campus_live_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.academic_education}, {self.campus}"
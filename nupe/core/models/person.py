@@ -35,6 +35,8 @@ class Person(SafeDeleteModel):
 
         updated_at: data da última atualização das informações
 
+        search_document: nome e cpf normalizados para a busca (sem acentos e pontuação), mantido pelos signals
+
         student_registrations: relação inversa para a model Student
 
         dependents: relação inversa para a model Student
@@ -80,6 +82,7 @@ class Person(SafeDeleteModel):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
+    search_document = models.TextField(default="", blank=True, editable=False)
 
     def __str__(self) -> str:
         return self.full_name
@@ -1,6 +1,27 @@
 from django.db import models
 from safedelete.models import SOFT_DELETE_CASCADE, SafeDeleteManager, SafeDeleteModel
 
+from nupe.core.utils.indexes import live_index
+from nupe.core.utils.tree import build_paths
+
+
+class AttendanceReasonTreeManager(SafeDeleteManager):
+    def rebuild_paths(self):
+        """
+        Recalcula o caminho de todos os motivos, incluindo os mascarados, a partir dos pais. Necessário após
+        alterações que não disparam signals, como 'update' e 'bulk_create'
+        """
+        reasons = list(AttendanceReason.all_objects.only("father_reason", "path"))
+        paths = build_paths({reason.pk: reason.father_reason_id for reason in reasons})
+        changed = []
+
+        for reason in reasons:
+            if reason.path != paths[reason.pk]:
+                reason.path = paths[reason.pk]
+                changed.append(reason)
+
+        AttendanceReason.all_objects.bulk_update(changed, ["path"], batch_size=1000)
+
 
 class AttendanceReasonManager(SafeDeleteManager):
     def get_queryset(self):
@@ -20,6 +41,9 @@ class AttendanceReason(SafeDeleteModel):
 
         father_reason: motivo de atendimento pai (auto relacionamento)
 
+        path: caminho materializado com os ids dos ancestrais e do próprio motivo, mantido pelos signals.
+        Exemplo: '/1/5/12/'
+
         sons_reasons: relação inversa para o objeto da model AttendanceReason
     """
 
@@ -36,8 +60,13 @@ class AttendanceReason(SafeDeleteModel):
         default=None,
         on_delete=models.CASCADE,
     )
+    path = models.CharField(max_length=255, default="", blank=True, editable=False)
 
     only_father = AttendanceReasonManager()
+    objects = AttendanceReasonTreeManager()
+
+    class Meta:
+        indexes = [live_index("father_reason", name="core_reason_father_live_idx")]
 
     def __str__(self) -> str:
         return f"Motivo: {self.name}, Descrição: {self.description or 'Nenhuma'}"
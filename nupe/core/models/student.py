@@ -1,6 +1,8 @@
 from django.db import models
+from django.db.models import Q
 from safedelete.models import SOFT_DELETE_CASCADE, SafeDeleteModel
 
+from nupe.core.utils.indexes import live_index
 from nupe.core.utils.regex import ONLY_NUMBERS
 
 
@@ -52,11 +54,13 @@ class Student(SafeDeleteModel):
         related_query_name="student_registration",
         on_delete=models.CASCADE,
     )
+    # a relação é removida pelos signals da model AcademicEducationCampus com uma única consulta, ao invés
+    # do SET_NULL do Django que carrega e atualiza cada estudante
     academic_education_campus = models.ForeignKey(
         "AcademicEducationCampus",
         related_name="students",
         related_query_name="student",
-        on_delete=models.SET_NULL,
+        on_delete=models.DO_NOTHING,
         null=True,
     )
     responsibles_persons = models.ManyToManyField(
@@ -68,6 +72,16 @@ class Student(SafeDeleteModel):
 
     class Meta:
         unique_together = ["person", "academic_education_campus"]
+        indexes = [
+            live_index("person", name="core_student_person_live_idx"),
+            live_index("academic_education_campus", name="core_student_aec_live_idx"),
+            # somente os estudantes de um objeto AcademicEducationCampus mascarado, utilizado ao restaura-lo
+            models.Index(
+                fields=["_academic_education_campus_deleted_id"],
+                name="core_student_aec_deleted_idx",
+                condition=Q(_academic_education_campus_deleted_id__isnull=False),
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"Estudante: {self.person}, Matrícula: {self.registration}"
@@ -105,14 +119,18 @@ class Responsible(SafeDeleteModel):
     _safedelete_policy = SOFT_DELETE_CASCADE  # mascara os objetos relacionados
 
     student = models.ForeignKey(
-        "Student", related_name="responsibles", related_query_name="responsible", on_delete=models.CASCADE
+        "Student", related_name="responsibles", related_query_name="responsible", on_delete=models.CASCADE,
     )
     person = models.ForeignKey(
-        "Person", related_name="responsibles", related_query_name="responsible", on_delete=models.CASCADE
+        "Person", related_name="responsibles", related_query_name="responsible", on_delete=models.CASCADE,
     )
 
     class Meta:
         unique_together = ["student", "person"]
+        indexes = [
+            live_index("student", name="core_responsible_st_live_idx"),
+            live_index("person", name="core_responsible_pe_live_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.person} responsável de {self.student.person}"
@@ -1,9 +1,22 @@
-from rest_framework.serializers import CharField, ModelSerializer, PrimaryKeyRelatedField
+from django.db.models import F
+from rest_framework.serializers import (
+    CharField,
+    DateField,
+    IntegerField,
+    ModelSerializer,
+    PrimaryKeyRelatedField,
+    Serializer,
+)
 
 from nupe.account.models import Account
-from nupe.account.serializers.account import AccountDetailSerializer, AccountListSerializer
+from nupe.account.serializers.account import (
+    AccountDetailSerializer,
+    AccountListSerializer,
+    AccountListValuesSerializer,
+)
 from nupe.core.models import AccountAttendance, Attendance
-from nupe.core.serializers.student import StudentDetailSerializer, StudentListSerializer
+from nupe.core.serializers.student import StudentDetailSerializer, StudentListSerializer, StudentListValuesSerializer
+from nupe.core.utils.values import ValuesSerializer, datetime_representation, full_name
 
 
 class AttendanceCreateSerializer(ModelSerializer):
@@ -68,6 +81,45 @@ class AttendanceListSerializer(ModelSerializer):
         ]
 
 
+class AttendanceListValuesSerializer(ValuesSerializer):
+    """
+    Versão somente leitura do AttendanceListSerializer para as listagens, com o mesmo resultado. O estudante é
+    buscado na mesma consulta dos atendimentos e os atendentes de todos os atendimentos em uma única consulta
+    """
+
+    fields = {"id": "id", "status": "status"}
+
+    def __init__(self):
+        self.student = StudentListValuesSerializer(prefix="student__")
+        self.attendants = AccountListValuesSerializer()
+
+    def get_values(self) -> tuple:
+        lookups, expressions = super().get_values()
+        student_lookups, student_expressions = self.student.get_values()
+
+        return [*lookups, *student_lookups], {**expressions, **student_expressions}
+
+    def to_representation(self, row: dict, attendants: dict = None) -> dict:
+        return {
+            "id": row["id"],
+            "attendants": (attendants or {}).get(row["id"], []),
+            "student": self.student.to_representation(row),
+            "status": row["status"],
+        }
+
+    def serialize(self, rows) -> list:
+        rows = list(rows)
+        attendants = {}
+
+        # o manager padrão mantém as contas mascaradas pelo safedelete fora do resultado, como no prefetch
+        queryset = Account.objects.filter(attendance__in=[row["id"] for row in rows])
+
+        for row in self.attendants.get_queryset(queryset).annotate(attendance_pk=F("attendance")):
+            attendants.setdefault(row["attendance_pk"], []).append(self.attendants.to_representation(row))
+
+        return [self.to_representation(row, attendants) for row in rows]
+
+
 class AttendanceDetailSerializer(ModelSerializer):
     """
     Retorna os detalhes de um atendimento específico
@@ -174,6 +226,97 @@ class MyAccountAttendanceSerializer(ModelSerializer):
         ]
 
 
+class AccountAttendanceTimelineValuesSerializer(ValuesSerializer):
+    """
+    Anotações dos atendentes na linha do tempo do estudante. Somente a anotação pública é retornada, as
+    anotações particulares e de grupo ficam de fora
+
+    Campos:
+        id: identificador
+
+        public_annotation: anotação pública do atendimento
+
+        attendant: nome completo do usuário que realizou o atendimento
+
+        attendance_at: data/hora do atendimento
+
+        updated_at: data/hora da atualização do atendimento
+    """
+
+    fields = {
+        "id": "id",
+        "public_annotation": "public_annotation",
+        "attendant": full_name("account__person__"),
+        "attendance_at": "attendance_at",
+        "updated_at": "updated_at",
+    }
+    extra_fields = ["attendance_id"]
+
+    def to_representation(self, row: dict) -> dict:
+        data = super().to_representation(row)
+        data["attendance_at"] = datetime_representation(row["attendance_at"])
+        data["updated_at"] = datetime_representation(row["updated_at"])
+
+        return data
+
+
+class AttendanceTimelineValuesSerializer(ValuesSerializer):
+    """
+    Retorna a linha do tempo dos atendimentos de um estudante. O motivo é buscado na mesma consulta dos
+    atendimentos e as anotações públicas de todos os atendimentos da página em uma única consulta
+
+    Campos:
+        id: identificador
+
+        attendance_reason: nome do motivo do atendimento
+
+        attendance_severity: gravidade do atendimento
+
+        status: status do atendimento
+
+        opened_at: data/hora da abertura do atendimento
+
+        closed_at: data/hora do fechamento do atendimento
+
+        account_attendances: anotações públicas dos atendentes, da mais antiga para a mais recente
+    """
+
+    fields = {
+        "id": "id",
+        "attendance_reason": "attendance_reason__name",
+        "attendance_severity": "attendance_severity",
+        "status": "status",
+        "opened_at": "opened_at",
+        "closed_at": "closed_at",
+    }
+
+    def __init__(self):
+        self.account_attendances = AccountAttendanceTimelineValuesSerializer()
+
+    def to_representation(self, row: dict, account_attendances: dict = None) -> dict:
+        data = super().to_representation(row)
+        data["opened_at"] = datetime_representation(row["opened_at"])
+        data["closed_at"] = datetime_representation(row["closed_at"])
+        data["account_attendances"] = (account_attendances or {}).get(row["id"], [])
+
+        return data
+
+    def serialize(self, rows) -> list:
+        rows = list(rows)
+        account_attendances = {}
+
+        queryset = AccountAttendance.objects.filter(attendance__in=[row["id"] for row in rows]).order_by(
+            "attendance_at", "id"
+        )
+
+        for row in self.account_attendances.get_queryset(queryset):
+            account_attendances.setdefault(row["attendance_id"], []).append(
+                self.account_attendances.to_representation(row)
+            )
+
+        return [self.to_representation(row, account_attendances) for row in rows]
+
+
 class AttendanceReportSerializer(ModelSerializer):
     """
     Retorna uma lista completa de informações sobre os atendimentos
@@ -212,3 +355,30 @@ class AttendanceReportSerializer(ModelSerializer):
             "opened_at",
             "closed_at",
         ]
+
+
+class AttendanceStatisticSerializer(Serializer):
+    """
+    Retorna a quantidade de atendimentos de um agrupamento. Somente os campos utilizados no agrupamento
+    são retornados, além do total
+
+    Campos:
+        month: primeiro dia do mês de abertura dos atendimentos
+
+        campus: identificador do objeto da model Campus, nulo para estudantes sem curso
+
+        attendance_reason: identificador do objeto da model AttendanceReason
+
+        attendance_severity: char que representa a gravidade dos atendimentos
+
+        status: char que representa o status dos atendimentos
+
+        total: quantidade de atendimentos
+    """
+
+    month = DateField(read_only=True)
+    campus = IntegerField(read_only=True)
+    attendance_reason = IntegerField(read_only=True)
+    attendance_severity = CharField(read_only=True)
+    status = CharField(read_only=True)
+    total = IntegerField(read_only=True)
@@ -1,7 +1,8 @@
-from rest_framework.serializers import CharField, ModelSerializer, SlugRelatedField, ValidationError
+from rest_framework.serializers import CharField, ModelSerializer, ReadOnlyField, SlugRelatedField, ValidationError
 from validate_docbr import CPF
 
 from nupe.core.models import Person
+from nupe.core.utils.values import ValuesSerializer, full_name
 from nupe.file.models import ProfileImage
 from nupe.resources.messages.person import PERSON_INVALID_CPF_MESSAGE
 
@@ -25,6 +26,14 @@ class PersonListSerializer(ModelSerializer):
         fields = ["id", "full_name", "cpf", "contact"]
 
 
+class PersonListValuesSerializer(ValuesSerializer):
+    """
+    Versão somente leitura do PersonListSerializer para as listagens, com o mesmo resultado
+    """
+
+    fields = {"id": "id", "full_name": full_name(), "cpf": "cpf", "contact": "contact"}
+
+
 class PersonDetailSerializer(ModelSerializer):
     """
     Retorna os detalhes de uma pessoa específica
@@ -45,9 +54,13 @@ class PersonDetailSerializer(ModelSerializer):
         contact: número do telefone
 
         profile_image: url da foto de perfil
+
+        profile_image_variants: url das variantes (miniatura e média) da foto de perfil, disponíveis após o
+        processamento da imagem
     """
 
     profile_image = CharField(source="profile_image.url", default=None)
+    profile_image_variants = ReadOnlyField(source="profile_image.variants", default=None)
 
     class Meta:
         model = Person
@@ -60,6 +73,7 @@ class PersonDetailSerializer(ModelSerializer):
             "gender",
             "contact",
             "profile_image",
+            "profile_image_variants",
         ]
 
 
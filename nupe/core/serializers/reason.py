@@ -1,6 +1,9 @@
-from rest_framework.serializers import ModelSerializer
+from rest_framework.serializers import ModelSerializer, ValidationError
 
 from nupe.core.models import AttendanceReason
+from nupe.core.utils.tree import in_subtree
+from nupe.core.utils.values import ValuesSerializer
+from nupe.resources.messages.reason import ATTENDANCE_REASON_FATHER_CYCLE_MESSAGE
 
 
 class AttendanceReasonSerializer(ModelSerializer):
@@ -21,3 +24,61 @@ class AttendanceReasonSerializer(ModelSerializer):
     class Meta:
         model = AttendanceReason
         fields = ["id", "name", "description", "father_reason"]
+
+    def validate_father_reason(self, father_reason):
+        """
+        Verifica se o motivo pai não está na subárvore do próprio motivo, o que criaria um ciclo
+
+        Argumentos:
+            father_reason (AttendanceReason): atributo do serializer data
+
+        Raises:
+            ValidationError: caso o motivo pai seja o próprio motivo ou um de seus descendentes
+
+        Retorna:
+            AttendanceReason: retorna o motivo pai somente se for válido
+        """
+        if (
+            father_reason is not None
+            and self.instance is not None
+            and (father_reason.pk == self.instance.pk or in_subtree(father_reason.path, self.instance.pk))
+        ):
+            raise ValidationError(ATTENDANCE_REASON_FATHER_CYCLE_MESSAGE)
+
+        return father_reason
+
+
+class AttendanceReasonTreeSerializer(ValuesSerializer):
+    """
+    Serializer somente leitura da árvore de motivos de atendimento. Todos os motivos são buscados em uma
+    única consulta e aninhados pelo atributo 'father_reason'. Os motivos cujo pai não está no resultado
+    (raízes ou raízes de uma subárvore filtrada) ficam no primeiro nível
+
+    Campos:
+        id: identificador
+
+        name: nome do motivo de atendimento
+
+        description: descrição do motivo de atendimento
+
+        father_reason: motivo de atendimento pai
+
+        sons_reasons: motivos de atendimento filhos, com os seus próprios filhos
+    """
+
+    fields = {"id": "id", "name": "name", "description": "description", "father_reason": "father_reason"}
+
+    def serialize(self, rows) -> list:
+        nodes = {}
+
+        for row in rows:
+            nodes[row["id"]] = {**self.to_representation(row), "sons_reasons": []}
+
+        tree = []
+
+        # a ordem das linhas (ordenação da view) é mantida em cada nível
+        for node in nodes.values():
+            father = nodes.get(node["father_reason"])
+            (father["sons_reasons"] if father is not None else tree).append(node)
+
+        return tree
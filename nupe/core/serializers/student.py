@@ -1,13 +1,67 @@
-from rest_framework.serializers import CharField, ModelSerializer, PrimaryKeyRelatedField, ValidationError
+from collections import Counter
+
+from django.db import transaction
+from rest_framework.serializers import (
+    CharField,
+    DateField,
+    IntegerField,
+    ListField,
+    ListSerializer,
+    ModelSerializer,
+    PrimaryKeyRelatedField,
+    Serializer,
+    ValidationError,
+)
+from rest_framework.settings import api_settings
 
-from nupe.core.models import Person, Responsible, Student
+from nupe.core.models import AcademicEducationCampus, Person, Responsible, Student
 from nupe.core.serializers.institution import CampusDetailSerializer
 from nupe.core.serializers.person import PersonDetailSerializer, PersonListSerializer
+from nupe.core.utils.regex import ONLY_NUMBERS
+from nupe.core.utils.values import ValuesSerializer, full_name
 from nupe.resources.messages.person import (
     SELF_RESPONSIBLE_MESSAGE,
     UNDER_AGE_REQUIRED_RESPONSIBLE_MESSAGE,
     UNDER_AGE_RESPONSIBLE_MESSAGE,
 )
+from nupe.resources.messages.student import (
+    STUDENT_ALREADY_ENROLLED_MESSAGE,
+    STUDENT_BULK_MAX_LENGTH_MESSAGE,
+    STUDENT_REGISTRATION_ALREADY_EXISTS_MESSAGE,
+    STUDENT_REPEATED_REGISTRATION_MESSAGE,
+)
+
+
+def verify_responsibles_of_under_age_student(*, responsibles: list, person: Person):
+    """
+    Verifica se os responsáveis do estudante são válidos
+
+    Argumentos:
+        responsibles (list): lista dos responsáveis do estudante
+        person (Person): objeto da model Person
+
+    Raises:
+        ValidationError 1: caso o estudante seja menor de idade, ele deve conter pelo menos um responsável
+        ValidationError 2: caso o estudante seja menor de idade, ele não deve ser o responsável de sí
+        ValidationError 3: caso o estudante seja menor de idade, não deve conter nenhum responsável menor de idade
+    """
+    student_is_under_age = person.age < Responsible.MINIMUM_AGE
+
+    # ValidationError 1
+    if student_is_under_age and not responsibles:
+        raise ValidationError({"responsibles": UNDER_AGE_REQUIRED_RESPONSIBLE_MESSAGE})
+
+    for responsible in responsibles:
+        responsible_is_under_age = responsible.age < Responsible.MINIMUM_AGE
+        student_is_self_responsible = responsible.id == person.id
+
+        # ValidationError 2
+        if student_is_under_age and student_is_self_responsible:
+            raise ValidationError({"responsibles": SELF_RESPONSIBLE_MESSAGE})
+
+        # ValidationError 3
+        elif responsible_is_under_age:
+            raise ValidationError({"responsibles": UNDER_AGE_RESPONSIBLE_MESSAGE})
 
 
 class StudentListSerializer(ModelSerializer):
@@ -33,6 +87,30 @@ class StudentListSerializer(ModelSerializer):
         fields = ["id", "registration", "full_name", "ingress_date", "graduated"]
 
 
+class StudentListValuesSerializer(ValuesSerializer):
+    """
+    Versão somente leitura do StudentListSerializer para as listagens, com o mesmo resultado
+
+    Argumentos:
+        prefix (str): caminho até o estudante quando a queryset é de outra model. Exemplo: 'student__'
+    """
+
+    def __init__(self, prefix: str = ""):
+        self.fields = {
+            "id": f"{prefix}id",
+            "registration": f"{prefix}registration",
+            "full_name": full_name(f"{prefix}person__"),
+            "ingress_date": f"{prefix}ingress_date",
+            "graduated": f"{prefix}graduated",
+        }
+
+    def to_representation(self, row: dict) -> dict:
+        data = super().to_representation(row)
+        data["ingress_date"] = data["ingress_date"].isoformat()
+
+        return data
+
+
 class StudentDetailSerializer(ModelSerializer):
     """
     Retorna os detalhes de um estudante específico
@@ -133,37 +211,178 @@ class StudentCreateSerializer(ModelSerializer):
 
         responsibles_data = data.get("responsibles_persons", [])
 
-        self.__verify_responsibles_of_under_age_student(responsibles=responsibles_data, person=person_data)
+        verify_responsibles_of_under_age_student(responsibles=responsibles_data, person=person_data)
 
         return data
 
-    def __verify_responsibles_of_under_age_student(self, *, responsibles: list, person: Person):
-        """
-        Verifica se os responsáveis do estudante são válidos
 
-        Argumentos:
-            responsibles (list): lista dos responsáveis do estudante
-            person (Person): objeto da model Person
+class StudentBulkCreateListSerializer(ListSerializer):
+    """
+    Valida e cadastra uma lista de estudantes. As relações, a unicidade e os responsáveis são validados com
+    uma consulta para todos os estudantes ao invés de uma consulta por estudante, e os erros são retornados
+    na mesma posição do estudante na lista
+
+    Exemplo de erro:
+        [{}, {"registration": ["Já existe um estudante com esta matrícula"]}, {}]
+    """
 
-        Raises:
-            ValidationError 1: caso o estudante seja menor de idade, ele deve conter pelo menos um responsável
-            ValidationError 2: caso o estudante seja menor de idade, ele não deve ser o responsável de sí
-            ValidationError 3: caso o estudante seja menor de idade, não deve conter nenhum responsável menor de idade
+    # quantidade máxima de estudantes por requisição
+    max_students = 5000
+
+    def to_internal_value(self, data):
+        if isinstance(data, list) and len(data) > self.max_students:
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [STUDENT_BULK_MAX_LENGTH_MESSAGE.format(self.max_students)]}
+            )
+
+        # validações do formato de cada estudante, sem consultas ao banco de dados
+        rows = super().to_internal_value(data)
+        errors = [{} for _ in rows]
+
+        persons_ids = {row["person"] for row in rows} | {pk for row in rows for pk in row["responsibles"]}
+        persons = Person.objects.only("id", "birthday_date").in_bulk(persons_ids)
+        academic_education_campus_ids = set(
+            AcademicEducationCampus.objects.filter(
+                pk__in={row["academic_education_campus"] for row in rows}
+            ).values_list("pk", flat=True)
+        )
+
+        # os objetos mascarados também são considerados pelas restrições de unicidade do banco de dados
+        registrations = Counter(row["registration"] for row in rows)
+        enrollments = Counter((row["person"], row["academic_education_campus"]) for row in rows)
+        existing_registrations = set(
+            Student.all_objects.filter(registration__in=registrations).values_list("registration", flat=True)
+        )
+        existing_enrollments = set(
+            Student.all_objects.filter(person__in=persons_ids).values_list("person", "academic_education_campus")
+        )
+
+        for row, row_errors in zip(rows, errors):
+            self.__validate_row(
+                row,
+                row_errors,
+                persons=persons,
+                academic_education_campus_ids=academic_education_campus_ids,
+                registrations=registrations,
+                enrollments=enrollments,
+                existing_registrations=existing_registrations,
+                existing_enrollments=existing_enrollments,
+            )
+
+        if any(errors):
+            raise ValidationError(errors)
+
+        return rows
+
+    def __validate_row(self, row: dict, row_errors: dict, **context):
+        does_not_exist = PrimaryKeyRelatedField.default_error_messages["does_not_exist"]
+        persons = context["persons"]
+        registration = row["registration"]
+        enrollment = (row["person"], row["academic_education_campus"])
+
+        if context["registrations"][registration] > 1:
+            row_errors["registration"] = [STUDENT_REPEATED_REGISTRATION_MESSAGE]
+        elif registration in context["existing_registrations"]:
+            row_errors["registration"] = [STUDENT_REGISTRATION_ALREADY_EXISTS_MESSAGE]
+
+        if row["person"] not in persons:
+            row_errors["person"] = [does_not_exist.format(pk_value=row["person"])]
+        # assim como o UniqueTogetherValidator, estudantes sem formação acadêmica não são comparados
+        elif enrollment[1] is not None and (
+            context["enrollments"][enrollment] > 1 or enrollment in context["existing_enrollments"]
+        ):
+            row_errors["person"] = [STUDENT_ALREADY_ENROLLED_MESSAGE]
+
+        academic_education_campus = row["academic_education_campus"]
+        if (
+            academic_education_campus is not None
+            and academic_education_campus not in context["academic_education_campus_ids"]
+        ):
+            row_errors["academic_education_campus"] = [does_not_exist.format(pk_value=academic_education_campus)]
+
+        missing_responsibles = [pk for pk in row["responsibles"] if pk not in persons]
+
+        if missing_responsibles:
+            row_errors["responsibles"] = [does_not_exist.format(pk_value=pk) for pk in missing_responsibles]
+        elif row["person"] in persons:
+            try:
+                verify_responsibles_of_under_age_student(
+                    responsibles=[persons[pk] for pk in row["responsibles"]], person=persons[row["person"]]
+                )
+            except ValidationError as error:
+                row_errors.update(error.detail)
+
+    def create(self, validated_data):
         """
-        student_is_under_age = person.age < Responsible.MINIMUM_AGE
+        Cadastra todos os estudantes e os seus responsáveis em uma única transação
+
+        Retorna:
+            [dict]: dados validados de cada estudante acrescidos do identificador
+        """
+        with transaction.atomic():
+            students = Student.objects.bulk_create(
+                [
+                    Student(
+                        registration=row["registration"],
+                        person_id=row["person"],
+                        academic_education_campus_id=row["academic_education_campus"],
+                        ingress_date=row["ingress_date"],
+                    )
+                    for row in validated_data
+                ]
+            )
+
+            # nem todos os bancos de dados retornam os identificadores no 'bulk_create' (como o SQLite)
+            if any(student.pk is None for student in students):
+                ids = dict(
+                    Student.objects.filter(
+                        registration__in=[student.registration for student in students]
+                    ).values_list("registration", "id")
+                )
+
+                for student in students:
+                    student.pk = ids[student.registration]
+
+            Responsible.objects.bulk_create(
+                [
+                    Responsible(student_id=student.pk, person_id=person_id)
+                    for student, row in zip(students, validated_data)
+                    for person_id in row["responsibles"]
+                ]
+            )
+
+        return [{**row, "id": student.pk} for student, row in zip(students, validated_data)]
+
+
+class StudentBulkCreateSerializer(Serializer):
+    """
+    Recebe e valida as informações de um estudante do cadastro em massa, as relações são validadas pelo
+    StudentBulkCreateListSerializer
+
+    Campos:
+        id: identificador (somente leitura)
 
-        # ValidationError 1
-        if student_is_under_age and not responsibles:
-            raise ValidationError({"responsibles": UNDER_AGE_REQUIRED_RESPONSIBLE_MESSAGE})
+        registration: número da matrícula
+
+        person: identificador do objeto da model Person
 
-        for responsible in responsibles:
-            responsible_is_under_age = responsible.age < Responsible.MINIMUM_AGE
-            student_is_self_responsible = responsible.id == person.id
+        academic_education_campus: identificador do objeto da model AcademicEducationCampus
+
+        responsibles: lista de id das pessoas responsáveis
 
-            # ValidationError 2
-            if student_is_under_age and student_is_self_responsible:
-                raise ValidationError({"responsibles": SELF_RESPONSIBLE_MESSAGE})
+        ingress_date: data de ingresso na formação acadêmica
+    """
+
+    id = IntegerField(read_only=True)
+    registration = CharField(max_length=35, validators=[ONLY_NUMBERS])
+    person = IntegerField()
+    academic_education_campus = IntegerField(allow_null=True, default=None)
+    responsibles = ListField(child=IntegerField(), default=list)
+    ingress_date = DateField()
+
+    class Meta:
+        list_serializer_class = StudentBulkCreateListSerializer
 
-            # ValidationError 3
-            elif responsible_is_under_age:
-                raise ValidationError({"responsibles": UNDER_AGE_RESPONSIBLE_MESSAGE})
+    def validate_responsibles(self, responsibles: list) -> list:
+        # remove os responsáveis repetidos, cada responsável é cadastrado somente uma vez por estudante
+        return list(dict.fromkeys(responsibles))
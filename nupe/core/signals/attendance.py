@@ -0,0 +1,160 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from nupe.core.models import AcademicEducationCampus, Attendance, AttendanceStatistic, Student
+
+
+def get_statistic_key(attendance_id: int):
+    """
+    Obtém os valores do agrupamento em que o atendimento é contabilizado, a partir do estado salvo no
+    banco de dados
+
+    Retorna:
+        dict ou None caso o atendimento não exista ou esteja mascarado
+    """
+    values = (
+        Attendance.all_objects.filter(pk=attendance_id, deleted__isnull=True)
+        .values(
+            "opened_at",
+            "attendance_reason_id",
+            "attendance_severity",
+            "status",
+            campus_id=F("student__academic_education_campus__campus_id"),
+        )
+        .first()
+    )
+
+    if values is None:
+        return None
+
+    values["month"] = values.pop("opened_at").date().replace(day=1)
+
+    return values
+
+
+def update_statistics(old_key, new_key):
+    """
+    Move a contagem do atendimento do agrupamento anterior para o novo, caso tenha sido alterado
+    """
+    if old_key == new_key:
+        return
+
+    if old_key is not None:
+        AttendanceStatistic.objects.increment(old_key, -1)
+
+    if new_key is not None:
+        AttendanceStatistic.objects.increment(new_key, 1)
+
+
+@receiver(signal=pre_save, sender=Attendance, dispatch_uid="attendance_statistic_pre_save")
+def attendance_statistic_pre_save(sender, **kwargs):
+    """
+    Armazena o agrupamento em que o atendimento estava contabilizado antes de ser salvo. A remoção e a
+    restauração do safedelete também salvam o objeto, alterando somente o atributo 'deleted'
+    """
+
+    attendance = kwargs.get("instance")
+    attendance._statistic_key = get_statistic_key(attendance.pk) if attendance.pk else None
+
+
+@receiver(signal=post_save, sender=Attendance, dispatch_uid="attendance_statistic_post_save")
+def attendance_statistic_post_save(sender, **kwargs):
+    """
+    Quando um objeto da model Attendance é cadastrado, atualizado, removido ou restaurado, os contadores da
+    model AttendanceStatistic são atualizados de forma incremental
+    """
+
+    attendance = kwargs.get("instance")
+    update_statistics(getattr(attendance, "_statistic_key", None), get_statistic_key(attendance.pk))
+
+
+@receiver(signal=pre_delete, sender=Attendance, dispatch_uid="attendance_statistic_pre_delete")
+def attendance_statistic_pre_delete(sender, **kwargs):
+    attendance = kwargs.get("instance")
+    attendance._statistic_key = get_statistic_key(attendance.pk)
+
+
+@receiver(signal=post_delete, sender=Attendance, dispatch_uid="attendance_statistic_post_delete")
+def attendance_statistic_post_delete(sender, **kwargs):
+    """
+    Quando um objeto da model Attendance é removido permanentemente, é descontado do seu agrupamento
+    """
+
+    attendance = kwargs.get("instance")
+    update_statistics(getattr(attendance, "_statistic_key", None), None)
+
+
+def get_student_campus_id(student_id: int):
+    """
+    Obtém o campus do curso do estudante, a partir do estado salvo no banco de dados
+    """
+    return (
+        Student.all_objects.filter(pk=student_id)
+        .values_list("academic_education_campus__campus_id", flat=True)
+        .first()
+    )
+
+
+@receiver(signal=pre_save, sender=Student, dispatch_uid="student_attendance_statistic_pre_save")
+def student_attendance_statistic_pre_save(sender, **kwargs):
+    """
+    Armazena o campus em que os atendimentos do estudante estavam contabilizados antes de ser salvo
+    """
+
+    student = kwargs.get("instance")
+    student._statistic_campus_id = get_student_campus_id(student.pk) if student.pk else None
+
+
+@receiver(signal=post_save, sender=Student, dispatch_uid="student_attendance_statistic_post_save")
+def student_attendance_statistic_post_save(sender, **kwargs):
+    """
+    Quando o curso de um objeto da model Student é alterado para outro campus, os atendimentos do estudante
+    são movidos para os agrupamentos do novo campus
+    """
+
+    if kwargs.get("created"):
+        return
+
+    student = kwargs.get("instance")
+    AttendanceStatistic.objects.move_campus(
+        Attendance.objects.filter(student=student.pk),
+        getattr(student, "_statistic_campus_id", None),
+        get_student_campus_id(student.pk),
+    )
+
+
+@receiver(
+    signal=pre_save, sender=AcademicEducationCampus, dispatch_uid="academic_education_campus_statistic_pre_save",
+)
+def academic_education_campus_statistic_pre_save(sender, **kwargs):
+    """
+    Armazena o campus em que os atendimentos dos estudantes do curso estavam contabilizados antes de ser salvo
+    """
+
+    academic_education_campus = kwargs.get("instance")
+    academic_education_campus._statistic_campus_id = (
+        AcademicEducationCampus.all_objects.filter(pk=academic_education_campus.pk)
+        .values_list("campus_id", flat=True)
+        .first()
+    )
+
+
+@receiver(
+    signal=post_save, sender=AcademicEducationCampus, dispatch_uid="academic_education_campus_statistic_post_save",
+)
+def academic_education_campus_statistic_post_save(sender, **kwargs):
+    """
+    Quando o campus de um objeto da model AcademicEducationCampus é alterado, os atendimentos dos estudantes
+    do curso são movidos para os agrupamentos do novo campus
+    """
+
+    if kwargs.get("created"):
+        return
+
+    academic_education_campus = kwargs.get("instance")
+    AttendanceStatistic.objects.move_campus(
+        Attendance.objects.filter(student__academic_education_campus=academic_education_campus.pk),
+        getattr(academic_education_campus, "_statistic_campus_id", None),
+        academic_education_campus.campus_id,
+    )
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+
+from nupe.core.models import AcademicEducation, Campus, City, Grade, Institution, Location, State
+from nupe.core.utils.cache import invalidate_model
+
+# models das respostas mantidas em cache pelas views com CachedResponseMixin, incluindo as models dos filtros
+# das views ('campus_name' das instituições e 'academic_education_name' dos graus)
+CACHED_MODELS = [AcademicEducation, Campus, City, Grade, Institution, Location, State]
+
+
+def invalidate_cached_responses(sender, **kwargs):
+    """
+    Quando um objeto de uma das models em cache é salvo ou removido, as respostas em cache que dependem da
+    model são invalidadas. A remoção e a restauração do safedelete também salvam o objeto
+    """
+
+    invalidate_model(sender)
+
+
+for model in CACHED_MODELS:
+    post_save.connect(
+        invalidate_cached_responses, sender=model, dispatch_uid=f"{model._meta.model_name}_cache_post_save"
+    )
+    post_delete.connect(
+        invalidate_cached_responses, sender=model, dispatch_uid=f"{model._meta.model_name}_cache_post_delete"
+    )
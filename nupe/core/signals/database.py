@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+
+
+def check_persistent_connections(**kwargs):
+    """
+    No início de cada requisição, verifica as conexões persistentes (CONN_MAX_AGE) abertas por uma requisição
+    anterior e fecha as conexões que não respondem, como após uma reinicialização do banco de dados. Uma nova
+    conexão é aberta no primeiro uso, ao invés da requisição receber um erro
+    """
+    if not settings.DB_CONN_HEALTH_CHECKS:
+        return
+
+    for connection in connections.all():
+        if connection.connection is not None and not connection.in_atomic_block and not connection.is_usable():
+            connection.close()
+
+
+request_started.connect(check_persistent_connections, dispatch_uid="check_persistent_connections")
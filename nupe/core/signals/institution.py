@@ -1,7 +1,9 @@
+from django.db.models.signals import pre_delete
 from django.dispatch import receiver
+from django.utils import timezone
 from safedelete.signals import post_undelete, pre_softdelete
 
-from nupe.core.models import AcademicEducationCampus, Student
+from nupe.core.models import AcademicEducationCampus, Attendance, AttendanceStatistic, Student
 
 
 @receiver(
@@ -11,17 +13,28 @@ def academic_education_campus_pre_delete(sender, **kwargs):
     """
     Quando um objeto da model AcademicEducationCampus é removido, todos os estudantes que tem relação com
     essa model tem seu atributo 'academic_education_campus' setado como 'None'
+
+    Os estudantes, incluindo os mascarados, são atualizados em uma única consulta pelo índice completo da chave
+    estrangeira, independente da quantidade de estudantes
     """
 
     academic_education_campus_deleted = kwargs.get("instance")
-    students = Student.objects.filter(academic_education_campus=academic_education_campus_deleted)
 
-    for student in students:
-        # armazena o id do objeto removido para caso seja restaurado, consiga atualizar o atributo com
-        # o valor anterior corretamente
-        student._academic_education_campus_deleted_id = academic_education_campus_deleted.id
-        student.academic_education_campus = None  # aplica on_delete=models.SET_NULL
-        student.save(force_update=True)
+    # a atualização em lote não dispara signals, os atendimentos dos estudantes são movidos para os
+    # agrupamentos sem curso antes da atualização
+    AttendanceStatistic.objects.move_campus(
+        Attendance.objects.filter(student__academic_education_campus=academic_education_campus_deleted),
+        academic_education_campus_deleted.campus_id,
+        None,
+    )
+
+    # armazena o id do objeto removido para caso seja restaurado, consiga atualizar o atributo com
+    # o valor anterior corretamente
+    Student.all_objects.filter(academic_education_campus=academic_education_campus_deleted).update(
+        _academic_education_campus_deleted_id=academic_education_campus_deleted.id,
+        academic_education_campus=None,  # on_delete=models.DO_NOTHING, a relação é removida pelos signals
+        updated_at=timezone.now(),
+    )
 
 
 @receiver(
@@ -31,12 +44,52 @@ def academic_education_campus_post_undelete(sender, **kwargs):
     """
     Quando um objeto da model AcademicEducationCampus é restaurado, todos os estudantes que tem relação com
     essa model tem seu atributo 'academic_education_campus' setado como o valor anterior a remoção
+
+    Os estudantes são buscados pelo índice parcial de '_academic_education_campus_deleted_id' e atualizados
+    em uma única consulta
     """
 
     academic_education_campus_undeleted = kwargs.get("instance")
-    students = Student.objects.filter(academic_education_campus__isnull=True)
 
-    for student in students:
-        if student._academic_education_campus_deleted_id is academic_education_campus_undeleted.id:
-            student.academic_education_campus = academic_education_campus_undeleted
-            student.save(force_update=True)
+    AttendanceStatistic.objects.move_campus(
+        Attendance.objects.filter(
+            student___academic_education_campus_deleted_id=academic_education_campus_undeleted.id,
+            student__academic_education_campus__isnull=True,
+        ),
+        None,
+        academic_education_campus_undeleted.campus_id,
+    )
+
+    Student.all_objects.filter(
+        _academic_education_campus_deleted_id=academic_education_campus_undeleted.id,
+        academic_education_campus__isnull=True,
+    ).update(
+        academic_education_campus=academic_education_campus_undeleted,
+        _academic_education_campus_deleted_id=None,
+        updated_at=timezone.now(),
+    )
+
+
+@receiver(
+    signal=pre_delete, sender=AcademicEducationCampus, dispatch_uid="academic_education_campus_pre_hard_delete",
+)
+def academic_education_campus_pre_hard_delete(sender, **kwargs):
+    """
+    Quando um objeto da model AcademicEducationCampus é removido definitivamente (HARD_DELETE), os estudantes
+    que tem relação com essa model deixam de ter a relação e não podem mais ser restaurados
+    """
+
+    academic_education_campus_deleted = kwargs.get("instance")
+
+    AttendanceStatistic.objects.move_campus(
+        Attendance.objects.filter(student__academic_education_campus=academic_education_campus_deleted),
+        academic_education_campus_deleted.campus_id,
+        None,
+    )
+
+    Student.all_objects.filter(academic_education_campus=academic_education_campus_deleted).update(
+        academic_education_campus=None, updated_at=timezone.now()
+    )
+    Student.all_objects.filter(_academic_education_campus_deleted_id=academic_education_campus_deleted.id).update(
+        _academic_education_campus_deleted_id=None
+    )
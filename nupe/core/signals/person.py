@@ -0,0 +1,16 @@
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from nupe.core.models import Person
+from nupe.core.utils.search import build_person_search_document
+
+
+@receiver(signal=pre_save, sender=Person, dispatch_uid="person_search_document_pre_save")
+def person_search_document_pre_save(sender, **kwargs):
+    """
+    Quando um objeto da model Person é salvo, o documento de busca é montado novamente a partir do nome e do
+    cpf. O 'bulk_create' não dispara signals, então o documento deve ser montado antes com a mesma função
+    """
+
+    person = kwargs.get("instance")
+    person.search_document = build_person_search_document(person)
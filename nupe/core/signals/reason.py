@@ -0,0 +1,39 @@
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from nupe.core.models import AttendanceReason
+from nupe.core.utils.tree import build_path
+
+
+@receiver(signal=post_save, sender=AttendanceReason, dispatch_uid="attendance_reason_path_post_save")
+def attendance_reason_path_post_save(sender, **kwargs):
+    """
+    Quando um objeto da model AttendanceReason é salvo, o caminho materializado é montado a partir do caminho
+    do pai. Caso o pai tenha sido alterado, o caminho de todos os descendentes é atualizado em uma única
+    consulta. A remoção e a restauração do safedelete não alteram o caminho
+
+    Os caminhos salvos são buscados no banco de dados, já que o caminho da instância pode estar desatualizado
+    """
+
+    attendance_reason = kwargs.get("instance")
+    paths = dict(
+        AttendanceReason.all_objects.filter(
+            pk__in=[attendance_reason.pk, attendance_reason.father_reason_id]
+        ).values_list("pk", "path")
+    )
+
+    old_path = paths.get(attendance_reason.pk)
+    path = build_path(paths.get(attendance_reason.father_reason_id), attendance_reason.pk)
+    attendance_reason.path = path
+
+    if path == old_path:
+        return
+
+    AttendanceReason.all_objects.filter(pk=attendance_reason.pk).update(path=path)
+
+    if old_path:
+        AttendanceReason.all_objects.filter(path__startswith=old_path).exclude(pk=attendance_reason.pk).update(
+            path=Concat(Value(path), Substr("path", len(old_path) + 1))
+        )
@@ -0,0 +1,258 @@
+import json
+import os
+from collections import namedtuple
+from io import StringIO
+from itertools import product
+from math import ceil
+from string import ascii_uppercase, digits
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+from rest_framework.status import HTTP_200_OK
+
+from nupe.account.models import Account
+from nupe.account.router import router as account_router
+from nupe.core.models import (
+    AcademicEducationCampus,
+    AccountAttendance,
+    Attendance,
+    AttendanceReason,
+    Campus,
+    Location,
+    Responsible,
+    State,
+    Student,
+)
+from nupe.core.router import router as core_router
+from nupe.core.utils.cache import invalidate_model
+from nupe.file.router import router as file_router
+from nupe.resources.datas.core.populate import persons
+
+ROUTERS = [core_router, account_router, file_router]
+
+# quantidade de consultas e latência p95 de referência de cada endpoint (benchmark_endpoints --update-baseline)
+BASELINE_PATH = os.path.join(settings.BASE_DIR, "nupe", "resources", "datas", "core", "endpoints_baseline.json")
+
+# parâmetros obrigatórios de algumas actions
+ACTION_QUERY_PARAMS = {"search": {"q": persons[0]["first_name"]}}
+
+Endpoint = namedtuple("Endpoint", ["name", "viewset", "action", "url_name", "detail"])
+
+
+def get_endpoints() -> list:
+    """
+    Obtém as actions de leitura (GET) de todas as viewsets registradas nos routers. As actions de escrita
+    dependem de dados válidos de cada serializer e são verificadas pelos testes de integração
+
+    Retorna:
+        [Endpoint]: nome ('<basename>-<action>'), viewset, action, nome da url e se é uma rota de detalhe
+    """
+    endpoints = {}
+
+    # o urls.py adiciona as rotas dos outros routers no router do core
+    for router in ROUTERS:
+        for _, viewset, basename in router.registry:
+            for route in router.get_routes(viewset):
+                # o mapeamento das actions extras (MethodMapper) redefine o 'get' como decorator
+                action = route.mapping["get"] if "get" in route.mapping else None
+
+                # o router só registra as actions implementadas pela viewset
+                if action is not None and hasattr(viewset, action):
+                    name = f"{basename}-{action}"
+                    url_name = route.name.format(basename=basename)
+                    endpoints[name] = Endpoint(name, viewset, action, url_name, route.detail)
+
+    return sorted(endpoints.values(), key=lambda endpoint: endpoint.name)
+
+
+def get_endpoint_path(endpoint: Endpoint) -> str:
+    """
+    Monta a url do endpoint. As rotas de detalhe utilizam o último objeto criado da viewset
+
+    Retorna:
+        str: url do endpoint
+    """
+    if not endpoint.detail:
+        return reverse(endpoint.url_name)
+
+    viewset = endpoint.viewset
+    lookup_field = viewset.lookup_field
+    instance = viewset.queryset.order_by("-pk").first()
+
+    return reverse(
+        endpoint.url_name, kwargs={viewset.lookup_url_kwarg or lookup_field: getattr(instance, lookup_field)}
+    )
+
+
+def percentile(values: list, percent: float) -> float:
+    """
+    Retorna:
+        float: percentil pelo método do posto mais próximo
+    """
+    values = sorted(values)
+
+    return values[max(ceil(len(values) * percent / 100) - 1, 0)]
+
+
+def measure_endpoint(client, endpoint: Endpoint, repeat: int) -> dict:
+    """
+    Mede a quantidade de consultas de uma requisição sem as respostas em cache (CachedResponseMixin), e a
+    latência e o tamanho da resposta em 'repeat' requisições, como em produção
+
+    Retorna:
+        dict: status, consultas, latências p50 e p95 em milissegundos e tamanho da resposta em bytes
+    """
+    path = get_endpoint_path(endpoint)
+    params = ACTION_QUERY_PARAMS.get(endpoint.action, {})
+
+    # a primeira requisição carrega os caches que não dependem dos dados (content types, permissões)
+    client.get(path, params)
+
+    for model in getattr(endpoint.viewset, "cache_models", []):
+        invalidate_model(model)
+
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(path, params)
+
+    # as consultas capturadas são lidas do registro da conexão, que é limpo no início das próximas requisições
+    queries = len(context.captured_queries)
+
+    durations = []
+
+    for _ in range(repeat):
+        start = perf_counter()
+        client.get(path, params)
+        durations.append((perf_counter() - start) * 1000)
+
+    return {
+        "status": response.status_code,
+        "queries": queries,
+        "p50": percentile(durations, 50),
+        "p95": percentile(durations, 95),
+        "size": len(response.content),
+    }
+
+
+def measure_endpoints(client, repeat: int) -> dict:
+    """
+    Retorna:
+        dict: medições de cada endpoint, pelo nome
+    """
+    return {endpoint.name: measure_endpoint(client, endpoint, repeat) for endpoint in get_endpoints()}
+
+
+def seed_data(scale: int, account: Account = None):
+    """
+    Popula o banco de dados com os dados do comando 'populate' e com 'scale' conjuntos de objetos relacionados
+    (localização, campus, formação acadêmica, estudante, responsável, atendente e atendimento), criados pelo
+    model_bakery. Pode ser executado novamente para aumentar a quantidade de objetos
+
+    Argumentos:
+        scale (int): quantidade de conjuntos de objetos
+
+        account (Account): conta que também é atendente dos atendimentos criados (action 'my')
+    """
+    call_command("populate", stdout=StringIO())
+
+    for state in create_states(scale):
+        campus = baker.make(Campus, location=baker.make(Location, state=state))
+        student = baker.make(
+            Student,
+            person__profile_image=None,
+            academic_education_campus=baker.make(AcademicEducationCampus, campus=campus),
+        )
+        baker.make(Responsible, student=student)
+
+        attendance = baker.make(
+            Attendance,
+            student=student,
+            attendance_reason=baker.make(AttendanceReason, father_reason=AttendanceReason.objects.first()),
+        )
+        baker.make(AccountAttendance, attendance=attendance, account=baker.make(Account, local_job=campus))
+
+        if account is not None:
+            baker.make(AccountAttendance, attendance=attendance, account=account)
+
+
+def create_states(quantity: int) -> list:
+    """
+    Cria os estados com siglas que ainda não existem. As siglas possuem somente duas letras, então os valores
+    aleatórios do model_bakery se repetiriam
+
+    Retorna:
+        [State]: estados criados
+    """
+    existing = set(State.all_objects.values_list("initials", flat=True))
+    initials = ("".join(pair) for pair in product(digits + ascii_uppercase, repeat=2))
+    initials = [value for value in initials if value not in existing][:quantity]
+
+    return [baker.make(State, initials=value) for value in initials]
+
+
+def load_baseline(path: str) -> dict:
+    with open(path) as baseline:
+        return json.load(baseline)
+
+
+def save_baseline(path: str, results: dict):
+    """
+    Armazena somente a quantidade de consultas e a latência p95 de cada endpoint
+    """
+    baseline = {
+        name: {"queries": result["queries"], "p95": round(result["p95"], 2)} for name, result in results.items()
+    }
+
+    with open(path, "w") as file:
+        json.dump(baseline, file, indent=4, sort_keys=True)
+        file.write("\n")
+
+
+def compare_with_baseline(results: dict, baseline: dict, latency_tolerance: float = None) -> list:
+    """
+    Compara as medições com a baseline armazenada
+
+    Argumentos:
+        latency_tolerance (float): multiplicador máximo da latência p95 da baseline, ou None para não comparar a
+        latência, que depende da máquina
+
+    Retorna:
+        list: mensagens dos endpoints sem baseline, com erro, com mais consultas ou mais lentos que a baseline
+    """
+    errors = []
+
+    for name, result in results.items():
+        expected = baseline.get(name)
+
+        if expected is None:
+            errors.append(f"{name}: sem baseline")
+            continue
+
+        if result["status"] != HTTP_200_OK:
+            errors.append(f"{name}: status {result['status']}")
+
+        if result["queries"] > expected["queries"]:
+            errors.append(f"{name}: {result['queries']} consultas, a baseline é {expected['queries']}")
+
+        if latency_tolerance and result["p95"] > expected["p95"] * latency_tolerance:
+            errors.append(f"{name}: p95 de {result['p95']:.2f} ms, a baseline é {expected['p95']:.2f} ms")
+
+    return errors
+
+
+def compare_query_counts(results: dict, scaled_results: dict) -> list:
+    """
+    Compara a quantidade de consultas de cada endpoint antes e depois de aumentar a quantidade de objetos
+
+    Retorna:
+        list: mensagens dos endpoints em que a quantidade de consultas depende da quantidade de objetos (N+1)
+    """
+    return [
+        f"{name}: {result['queries']} consultas, {scaled_results[name]['queries']} com mais objetos (N+1)"
+        for name, result in results.items()
+        if scaled_results[name]["queries"] != result["queries"]
+    ]
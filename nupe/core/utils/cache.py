@@ -0,0 +1,156 @@
+from hashlib import md5, sha1
+from json import dumps
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED
+
+CACHE_PREFIX = "response"
+
+
+def is_shared_cache(alias: str = "default") -> bool:
+    """
+    Verifica se o cache é compartilhado entre os processos. O cache em memória (locmem) é de cada processo, então
+    uma invalidação feita em um processo não chega aos demais, e o cache dummy não armazena nada
+
+    Retorna:
+        bool: True quando o cache é compartilhado entre os processos
+    """
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+def get_version_key(model) -> str:
+    return f"{CACHE_PREFIX}:version:{model._meta.label_lower}"
+
+
+def get_versions(models: list) -> list:
+    """
+    Obtém a versão atual de cada model, as respostas em cache de versões anteriores deixam de ser utilizadas.
+    As versões são aleatórias, então uma versão removida do cache não reutiliza uma versão anterior
+
+    Retorna:
+        list: versão de cada model, na mesma ordem
+    """
+    keys = [get_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid4().hex, timeout=None)
+            versions[key] = cache.get(key)
+
+    return [versions[key] for key in keys]
+
+
+def invalidate_model(model):
+    """
+    Invalida todas as respostas em cache que dependem da model, alterando a sua versão
+    """
+    cache.set(get_version_key(model), uuid4().hex, timeout=None)
+
+
+def make_etag(data, media_type: str) -> str:
+    """
+    Retorna:
+        str: etag forte (entre aspas) do conteúdo da resposta
+    """
+    content = dumps(data, cls=DjangoJSONEncoder, sort_keys=True, ensure_ascii=False)
+
+    return '"{}"'.format(sha1(f"{media_type}:{content}".encode("utf-8")).hexdigest())  # nosec
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """
+    Compara a etag com o cabeçalho 'If-None-Match', utilizando a comparação fraca (RFC 7232)
+    """
+    etags = parse_etags(if_none_match or "")
+
+    return "*" in etags or etag in [value[2:] if value.startswith("W/") else value for value in etags]
+
+
+class CachedResponseMixin:
+    """
+    Mantém em cache as respostas das actions de leitura de dados que raramente mudam. A resposta é
+    armazenada por url e pela versão das models em 'cache_models', que é alterada pelos signals quando um
+    objeto dessas models é salvo ou removido. As permissões continuam sendo verificadas a cada requisição
+
+    As respostas possuem o cabeçalho 'ETag', e as requisições com o cabeçalho 'If-None-Match' igual a etag
+    atual recebem o status 304 sem conteúdo
+
+    As respostas só são mantidas em cache com um cache compartilhado entre os processos (CACHES), já que os
+    signals invalidam somente o cache em que são executados. Com o cache em memória (locmem), a resposta é
+    gerada a cada requisição e somente a etag é calculada
+
+    Atributos:
+        cache_models: models utilizadas pelos serializers da view
+
+        cache_actions: actions mantidas em cache
+
+        cache_timeout: tempo máximo em segundos de uma resposta em cache, para alterações que não disparam
+        signals (como 'update'). Por padrão (None), o RESPONSE_CACHE_TIMEOUT das configurações
+    """
+
+    cache_models = []
+    cache_actions = ["list", "retrieve"]
+    cache_timeout = None
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        if self.action not in self.cache_actions:
+            return handler(request, *args, **kwargs)
+
+        shared = is_shared_cache()
+        key = self.get_cache_key(request) if shared else None
+        cached = cache.get(key) if shared else None
+
+        if cached is None:
+            response = handler(request, *args, **kwargs)
+
+            if response.status_code != HTTP_200_OK:
+                return response
+
+            etag = make_etag(response.data, request.accepted_media_type)
+
+            if shared:
+                cache.set(key, (response.data, etag), timeout=self.get_cache_timeout())
+        else:
+            data, etag = cached
+            response = Response(data=data)
+
+        if etag_matches(etag, request.META.get("HTTP_IF_NONE_MATCH")):
+            response = Response(status=HTTP_304_NOT_MODIFIED)
+
+        response["ETag"] = etag
+
+        return response
+
+    def get_cache_timeout(self) -> int:
+        """
+        O RESPONSE_CACHE_TIMEOUT é lido a cada requisição, então também pode ser alterado nos testes
+        (override_settings)
+
+        Retorna:
+            int: tempo máximo em segundos de uma resposta em cache
+        """
+        return settings.RESPONSE_CACHE_TIMEOUT if self.cache_timeout is None else self.cache_timeout
+
+    def get_cache_key(self, request) -> str:
+        """
+        A chave inclui a url completa (parâmetros da paginação, filtros e o host dos links), o formato da
+        resposta e a versão das models
+        """
+        versions = ":".join(get_versions(self.cache_models))
+        url = md5(f"{request.accepted_media_type}:{request.build_absolute_uri()}".encode("utf-8")).hexdigest()  # nosec
+
+        return f"{CACHE_PREFIX}:{self.basename}:{self.action}:{url}:{versions}"
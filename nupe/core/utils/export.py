@@ -0,0 +1,109 @@
+import csv
+import json
+from itertools import islice
+from typing import Iterable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet, prefetch_related_objects
+from rest_framework.serializers import Serializer
+
+# quantidade de objetos buscados por vez no cursor do banco de dados
+EXPORT_CHUNK_SIZE = 500
+
+
+class Echo:
+    """
+    Pseudo buffer para o csv.writer, retorna a linha escrita ao invés de armazena-la
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iterate_in_chunks(queryset: QuerySet, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator:
+    """
+    Percorre a queryset utilizando um cursor do lado do servidor (server-side cursor, quando suportado pelo
+    banco de dados), mantendo em memória somente um bloco de objetos por vez. O 'iterator' ignora o
+    'prefetch_related', então as relações são pré-carregadas a cada bloco
+
+    Argumentos:
+        queryset (QuerySet): queryset com o plano de consulta já aplicado
+
+        chunk_size (int): quantidade de objetos por bloco
+
+    Retorna:
+        Iterator: objetos da queryset
+    """
+    prefetch_lookups = queryset._prefetch_related_lookups
+    objects = queryset.iterator(chunk_size=chunk_size)
+
+    while True:
+        chunk = list(islice(objects, chunk_size))
+
+        if not chunk:
+            return
+
+        prefetch_related_objects(chunk, *prefetch_lookups)
+
+        yield from chunk
+
+
+def serializer_columns(serializer: Serializer, prefix: str = "") -> list:
+    """
+    Obtém as colunas de um arquivo csv a partir dos campos do serializer, os serializers aninhados são
+    achatados com os nomes separados por ponto. Exemplo: 'student.personal_info.cpf'
+
+    Retorna:
+        list: nome das colunas
+    """
+    columns = []
+
+    for name, field in serializer.fields.items():
+        if isinstance(field, Serializer):
+            columns += serializer_columns(field, prefix=f"{prefix}{name}.")
+        else:
+            columns.append(f"{prefix}{name}")
+
+    return columns
+
+
+def flatten(data: dict, prefix: str = "") -> dict:
+    """
+    Achata os dicionários aninhados de um objeto serializado, as listas são convertidas para json
+
+    Retorna:
+        dict: chaves separadas por ponto e seus respectivos valores
+    """
+    flattened = {}
+
+    for key, value in data.items():
+        if isinstance(value, dict):
+            flattened.update(flatten(value, prefix=f"{prefix}{key}."))
+        elif isinstance(value, (list, tuple)):
+            flattened[f"{prefix}{key}"] = json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False)
+        else:
+            flattened[f"{prefix}{key}"] = value
+
+    return flattened
+
+
+def stream_csv(rows: Iterable[dict], columns: list) -> Iterator[str]:
+    """
+    Gera as linhas de um arquivo csv, uma por vez, começando pelo cabeçalho
+    """
+    writer = csv.writer(Echo())
+
+    yield writer.writerow(columns)
+
+    for row in rows:
+        flattened = flatten(row)
+
+        yield writer.writerow([flattened.get(column) for column in columns])
+
+
+def stream_ndjson(rows: Iterable[dict]) -> Iterator[str]:
+    """
+    Gera as linhas de um arquivo ndjson (um objeto json por linha), uma por vez
+    """
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
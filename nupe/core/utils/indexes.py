@@ -0,0 +1,152 @@
+from django.db.migrations.operations.base import Operation
+from django.db.models import Index, Q
+
+POSTGRESQL = "postgresql"
+SQLITE = "sqlite"
+
+# condição dos índices parciais, os objetos mascarados pelo safedelete ficam fora do índice
+NOT_DELETED = Q(deleted__isnull=True)
+
+
+def live_index(*fields: str, name: str) -> Index:
+    """
+    Índice parcial somente dos objetos não mascarados pelo safedelete, que são os objetos retornados pelo
+    manager padrão das models ('deleted IS NULL'). O tamanho do índice acompanha somente os objetos ativos,
+    independente da quantidade de objetos mascarados
+
+    O índice é criado junto do índice completo das chaves estrangeiras, e não o substitui: o safedelete percorre
+    as relações ao mascarar e restaurar pelo '_base_manager', sem o filtro 'deleted', e as verificações de
+    chave estrangeira do banco de dados não utilizam índices parciais
+
+    Argumentos:
+        fields (str): campos indexados
+
+        name (str): nome do índice (máximo de 30 caracteres)
+
+    Retorna:
+        Index: índice para o atributo 'indexes' da classe Meta da model
+    """
+    return Index(fields=list(fields), name=name, condition=NOT_DELETED)
+
+
+class LookupIndex(Operation):
+    """
+    Operação de migration que cria um índice sobre uma expressão, de acordo com o banco de dados utilizado.
+    O Django 2.2 não suporta índices de expressões nas models, então o SQL é montado a partir da definição do
+    índice de cada banco de dados ('definitions') e os bancos sem definição são ignorados
+
+    Argumentos:
+        model_name (str): nome da model
+
+        field_name (str): nome do campo indexado
+
+        name (str): nome do índice
+    """
+
+    reversible = True
+
+    # definição do índice por banco de dados, após o nome da tabela. '{column}' é substituído pela coluna
+    definitions = {}
+
+    # comandos executados antes de criar o índice, por banco de dados
+    requirements = {}
+
+    def __init__(self, model_name: str, field_name: str, name: str):
+        self.model_name = model_name
+        self.field_name = field_name
+        self.name = name
+
+    def deconstruct(self):
+        kwargs = {"model_name": self.model_name, "field_name": self.field_name, "name": self.name}
+
+        return self.__class__.__qualname__, [], kwargs
+
+    def state_forwards(self, app_label, state):
+        # o índice não faz parte do estado das models
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+
+        for sql in self.create_sql(schema_editor, model):
+            schema_editor.execute(sql)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+
+        if self.create_sql(schema_editor, model):
+            schema_editor.execute(self.drop_sql(schema_editor))
+
+    def create_sql(self, schema_editor, model) -> list:
+        """
+        Retorna:
+            list: comandos SQL que criam o índice, vazia caso o banco de dados não seja suportado
+        """
+        vendor = schema_editor.connection.vendor
+        definition = self.definitions.get(vendor)
+
+        if definition is None:
+            return []
+
+        table, column = self.get_table_and_column(schema_editor, model)
+        name = schema_editor.quote_name(self.name)
+
+        return [
+            *self.requirements.get(vendor, []),
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} {definition.format(column=column)}",
+        ]
+
+    def drop_sql(self, schema_editor) -> str:
+        return f"DROP INDEX IF EXISTS {schema_editor.quote_name(self.name)}"
+
+    def get_table_and_column(self, schema_editor, model) -> tuple:
+        table = schema_editor.quote_name(model._meta.db_table)
+        column = schema_editor.quote_name(model._meta.get_field(self.field_name).column)
+
+        return table, column
+
+
+class CaseInsensitiveIndex(LookupIndex):
+    """
+    Índice utilizado pelo lookup 'iexact'
+
+    No PostgreSQL o Django compara 'UPPER("coluna"::text) = UPPER(valor)', então o índice é criado sobre a
+    mesma expressão. No SQLite o lookup é um 'LIKE', que utiliza somente índices com 'COLLATE NOCASE'
+    """
+
+    definitions = {
+        POSTGRESQL: "(UPPER({column}::text))",
+        SQLITE: "({column} COLLATE NOCASE)",
+    }
+
+    def describe(self):
+        return f"Create case insensitive index {self.name} on {self.model_name}.{self.field_name}"
+
+
+class RecreateCaseInsensitiveIndex(CaseInsensitiveIndex):
+    """
+    Cria novamente um índice CaseInsensitiveIndex. No SQLite, as migrations que adicionam ou alteram colunas
+    recriam a tabela somente com os índices das models, removendo os índices criados por essas operações. Nos
+    outros bancos de dados o índice já existe e nada é alterado. Ao desfazer a migration o índice é mantido,
+    já que pertence a migration que o criou
+    """
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        pass
+
+    def describe(self):
+        return f"Recreate case insensitive index {self.name} on {self.model_name}.{self.field_name}"
+
+
+class TrigramIndex(LookupIndex):
+    """
+    Índice GIN com trigramas (extensão pg_trgm) utilizado pelo lookup 'icontains' do 'search_fields', que o
+    Django compara com 'UPPER("coluna"::text) LIKE UPPER(%valor%)'. Somente no PostgreSQL, nos outros bancos
+    de dados um 'LIKE' iniciado por '%' não utiliza índices
+    """
+
+    definitions = {POSTGRESQL: "USING GIN (UPPER({column}::text) gin_trgm_ops)"}
+    requirements = {POSTGRESQL: ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]}
+
+    def describe(self):
+        return f"Create trigram index {self.name} on {self.model_name}.{self.field_name}"
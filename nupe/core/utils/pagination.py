@@ -0,0 +1,346 @@
+import json
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+from datetime import datetime
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# campo utilizado para desempatar a ordenação, garante que a posição do cursor seja única
+TIEBREAK_FIELD = "id"
+
+
+def get_field_value(instance, field: str):
+    """
+    Obtém o valor de um campo de ordenação percorrendo as relações. Exemplo: 'person__first_name'. As linhas
+    do '.values()' (dicionários) já possuem o campo com o caminho completo
+
+    Retorna:
+        valor do campo ou None caso alguma relação seja nula
+    """
+    if isinstance(instance, dict):
+        return instance.get(field)
+
+    value = instance
+
+    for attribute in field.split("__"):
+        if value is None:
+            return None
+
+        value = getattr(value, attribute)
+
+    return value
+
+
+def keyset_after(field: str, value, *, descending: bool, nulls_first: bool, nullable: bool = True):
+    """
+    Filtro dos objetos que vem depois do valor fornecido, considerando somente um campo da ordenação
+
+    Retorna:
+        Q ou None caso nenhum objeto possa vir depois
+    """
+    if value is None:
+        # os nulos ficam no início ou no final, sempre depois de todos os outros valores ou antes deles
+        return Q(**{f"{field}__isnull": False}) if nulls_first else None
+
+    after = Q(**{f"{field}__lt" if descending else f"{field}__gt": value})
+
+    return after if nulls_first or not nullable else after | Q(**{f"{field}__isnull": True})
+
+
+def keyset_equal(field: str, value) -> Q:
+    if value is None:
+        return Q(**{f"{field}__isnull": True})
+
+    return Q(**{field: value})
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """
+    Codifica as datas com os microssegundos, que o DjangoJSONEncoder trunca para milissegundos. A posição do
+    cursor é comparada com os valores do banco de dados, então o valor truncado pularia os objetos entre o
+    valor truncado e o valor real
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+
+        return super().default(o)
+
+
+class LeanCountPaginator(Paginator):
+    """
+    Paginador que conta os objetos selecionando somente a chave primária, sem ordenação e sem as
+    relações do 'select_related'. Quando a queryset é 'distinct' (filtros e buscas em relações m2m),
+    o banco de dados compara somente o id ao invés de todas as colunas do objeto
+    """
+
+    @cached_property
+    def count(self) -> int:
+        if isinstance(self.object_list, QuerySet):
+            return self.object_list.order_by().values("pk").count()
+
+        return super().count
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Paginação por cursor baseada nos valores de todos os campos da ordenação (keyset), ao invés de um
+    deslocamento (offset). A posição do cursor é um valor e não um índice, então mascarar objetos entre
+    as requisições das páginas não faz com que objetos sejam repetidos ou pulados
+
+    Exemplo:
+        /api/v1/student?pagination=cursor
+
+        /api/v1/student?pagination=cursor&cursor=<cursor do link 'next' ou 'previous' da página anterior>
+
+    A ordenação é a mesma do parâmetro 'ordering' ou do atributo 'ordering' da view, acrescida do campo
+    'id' para desempate. Os valores nulos sempre ficam no final da ordenação, independente do banco de dados
+    """
+
+    ordering = TIEBREAK_FIELD
+
+    # campos da ordenação que nunca são nulos, ordenados e filtrados sem o tratamento dos nulos para que o banco
+    # de dados percorra a ordenação pelo índice
+    not_null_fields = (TIEBREAK_FIELD,)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_keyset_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is None:
+            position, self.reverse = None, False
+        else:
+            position, self.reverse = self.cursor
+
+        queryset = queryset.order_by(*self.get_order_by(reverse=self.reverse))
+
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.get_keyset_filter(position, reverse=self.reverse))
+
+            except (DjangoValidationError, TypeError, ValueError):
+                # valores da posição que não correspondem ao tipo dos campos da ordenação
+                raise NotFound(self.invalid_cursor_message)
+
+        # busca um objeto a mais para saber se há uma próxima página
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if self.reverse:
+            self.page = list(reversed(self.page))
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "previous": self.get_previous_link(), "results": data})
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+
+        return self.encode_cursor((self.get_position(self.page[-1]), False))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+
+        return self.encode_cursor((self.get_position(self.page[0]), True))
+
+    def get_keyset_ordering(self, request, queryset, view) -> tuple:
+        """
+        Ordenação da view acrescida do campo de desempate, caso ainda não esteja presente
+        """
+        ordering = tuple(self.get_ordering(request, queryset, view))
+        fields = [field.lstrip("-") for field in ordering]
+
+        if TIEBREAK_FIELD not in fields and "pk" not in fields:
+            ordering += (TIEBREAK_FIELD,)
+
+        return ordering
+
+    def get_order_by(self, *, reverse: bool) -> list:
+        order_by = []
+
+        for field in self.ordering:
+            descending = field.startswith("-") != reverse
+            expression = F(field.lstrip("-"))
+
+            if field.lstrip("-") in self.not_null_fields:
+                order_by.append(expression.desc() if descending else expression.asc())
+                continue
+
+            # nulos no final da ordenação, e consequentemente no início da ordenação inversa
+            if reverse:
+                order_by.append(expression.desc(nulls_first=True) if descending else expression.asc(nulls_first=True))
+            else:
+                order_by.append(expression.desc(nulls_last=True) if descending else expression.asc(nulls_last=True))
+
+        return order_by
+
+    def get_keyset_filter(self, position: list, *, reverse: bool) -> Q:
+        """
+        Monta o filtro lexicográfico (a > x) OU (a = x E b > y) OU (a = x E b = y E id > z)
+
+        Raises:
+            NotFound: caso a posição do cursor não corresponda aos campos da ordenação
+        """
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        keyset_filter = Q(pk__in=[])
+        previous_equal = Q()
+
+        for field, value in zip(self.ordering, position):
+            descending = field.startswith("-") != reverse
+            field = field.lstrip("-")
+
+            after = keyset_after(
+                field, value, descending=descending, nulls_first=reverse, nullable=field not in self.not_null_fields
+            )
+
+            if after is not None:
+                keyset_filter |= previous_equal & after
+
+            previous_equal &= keyset_equal(field, value)
+
+        return keyset_filter
+
+    def get_position(self, instance) -> list:
+        return [get_field_value(instance, field.lstrip("-")) for field in self.ordering]
+
+    def decode_cursor(self, request):
+        """
+        Decodifica o cursor opaco enviado na requisição
+
+        Raises:
+            NotFound: caso o cursor seja inválido
+
+        Retorna:
+            tuple: posição (valores dos campos da ordenação) e direção do cursor, ou None caso não exista
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+
+        if encoded is None:
+            return None
+
+        try:
+            cursor = json.loads(b64decode(encoded.encode("ascii")).decode("utf-8"))
+            position, reverse = cursor["p"], bool(cursor["r"])
+
+            if not isinstance(position, list):
+                raise TypeError
+
+        except (BinasciiError, KeyError, TypeError, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, reverse
+
+    def encode_cursor(self, cursor) -> str:
+        position, reverse = cursor
+        data = json.dumps({"p": position, "r": reverse}, cls=CursorJSONEncoder)
+        encoded = b64encode(data.encode("utf-8")).decode("ascii")
+
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+
+class AttendanceTimelinePagination(KeysetPagination):
+    """
+    Paginação por cursor da linha do tempo dos atendimentos de um estudante, dos mais recentes para os mais
+    antigos. A ordenação é fixa e percorrida pelo índice (student, opened_at, id) dos atendimentos, então o
+    parâmetro 'ordering' da view não se aplica
+
+    Exemplo:
+        /api/v1/student/<matrícula>/timeline?cursor=<cursor do link 'next' da página anterior>
+    """
+
+    ordering = ("-opened_at", "-id")
+    not_null_fields = ("opened_at", TIEBREAK_FIELD)
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
+
+
+class SearchKeysetPagination(KeysetPagination):
+    """
+    Paginação por cursor das buscas, ordenada pela relevância ('search_rank') e desempatada pelo id. A ordenação
+    da busca é fixa, então o parâmetro 'ordering' e o atributo 'ordering' da view não se aplicam
+
+    Exemplo:
+        /api/v1/student/search?q=joao&pagination=cursor
+    """
+
+    ordering = ("-search_rank", TIEBREAK_FIELD)
+    not_null_fields = ("search_rank", TIEBREAK_FIELD)
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
+
+
+class PageNumberKeysetPagination(PageNumberPagination):
+    """
+    Paginação por número da página por padrão, com o modo de paginação por cursor (keyset) habilitado
+    pelo parâmetro 'pagination=cursor' ou pela presença do parâmetro 'cursor'. Indicado para listagens
+    grandes, onde o deslocamento das páginas mais distantes fica lento
+
+    Exemplo:
+        /api/v1/attendance?page=2
+
+        ou
+
+        /api/v1/attendance?pagination=cursor
+    """
+
+    django_paginator_class = LeanCountPaginator
+    mode_query_param = "pagination"
+    keyset_mode = "cursor"
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_paginator = None
+
+        if self.is_keyset_mode(request):
+            self.keyset_paginator = self.keyset_pagination_class()
+            self.keyset_paginator.page_size = self.page_size
+
+            return self.keyset_paginator.paginate_queryset(queryset, request, view=view)
+
+        return super().paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        if self.keyset_paginator is not None:
+            return self.keyset_paginator.get_paginated_response(data)
+
+        return super().get_paginated_response(data)
+
+    def is_keyset_mode(self, request) -> bool:
+        mode = request.query_params.get(self.mode_query_param)
+        cursor_query_param = self.keyset_pagination_class.cursor_query_param
+
+        return mode == self.keyset_mode or cursor_query_param in request.query_params
+
+
+class SearchPagination(PageNumberKeysetPagination):
+    """
+    Paginação das buscas, por número da página ou por cursor mantendo a ordenação pela relevância
+    """
+
+    keyset_pagination_class = SearchKeysetPagination
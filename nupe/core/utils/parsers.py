@@ -0,0 +1,25 @@
+import codecs
+
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+
+class ORJSONParser(JSONParser):
+    """
+    Interpreta o corpo json das requisições com o orjson. Assim como o JSONParser do DRF, os valores 'NaN' e
+    'Infinity' são rejeitados. O corpo com outra codificação além de UTF-8 é interpretado pelo JSONParser
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        if codecs.lookup(encoding).name != "utf-8" or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
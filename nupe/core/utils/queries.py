@@ -0,0 +1,143 @@
+from django.db.models import Prefetch, QuerySet
+
+from nupe.account.models import Account
+from nupe.core.models import AccountAttendance, Campus, Person
+
+# relações percorridas pelos serializers, sem o prefixo da model de origem
+ACCOUNT_LIST_RELATED = ["person", "local_job__institution"]
+ACCOUNT_DETAIL_RELATED = ["person__profile_image", "local_job__institution", "function", "sector"]
+CAMPUS_LIST_RELATED = ["institution"]
+CAMPUS_DETAIL_RELATED = ["location__city", "location__state", "institution"]
+LOCATION_RELATED = ["city", "state"]
+STUDENT_LIST_RELATED = ["person"]
+STUDENT_DETAIL_RELATED = [
+    "person__profile_image",
+    "academic_education_campus__academic_education__grade",
+    "academic_education_campus__campus__location__city",
+    "academic_education_campus__campus__location__state",
+    "academic_education_campus__campus__institution",
+]
+
+
+def prefixed(lookups: list, prefix: str = "") -> list:
+    """
+    Adiciona o caminho da model de origem em cada uma das relações
+
+    Argumentos:
+        lookups (list): relações a partir da model relacionada
+
+        prefix (str): caminho até a model relacionada. Exemplo: 'student__'
+
+    Retorna:
+        list: relações a partir da model de origem
+    """
+    return [f"{prefix}{lookup}" for lookup in lookups]
+
+
+def prefetch_account_list(queryset: QuerySet, prefix: str = "") -> QuerySet:
+    """
+    Plano de consulta para o serializer AccountListSerializer
+    """
+    return queryset.select_related(*prefixed(ACCOUNT_LIST_RELATED, prefix))
+
+
+def prefetch_account_detail(queryset: QuerySet, prefix: str = "") -> QuerySet:
+    """
+    Plano de consulta para o serializer AccountDetailSerializer
+    """
+    return queryset.select_related(*prefixed(ACCOUNT_DETAIL_RELATED, prefix))
+
+
+def prefetch_location(queryset: QuerySet, prefix: str = "") -> QuerySet:
+    """
+    Plano de consulta para o serializer LocationSerializer, que utiliza o nome da cidade e do estado
+    """
+    return queryset.select_related(*prefixed(LOCATION_RELATED, prefix))
+
+
+def prefetch_campus_list(queryset: QuerySet, prefix: str = "") -> QuerySet:
+    """
+    Plano de consulta para o serializer CampusListSerializer
+    """
+    return queryset.select_related(*prefixed(CAMPUS_LIST_RELATED, prefix))
+
+
+def prefetch_campus_detail(queryset: QuerySet, prefix: str = "") -> QuerySet:
+    """
+    Plano de consulta para o serializer CampusDetailSerializer
+    """
+    return queryset.select_related(*prefixed(CAMPUS_DETAIL_RELATED, prefix))
+
+
+def prefetch_academic_education_list(queryset: QuerySet) -> QuerySet:
+    """
+    Plano de consulta para o serializer AcademicEducationListSerializer
+    """
+    return queryset.select_related("grade").prefetch_related(
+        Prefetch("campi", queryset=prefetch_campus_list(Campus.objects.all()))
+    )
+
+
+def prefetch_academic_education_detail(queryset: QuerySet) -> QuerySet:
+    """
+    Plano de consulta para o serializer AcademicEducationDetailSerializer
+    """
+    return queryset.select_related("grade").prefetch_related(
+        Prefetch("campi", queryset=prefetch_campus_detail(Campus.objects.all()))
+    )
+
+
+def prefetch_student_list(queryset: QuerySet, prefix: str = "") -> QuerySet:
+    """
+    Plano de consulta para o serializer StudentListSerializer
+    """
+    return queryset.select_related(*prefixed(STUDENT_LIST_RELATED, prefix))
+
+
+def prefetch_student_detail(queryset: QuerySet, prefix: str = "") -> QuerySet:
+    """
+    Plano de consulta para o serializer StudentDetailSerializer
+    """
+    return queryset.select_related(*prefixed(STUDENT_DETAIL_RELATED, prefix)).prefetch_related(
+        Prefetch(f"{prefix}responsibles_persons", queryset=Person.objects.all())
+    )
+
+
+def prefetch_attendance_list(queryset: QuerySet) -> QuerySet:
+    """
+    Plano de consulta para o serializer AttendanceListSerializer. Os managers padrões das querysets
+    utilizadas nos objetos 'Prefetch' mantêm os objetos mascarados pelo safedelete fora do resultado
+    """
+    queryset = prefetch_student_list(queryset, prefix="student__")
+
+    return queryset.prefetch_related(Prefetch("attendants", queryset=prefetch_account_list(Account.objects.all())))
+
+
+def prefetch_attendance_detail(queryset: QuerySet, prefix: str = "") -> QuerySet:
+    """
+    Plano de consulta para o serializer AttendanceDetailSerializer
+
+    Argumentos:
+        queryset (QuerySet): queryset de Attendance ou de uma model relacionada
+
+        prefix (str): caminho até o atendimento quando a queryset é de outra model. Exemplo: 'attendance__'
+    """
+    queryset = prefetch_student_detail(queryset.select_related(f"{prefix}attendance_reason"), f"{prefix}student__")
+
+    return queryset.prefetch_related(
+        Prefetch(f"{prefix}attendants", queryset=prefetch_account_detail(Account.objects.all()))
+    )
+
+
+def prefetch_attendance_report(queryset: QuerySet) -> QuerySet:
+    """
+    Plano de consulta para o serializer AttendanceReportSerializer
+    """
+    queryset = prefetch_student_detail(queryset.select_related("attendance_reason"), prefix="student__")
+
+    return queryset.prefetch_related(
+        Prefetch(
+            "account_attendances",
+            queryset=prefetch_account_detail(AccountAttendance.objects.all(), prefix="account__"),
+        )
+    )
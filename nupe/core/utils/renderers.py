@@ -0,0 +1,109 @@
+from decimal import Decimal
+from math import isfinite
+
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from nupe.core.utils.export import flatten, stream_csv, stream_ndjson
+
+
+def as_rows(data) -> list:
+    """
+    Respostas que não são listas (como as de erro) são tratadas como uma única linha
+    """
+    if data is None:
+        return []
+
+    return data if isinstance(data, list) else [data]
+
+
+def has_non_finite(data) -> bool:
+    """
+    Retorna:
+        bool: se algum valor (float ou Decimal) dos dicionários e listas é NaN ou infinito
+    """
+    if isinstance(data, float):
+        return not isfinite(data)
+
+    if isinstance(data, Decimal):
+        return not data.is_finite()
+
+    if isinstance(data, dict):
+        return any(has_non_finite(value) for value in data.values())
+
+    if isinstance(data, (list, tuple)):
+        return any(has_non_finite(value) for value in data)
+
+    return False
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Renderiza a resposta como um arquivo csv. Utilizado com '?format=csv'. As actions de exportação
+    retornam um StreamingHttpResponse e não passam por esse renderer, somente as respostas comuns
+    (como as de erro)
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = as_rows(data)
+        columns = []
+
+        for row in rows:
+            columns += [column for column in flatten(row) if column not in columns]
+
+        return "".join(stream_csv(rows, columns)).encode(self.charset)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Renderiza a resposta como um arquivo ndjson, um objeto json por linha. Utilizado com '?format=ndjson'
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return "".join(stream_ndjson(as_rows(data))).encode(self.charset)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renderiza a resposta como json com o orjson, com a mesma saída do JSONRenderer do DRF (compacta, em UTF-8,
+    com datas no formato ISO 8601 e 'Z' no lugar de '+00:00'). Os tipos que o orjson não serializa (Decimal,
+    timedelta, textos traduzíveis) são convertidos pelo JSONEncoder do DRF
+
+    As respostas com indentação ('application/json; indent=4') e os valores que o orjson não representa (como
+    inteiros maiores que 64 bits) são renderizados pelo JSONRenderer. O orjson escreve NaN e infinito como
+    'null', então essas respostas também são renderizadas pelo JSONRenderer, que gera o erro do STRICT_JSON
+    """
+
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        compatible = self.compact and not self.ensure_ascii
+
+        if not compatible or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            content = orjson.dumps(data, default=self.encoder.default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # os valores são percorridos somente quando a resposta possui algum 'null'
+        if b"null" in content and has_non_finite(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # assim como o JSONRenderer, escapa os separadores de linha e parágrafo, inválidos no javascript
+        if b"\xe2\x80\xa8" in content or b"\xe2\x80\xa9" in content:
+            content = content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+        return content
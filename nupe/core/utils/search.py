@@ -0,0 +1,80 @@
+import unicodedata
+
+from django.db.models import Case, IntegerField, Q, QuerySet, Value, When
+
+# quantidade máxima de termos considerados em uma busca
+MAX_SEARCH_TERMS = 5
+
+
+def normalize(text: str) -> str:
+    """
+    Normaliza um texto para a busca, removendo acentos, pontuação e diferenças entre maiúsculas e minúsculas.
+    A pontuação dentro de uma palavra é removida sem separa-la, então um cpf formatado vira somente números
+
+    Exemplo:
+        'João D'Ávila 123.456.789-09' -> 'joao davila 12345678909'
+
+    Retorna:
+        str: palavras normalizadas separadas por espaço
+    """
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    without_accents = "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+    words = ("".join(char for char in word if char.isalnum()) for word in without_accents.split())
+
+    return " ".join(word for word in words if word)
+
+
+def get_search_terms(query: str) -> list:
+    """
+    Retorna:
+        list: termos normalizados e sem repetição da busca, limitados a MAX_SEARCH_TERMS
+    """
+    return list(dict.fromkeys(normalize(query).split()))[:MAX_SEARCH_TERMS]
+
+
+def build_person_search_document(person) -> str:
+    """
+    Monta o documento de busca de uma pessoa, armazenado no atributo 'search_document'
+    """
+    return normalize(f"{person.first_name} {person.last_name} {person.cpf}")
+
+
+def search_queryset(queryset: QuerySet, terms: list, document: str, exact_fields: list) -> QuerySet:
+    """
+    Filtra os objetos em que todos os termos aparecem no documento de busca ou no início de um dos campos
+    exatos, e ordena pela relevância
+
+    A relevância de cada termo é maior quando o termo é igual a um campo exato (cpf, matrícula), seguido pelo
+    início do documento (primeiro nome), pelo início de uma palavra e por fim qualquer parte do documento
+
+    Argumentos:
+        queryset (QuerySet): queryset com o plano de consulta já aplicado
+
+        terms (list): termos normalizados da busca
+
+        document (str): caminho até o campo do documento de busca. Exemplo: 'person__search_document'
+
+        exact_fields (list): campos comparados diretamente com os termos. Exemplo: ['registration']
+
+    Retorna:
+        QuerySet: objetos encontrados, com a relevância no atributo 'search_rank'
+    """
+    rank = Value(0, output_field=IntegerField())
+
+    for term in terms:
+        term_filter = Q(**{f"{document}__icontains": term})
+        whens = []
+
+        for field in exact_fields:
+            term_filter |= Q(**{f"{field}__startswith": term})
+            whens.append(When(**{field: term}, then=Value(8)))
+
+        whens += [
+            When(**{f"{document}__startswith": term}, then=Value(4)),
+            When(**{f"{document}__icontains": f" {term}"}, then=Value(2)),
+        ]
+
+        queryset = queryset.filter(term_filter)
+        rank = rank + Case(*whens, default=Value(1), output_field=IntegerField())
+
+    return queryset.annotate(search_rank=rank).order_by("-search_rank", "pk")
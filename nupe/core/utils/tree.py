@@ -0,0 +1,67 @@
+from django.db.models import Q
+
+# separador dos ids no caminho materializado. Exemplo: '/1/5/12/'
+PATH_SEPARATOR = "/"
+
+
+def build_path(father_path: str, pk: int) -> str:
+    """
+    Monta o caminho materializado de um objeto a partir do caminho do pai
+
+    Argumentos:
+        father_path (str): caminho do pai, ou vazio/None para os objetos raízes
+
+        pk (int): chave primária do objeto
+
+    Retorna:
+        str: ids dos ancestrais e do próprio objeto. Exemplo: '/1/5/12/'
+    """
+    return f"{father_path or PATH_SEPARATOR}{pk}{PATH_SEPARATOR}"
+
+
+def build_paths(fathers: dict) -> dict:
+    """
+    Monta o caminho materializado de todos os objetos de uma árvore, percorrendo cada objeto somente uma vez
+
+    Argumentos:
+        fathers (dict): chave primária do pai de cada objeto, None para os objetos raízes
+
+    Retorna:
+        dict: caminho de cada objeto
+    """
+    paths = {}
+
+    for pk in fathers:
+        chain = []
+        current = pk
+
+        # sobe até um ancestral com o caminho já montado ou até a raiz, interrompendo os ciclos
+        while current is not None and current not in paths and current not in chain:
+            chain.append(current)
+            current = fathers.get(current)
+
+        path = paths.get(current, "")
+
+        for node in reversed(chain):
+            path = build_path(path, node)
+            paths[node] = path
+
+    return paths
+
+
+def subtree_filter(pk: int) -> Q:
+    """
+    Filtro do objeto e de todos os seus descendentes, em uma única consulta e sem conhecer o caminho do objeto
+
+    Argumentos:
+        pk (int): chave primária do ancestral
+    """
+    return Q(path__contains=f"{PATH_SEPARATOR}{pk}{PATH_SEPARATOR}")
+
+
+def in_subtree(path: str, pk: int) -> bool:
+    """
+    Verifica se o objeto com o caminho fornecido é o próprio ancestral ou um de seus descendentes, sem
+    consultas
+    """
+    return f"{PATH_SEPARATOR}{pk}{PATH_SEPARATOR}" in path
@@ -0,0 +1,130 @@
+from django.db.models import CharField, QuerySet, Value
+from django.db.models.functions import Concat
+from rest_framework.fields import DateTimeField
+from rest_framework.response import Response
+
+# campo sempre buscado junto das linhas, utilizado no desempate da paginação por cursor
+TIEBREAK_FIELD = "id"
+
+
+def full_name(prefix: str = "") -> Concat:
+    """
+    Expressão equivalente à property Person.full_name, calculada pelo banco de dados
+
+    Argumentos:
+        prefix (str): caminho até a pessoa. Exemplo: 'student__person__'
+    """
+    return Concat(f"{prefix}first_name", Value(" "), f"{prefix}last_name", output_field=CharField())
+
+
+def campus_name(institution: str, name: str):
+    """
+    Equivalente ao str() da model Campus
+
+    Retorna:
+        str: '<instituição> - <campus>', ou None caso não exista campus
+    """
+    if name is None:
+        return None
+
+    return f"{institution} - {name}"
+
+
+def datetime_representation(value):
+    """
+    Equivalente ao DateTimeField do DRF, no formato ISO 8601 e no mesmo fuso horário dos ModelSerializers
+
+    Retorna:
+        str: data e hora, ou None caso não exista
+    """
+    return DateTimeField().to_representation(value)
+
+
+def ordering_fields(queryset: QuerySet) -> list:
+    """
+    Campos da ordenação da queryset, que precisam estar nas linhas para que a paginação por cursor monte a
+    posição a partir delas
+
+    Retorna:
+        list: campos sem o prefixo '-', sempre com o campo de desempate
+    """
+    fields = [field.lstrip("-") for field in queryset.query.order_by if isinstance(field, str) and field != "?"]
+
+    return list(dict.fromkeys([*fields, TIEBREAK_FIELD]))
+
+
+class ValuesSerializer:
+    """
+    Serializer somente leitura das listagens, que busca somente as colunas necessárias com '.values()' e monta
+    os dicionários diretamente, sem instanciar as models nem percorrer os campos de um ModelSerializer. O
+    resultado deve ser idêntico ao do ModelSerializer equivalente
+
+    Atributos:
+        fields (dict): campo da resposta e o campo ou a expressão buscada na queryset. Exemplo:
+        {'id': 'id', 'full_name': full_name('person__')}
+
+        extra_fields (list): campos buscados somente para o 'to_representation', fora da resposta
+    """
+
+    fields = {}
+    extra_fields = []
+
+    def get_queryset(self, queryset: QuerySet) -> QuerySet:
+        """
+        Argumentos:
+            queryset (QuerySet): queryset filtrada e ordenada da view
+
+        Retorna:
+            QuerySet: linhas (dicionários) com os campos do serializer e os campos da ordenação
+        """
+        lookups, expressions = self.get_values()
+        lookups = [
+            field for field in dict.fromkeys([*lookups, *ordering_fields(queryset)]) if field not in expressions
+        ]
+
+        # as relações pré-carregadas dos ModelSerializers não se aplicam às linhas
+        return queryset.prefetch_related(None).values(*lookups, **expressions)
+
+    def get_values(self) -> tuple:
+        """
+        Retorna:
+            tuple: campos (list) e expressões (dict) buscados na queryset
+        """
+        lookups = [lookup for lookup in self.fields.values() if isinstance(lookup, str)]
+        expressions = {name: lookup for name, lookup in self.fields.items() if not isinstance(lookup, str)}
+
+        return [*lookups, *self.extra_fields], expressions
+
+    def to_representation(self, row: dict) -> dict:
+        return {name: row[lookup if isinstance(lookup, str) else name] for name, lookup in self.fields.items()}
+
+    def serialize(self, rows) -> list:
+        """
+        Retorna:
+            list: representação de todas as linhas
+        """
+        return [self.to_representation(row) for row in rows]
+
+
+class ValuesListMixin:
+    """
+    Mixin das viewsets que utiliza o ValuesSerializer da action, definido em 'per_action_values_serializer',
+    ao invés do ModelSerializer. Os filtros, a ordenação e as paginações da view continuam os mesmos
+    """
+
+    per_action_values_serializer = {}
+
+    def list(self, request, *args, **kwargs):
+        values_serializer_class = self.per_action_values_serializer.get(self.action)
+
+        if values_serializer_class is None:
+            return super().list(request, *args, **kwargs)
+
+        serializer = values_serializer_class()
+        rows = serializer.get_queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+
+        return Response(serializer.serialize(rows))
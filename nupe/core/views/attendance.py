@@ -1,20 +1,33 @@
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.status import HTTP_200_OK
 from rest_framework.viewsets import ModelViewSet
 
-from nupe.core.filters import AttendanceFilter
-from nupe.core.models import AccountAttendance, Attendance
+from nupe.core.filters import AttendanceFilter, AttendanceStatisticFilter
+from nupe.core.models import AccountAttendance, Attendance, AttendanceStatistic
 from nupe.core.serializers.attendance import (
     AttendanceCreateSerializer,
     AttendanceDetailSerializer,
     AttendanceListSerializer,
+    AttendanceListValuesSerializer,
     AttendanceReportSerializer,
+    AttendanceStatisticSerializer,
     MyAccountAttendanceSerializer,
 )
+from nupe.core.utils.export import EXPORT_CHUNK_SIZE, iterate_in_chunks, serializer_columns, stream_csv, stream_ndjson
+from nupe.core.utils.pagination import PageNumberKeysetPagination
+from nupe.core.utils.queries import prefetch_attendance_detail, prefetch_attendance_list, prefetch_attendance_report
+from nupe.core.utils.renderers import CSVRenderer, NDJSONRenderer
+from nupe.core.utils.values import ValuesListMixin
+from nupe.resources.messages.attendance import ATTENDANCE_STATISTIC_INVALID_GROUP_BY_MESSAGE
 
 
-class AttendanceViewSet(ModelViewSet):
+class AttendanceViewSet(ValuesListMixin, ModelViewSet):
     """
     list: retorna todas os atendimentos do banco de dados. RF.SIS.021, RF.SIS.022, RF.SIS.023, RF.SIS.026, RF.SIS.011,
     RF.SIS.012
@@ -28,9 +41,13 @@ class AttendanceViewSet(ModelViewSet):
     partial_update: atualiza um ou mais atributos de um atendimento. RF.SIS.024
 
     report: retorna um relatório completo de todos os atendimentos. RF.SIS.051, RF.SIS.052, RF.SIS.053, RF.SIS.054,
-    RF.SIS.055, RF.SIS.056
+    RF.SIS.055, RF.SIS.056. Com '?format=csv' ou '?format=ndjson' o relatório completo é exportado em um arquivo
 
     my: retorna todos os atendimentos realizados pelo usuário atual
+
+    stats: retorna a quantidade de atendimentos agrupados por mês, campus, motivo, severidade e/ou status, a partir
+    dos contadores pré-agregados da model AttendanceStatistic. RF.SIS.051, RF.SIS.052, RF.SIS.053, RF.SIS.054,
+    RF.SIS.055, RF.SIS.056. Exemplo: '?group_by=campus,month'
     """
 
     queryset = Attendance.objects.all()
@@ -52,8 +69,10 @@ class AttendanceViewSet(ModelViewSet):
         "closed_at",
     ]  # RF.SIS.023
     ordering = "attendance_severity"
+    pagination_class = PageNumberKeysetPagination  # ?pagination=cursor
 
     per_action_serializer = {"list": AttendanceListSerializer, "retrieve": AttendanceDetailSerializer}
+    per_action_values_serializer = {"list": AttendanceListValuesSerializer}
 
     http_method_names = ["get", "post", "patch", "delete"]
 
@@ -64,25 +83,111 @@ class AttendanceViewSet(ModelViewSet):
         "partial_update": ["core.change_attendance"],
         "destroy": ["core.delete_attendance"],
         "report": ["core.view_attendance"],
+        "stats": ["core.view_attendance"],
+    }
+
+    # a quantidade de consultas de cada action não depende da quantidade de atendimentos retornados
+    per_action_queryset = {
+        "list": prefetch_attendance_list(Attendance.objects.all()),
+        "retrieve": prefetch_attendance_detail(Attendance.objects.all()),
+        "report": prefetch_attendance_report(Attendance.objects.all()),
+        "my": prefetch_attendance_detail(AccountAttendance.objects.order_by("attendance_at"), prefix="attendance__"),
     }
 
+    def get_queryset(self):
+        return self.per_action_queryset.get(self.action, self.queryset).all()
+
     def get_serializer_class(self):
         return self.per_action_serializer.get(self.action, AttendanceCreateSerializer)
 
-    @action(detail=False)
+    export_chunk_size = EXPORT_CHUNK_SIZE
+
+    @action(detail=False, renderer_classes=[*api_settings.DEFAULT_RENDERER_CLASSES, CSVRenderer, NDJSONRenderer])
     @swagger_auto_schema(responses={HTTP_200_OK: AttendanceReportSerializer})
     def report(self, request):
         queryset = self.filter_queryset(queryset=self.get_queryset())
 
-        serializer = AttendanceReportSerializer(instance=queryset, many=True)
+        if request.accepted_renderer.format in [CSVRenderer.format, NDJSONRenderer.format]:
+            return self.__streaming_response(queryset=queryset, serializer_class=AttendanceReportSerializer)
 
-        return self.get_paginated_response(data=self.paginate_queryset(queryset=serializer.data))
+        return self.__paginated_response(queryset=queryset, serializer_class=AttendanceReportSerializer)
 
     @action(detail=False)
     @swagger_auto_schema(responses={HTTP_200_OK: MyAccountAttendanceSerializer})
     def my(self, request):
-        serializer = MyAccountAttendanceSerializer(
-            instance=AccountAttendance.objects.filter(account=request.user), many=True
-        )
+        queryset = self.get_queryset().filter(account=request.user)
+
+        return self.__paginated_response(queryset=queryset, serializer_class=MyAccountAttendanceSerializer)
+
+    statistic_group_by_query_param = "group_by"
+    statistic_group_by = ["month", "campus", "attendance_reason", "attendance_severity", "status"]
+
+    @action(detail=False)
+    @swagger_auto_schema(responses={HTTP_200_OK: AttendanceStatisticSerializer(many=True)})
+    def stats(self, request):
+        filterset = AttendanceStatisticFilter(data=request.query_params, queryset=AttendanceStatistic.objects.all())
+
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+
+        group_by = self.__get_statistic_group_by()
+        queryset = filterset.qs.values(*group_by).annotate(total=Sum("total")).filter(total__gt=0).order_by(*group_by)
+        serializer = AttendanceStatisticSerializer(instance=queryset, many=True)
+
+        return Response(serializer.data)
+
+    def __get_statistic_group_by(self) -> list:
+        """
+        Obtém os campos do agrupamento a partir do parâmetro 'group_by', separados por vírgula. Por padrão
+        todos os campos são utilizados
+
+        Raises:
+            ValidationError: caso algum dos campos não esteja disponível para agrupamento
+        """
+        param = self.request.query_params.get(self.statistic_group_by_query_param)
+
+        if not param:
+            return self.statistic_group_by
+
+        group_by = list(dict.fromkeys(field.strip() for field in param.split(",") if field.strip()))
+
+        if not group_by or any(field not in self.statistic_group_by for field in group_by):
+            message = ATTENDANCE_STATISTIC_INVALID_GROUP_BY_MESSAGE.format(", ".join(self.statistic_group_by))
+
+            raise ValidationError({self.statistic_group_by_query_param: [message]})
+
+        return group_by
+
+    def __paginated_response(self, *, queryset, serializer_class):
+        """
+        Serializa somente a página requisitada, caso a paginação esteja habilitada, para que as relações
+        pré-carregadas sejam buscadas apenas para os objetos retornados
+        """
+        page = self.paginate_queryset(queryset=queryset)
+
+        if page is not None:
+            serializer = serializer_class(instance=page, many=True)
+
+            return self.get_paginated_response(data=serializer.data)
+
+        serializer = serializer_class(instance=queryset, many=True)
+
+        return Response(serializer.data)
+
+    def __streaming_response(self, *, queryset, serializer_class):
+        """
+        Exporta todos os objetos da queryset sem paginação. Os objetos são buscados e serializados em blocos
+        enquanto o arquivo é enviado, então a memória utilizada não depende da quantidade de objetos
+        """
+        renderer = self.request.accepted_renderer
+        rows = (serializer_class(instance=obj).data for obj in iterate_in_chunks(queryset, self.export_chunk_size))
+
+        if renderer.format == CSVRenderer.format:
+            content = stream_csv(rows, serializer_columns(serializer_class()))
+        else:
+            content = stream_ndjson(rows)
+
+        response = StreamingHttpResponse(content, content_type=f"{renderer.media_type}; charset={renderer.charset}")
+        response["Content-Disposition"] = f'attachment; filename="{self.basename}_{self.action}.{renderer.format}"'
 
-        return self.get_paginated_response(data=self.paginate_queryset(queryset=serializer.data))
+        return response
@@ -8,9 +8,11 @@ from nupe.core.serializers.course import (
     AcademicEducationListSerializer,
     GradeSerializer,
 )
+from nupe.core.utils.cache import CachedResponseMixin
+from nupe.core.utils.queries import prefetch_academic_education_detail, prefetch_academic_education_list
 
 
-class GradeViewSet(ModelViewSet):
+class GradeViewSet(CachedResponseMixin, ModelViewSet):
     """
     list: retorna todos os graus do banco de dados. RF.SIS.035, RF.SIS.036, RF.SIS.037, RF.SIS.038
 
@@ -24,6 +26,7 @@ class GradeViewSet(ModelViewSet):
     """
 
     queryset = Grade.objects.all()
+    cache_models = [Grade, AcademicEducation]  # AcademicEducation: filtro 'academic_education_name'
     serializer_class = GradeSerializer
     filterset_class = GradeFilter
     search_fields = ["name"]  # RF.SIS.037
@@ -77,5 +80,14 @@ class AcademicEducationViewSet(ModelViewSet):
         "destroy": ["core.delete_academiceducation"],
     }
 
+    # a quantidade de consultas de cada action não depende da quantidade de formações acadêmicas retornadas
+    per_action_queryset = {
+        "list": prefetch_academic_education_list(AcademicEducation.objects.all()),
+        "retrieve": prefetch_academic_education_detail(AcademicEducation.objects.all()),
+    }
+
+    def get_queryset(self):
+        return self.per_action_queryset.get(self.action, self.queryset).all()
+
     def get_serializer_class(self):
         return self.per_action_serializer.get(self.action)
@@ -8,9 +8,11 @@ from nupe.core.serializers.institution import (
     CampusListSerializer,
     InstitutionSerializer,
 )
+from nupe.core.utils.cache import CachedResponseMixin
+from nupe.core.utils.queries import prefetch_campus_detail, prefetch_campus_list
 
 
-class InstitutionViewSet(ModelViewSet):
+class InstitutionViewSet(CachedResponseMixin, ModelViewSet):
     """
     list: retorna todas as instituições do banco de dados
 
@@ -24,6 +26,7 @@ class InstitutionViewSet(ModelViewSet):
     """
 
     queryset = Institution.objects.all()
+    cache_models = [Institution, Campus]  # Campus: filtro 'campus_name'
     serializer_class = InstitutionSerializer
     filterset_class = InstitutionFilter
     search_fields = ["name"]
@@ -77,5 +80,14 @@ class CampusViewSet(ModelViewSet):
         "destroy": ["core.delete_campus"],
     }
 
+    # a quantidade de consultas de cada action não depende da quantidade de campi retornados
+    per_action_queryset = {
+        "list": prefetch_campus_list(Campus.objects.all()),
+        "retrieve": prefetch_campus_detail(Campus.objects.all()),
+    }
+
+    def get_queryset(self):
+        return self.per_action_queryset.get(self.action, self.queryset).all()
+
     def get_serializer_class(self):
         return self.per_action_serializer.get(self.action)
@@ -4,16 +4,19 @@ from rest_framework.viewsets import GenericViewSet
 from nupe.core.filters import CityFilter, LocationFilter, StateFilter
 from nupe.core.models import City, Location, State
 from nupe.core.serializers.location import CitySerializer, LocationSerializer, StateSerializer
+from nupe.core.utils.cache import CachedResponseMixin
+from nupe.core.utils.queries import prefetch_location
 
 
-class LocationViewSet(GenericViewSet, ListModelMixin, RetrieveModelMixin):
+class LocationViewSet(CachedResponseMixin, GenericViewSet, ListModelMixin, RetrieveModelMixin):
     """
     list: retorna todas as localizações do banco de dados
 
     retrieve: retorna uma localização especifica do banco de dados
     """
 
-    queryset = Location.objects.all()
+    queryset = prefetch_location(Location.objects.all())
+    cache_models = [Location, City, State]
     serializer_class = LocationSerializer
     filterset_class = LocationFilter
     ordering = "city__name"
@@ -24,7 +27,7 @@ class LocationViewSet(GenericViewSet, ListModelMixin, RetrieveModelMixin):
     }
 
 
-class CityViewSet(GenericViewSet, ListModelMixin, RetrieveModelMixin):
+class CityViewSet(CachedResponseMixin, GenericViewSet, ListModelMixin, RetrieveModelMixin):
     """
     list: retorna todas as cidades do banco de dados
 
@@ -32,6 +35,7 @@ class CityViewSet(GenericViewSet, ListModelMixin, RetrieveModelMixin):
     """
 
     queryset = City.objects.all()
+    cache_models = [City]
     serializer_class = CitySerializer
     filterset_class = CityFilter
     ordering = "name"
@@ -42,7 +46,7 @@ class CityViewSet(GenericViewSet, ListModelMixin, RetrieveModelMixin):
     }
 
 
-class StateViewSet(GenericViewSet, ListModelMixin, RetrieveModelMixin):
+class StateViewSet(CachedResponseMixin, GenericViewSet, ListModelMixin, RetrieveModelMixin):
     """
     list: retorna todas os estados do banco de dados
 
@@ -50,6 +54,7 @@ class StateViewSet(GenericViewSet, ListModelMixin, RetrieveModelMixin):
     """
 
     queryset = State.objects.all()
+    cache_models = [State]
     serializer_class = StateSerializer
     filterset_class = StateFilter
     ordering = "name"
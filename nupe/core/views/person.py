@@ -1,11 +1,24 @@
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.status import HTTP_200_OK
 from rest_framework.viewsets import ModelViewSet
 
 from nupe.core.filters import PersonFilter
 from nupe.core.models import Person
-from nupe.core.serializers.person import PersonCreateSerializer, PersonDetailSerializer, PersonListSerializer
+from nupe.core.serializers.person import (
+    PersonCreateSerializer,
+    PersonDetailSerializer,
+    PersonListSerializer,
+    PersonListValuesSerializer,
+)
+from nupe.core.utils.pagination import PageNumberKeysetPagination, SearchPagination
+from nupe.core.utils.search import get_search_terms, search_queryset
+from nupe.core.utils.values import ValuesListMixin
+from nupe.resources.messages.search import SEARCH_WITHOUT_TERMS_MESSAGE
 
 
-class PersonViewSet(ModelViewSet):
+class PersonViewSet(ValuesListMixin, ModelViewSet):
     """
     list: retorna todas as pessoas do banco de dados
 
@@ -16,6 +29,8 @@ class PersonViewSet(ModelViewSet):
     destroy: exclui uma pessoa do banco de dados
 
     partial_update: atualiza um ou mais atributos de uma pessoa
+
+    search: busca pessoas pelo nome ou cpf, sem diferenciar acentos, ordenadas pela relevância. Exemplo: '?q=joao'
     """
 
     queryset = Person.objects.all()
@@ -24,13 +39,16 @@ class PersonViewSet(ModelViewSet):
     search_fields = ["first_name", "last_name"]
     ordering_fields = ["first_name", "last_name"]
     ordering = ["first_name", "last_name"]
+    pagination_class = PageNumberKeysetPagination  # ?pagination=cursor
 
     per_action_serializer = {
         "list": PersonListSerializer,
         "retrieve": PersonDetailSerializer,
         "create": PersonCreateSerializer,
         "partial_update": PersonCreateSerializer,
+        "search": PersonListSerializer,
     }
+    per_action_values_serializer = {"list": PersonListValuesSerializer}
 
     http_method_names = ["get", "post", "patch", "delete"]
 
@@ -40,7 +58,28 @@ class PersonViewSet(ModelViewSet):
         "create": ["core.add_person"],
         "partial_update": ["core.change_person"],
         "destroy": ["core.delete_person"],
+        "search": ["core.view_person"],
     }
 
+    search_query_param = "q"
+    search_pagination_class = SearchPagination
+
     def get_serializer_class(self):
         return self.per_action_serializer.get(self.action)
+
+    @action(detail=False)
+    @swagger_auto_schema(responses={HTTP_200_OK: PersonListSerializer(many=True)})
+    def search(self, request):
+        terms = get_search_terms(request.query_params.get(self.search_query_param, ""))
+
+        if not terms:
+            raise ValidationError({self.search_query_param: [SEARCH_WITHOUT_TERMS_MESSAGE]})
+
+        queryset = search_queryset(self.get_queryset(), terms, document="search_document", exact_fields=[])
+
+        # a paginação da view reordenaria o modo cursor pelo atributo 'ordering', descartando a relevância
+        paginator = self.search_pagination_class()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(instance=page, many=True)
+
+        return paginator.get_paginated_response(data=serializer.data)
@@ -1,8 +1,10 @@
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
 from nupe.core.filters import AttendanceReasonFilter
 from nupe.core.models import AttendanceReason
-from nupe.core.serializers.reason import AttendanceReasonSerializer
+from nupe.core.serializers.reason import AttendanceReasonSerializer, AttendanceReasonTreeSerializer
 
 
 class AttendanceReasonViewSet(ModelViewSet):
@@ -16,6 +18,9 @@ class AttendanceReasonViewSet(ModelViewSet):
     destroy: exclui um motivo de atendimento do banco de dados
 
     partial_update: atualiza um ou mais atributos de um motivo de atendimento
+
+    tree: retorna a árvore completa dos motivos de atendimento, com os filhos aninhados em 'sons_reasons', em
+    uma única consulta. Com '?ancestor=<id>' retorna somente a subárvore do motivo fornecido
     """
 
     queryset = AttendanceReason.objects.all()
@@ -33,6 +38,7 @@ class AttendanceReasonViewSet(ModelViewSet):
         "create": ["core.add_attendancereason"],
         "partial_update": ["core.change_attendancereason"],
         "destroy": ["core.delete_attendancereason"],
+        "tree": ["core.view_attendancereason"],
     }
 
     per_action_queryset = {
@@ -40,4 +46,11 @@ class AttendanceReasonViewSet(ModelViewSet):
     }
 
     def get_queryset(self):
-        return self.per_action_queryset.get(self.action, self.queryset)
+        return self.per_action_queryset.get(self.action, self.queryset).all()
+
+    @action(detail=False)
+    def tree(self, request):
+        serializer = AttendanceReasonTreeSerializer()
+        rows = serializer.get_queryset(self.filter_queryset(queryset=self.get_queryset()))
+
+        return Response(serializer.serialize(rows))
@@ -1,11 +1,28 @@
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK, HTTP_201_CREATED
 from rest_framework.viewsets import ModelViewSet
 
 from nupe.core.filters import StudentFilter
-from nupe.core.models import Student
-from nupe.core.serializers.student import StudentCreateSerializer, StudentDetailSerializer, StudentListSerializer
+from nupe.core.models import Attendance, Student
+from nupe.core.serializers.attendance import AttendanceTimelineValuesSerializer
+from nupe.core.serializers.student import (
+    StudentBulkCreateSerializer,
+    StudentCreateSerializer,
+    StudentDetailSerializer,
+    StudentListSerializer,
+    StudentListValuesSerializer,
+)
+from nupe.core.utils.pagination import AttendanceTimelinePagination, PageNumberKeysetPagination, SearchPagination
+from nupe.core.utils.queries import prefetch_student_list
+from nupe.core.utils.search import get_search_terms, search_queryset
+from nupe.core.utils.values import ValuesListMixin
+from nupe.resources.messages.search import SEARCH_WITHOUT_TERMS_MESSAGE
 
 
-class StudentViewSet(ModelViewSet):
+class StudentViewSet(ValuesListMixin, ModelViewSet):
     """
     list: retorna todos os estudantes do banco de dados. RF.SIS.042, RF.SIS.043, RF.SIS.044, RF.SIS.045
 
@@ -16,6 +33,15 @@ class StudentViewSet(ModelViewSet):
     destroy: exclui um estudante do banco de dados. RF.SIS.050
 
     partial_update: atualiza um ou mais atributos de um estudante. RF.SIS.049
+
+    search: busca estudantes pelo nome, cpf ou matrícula, sem diferenciar acentos, ordenados pela relevância.
+    Exemplo: '?q=joao 2020'. RF.SIS.044
+
+    bulk_create: cadastra uma lista de estudantes em uma única transação, caso algum estudante seja inválido
+    nenhum é cadastrado e os erros são retornados na mesma posição do estudante na lista. RF.SIS.041
+
+    timeline: retorna os atendimentos do estudante com as anotações públicas dos atendentes, dos mais recentes
+    para os mais antigos, paginados por cursor
     """
 
     queryset = Student.objects.all()
@@ -24,13 +50,17 @@ class StudentViewSet(ModelViewSet):
     search_fields = ["person__first_name", "person__last_name"]  # RF.SIS.044
     ordering_fields = ["registration", "person__first_name", "person__last_name"]  # RF.SIS.045
     ordering = ["person__first_name", "person__last_name"]
+    pagination_class = PageNumberKeysetPagination  # ?pagination=cursor
 
     per_action_serializer = {
         "list": StudentListSerializer,
         "retrieve": StudentDetailSerializer,
         "create": StudentCreateSerializer,
         "partial_update": StudentCreateSerializer,
+        "search": StudentListSerializer,
+        "bulk_create": StudentBulkCreateSerializer,
     }
+    per_action_values_serializer = {"list": StudentListValuesSerializer}
 
     http_method_names = ["get", "post", "patch", "delete"]
 
@@ -40,7 +70,60 @@ class StudentViewSet(ModelViewSet):
         "create": ["core.add_student"],
         "partial_update": ["core.change_student"],
         "destroy": ["core.delete_student"],
+        "search": ["core.view_student"],
+        "bulk_create": ["core.add_student"],
+        "timeline": ["core.view_student", "core.view_attendance"],
     }
 
+    search_query_param = "q"
+    search_pagination_class = SearchPagination
+    timeline_pagination_class = AttendanceTimelinePagination
+
     def get_serializer_class(self):
         return self.per_action_serializer.get(self.action)
+
+    @action(detail=False)
+    @swagger_auto_schema(responses={HTTP_200_OK: StudentListSerializer(many=True)})
+    def search(self, request):
+        terms = get_search_terms(request.query_params.get(self.search_query_param, ""))
+
+        if not terms:
+            raise ValidationError({self.search_query_param: [SEARCH_WITHOUT_TERMS_MESSAGE]})
+
+        queryset = search_queryset(
+            prefetch_student_list(self.get_queryset()),
+            terms,
+            document="person__search_document",
+            exact_fields=["registration"],
+        )
+
+        # a paginação da view reordenaria o modo cursor pelo atributo 'ordering', descartando a relevância
+        paginator = self.search_pagination_class()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(instance=page, many=True)
+
+        return paginator.get_paginated_response(data=serializer.data)
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    @swagger_auto_schema(
+        request_body=StudentBulkCreateSerializer(many=True),
+        responses={HTTP_201_CREATED: StudentBulkCreateSerializer(many=True)},
+    )
+    def bulk_create(self, request):
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        return Response(serializer.data, status=HTTP_201_CREATED)
+
+    @action(detail=True)
+    def timeline(self, request, registration=None):
+        student = self.get_object()
+
+        serializer = AttendanceTimelineValuesSerializer()
+        rows = serializer.get_queryset(Attendance.objects.filter(student=student))
+
+        paginator = self.timeline_pagination_class()
+        page = paginator.paginate_queryset(rows, request, view=self)
+
+        return paginator.get_paginated_response(serializer.serialize(page))
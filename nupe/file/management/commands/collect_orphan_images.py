@@ -0,0 +1,177 @@
+import glob
+import os
+import posixpath
+from functools import reduce
+from operator import or_
+from time import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from nupe.file.models import ImageBlob
+from nupe.file.utils.processing import get_original_root, get_variants_names
+from nupe.file.utils.storage import TEMPORARY_PREFIX, read_tombstones, write_tombstones
+
+
+class Command(BaseCommand):
+    """
+    Remove os arquivos de imagens que não são mais utilizados, em duas etapas:
+
+    1. os arquivos registrados no log de tombstones (IMAGE_TOMBSTONE_LOG) pelas remoções de imagens, junto com
+    as suas variantes
+
+    2. os arquivos do diretório MEDIA_ROOT/images/profiles/ sem nenhuma referência (ImageBlob), como uploads
+    interrompidos e variantes de imagens removidas antes do log
+
+    Os arquivos são verificados em blocos, com uma consulta por bloco. Arquivos e registros mais recentes que
+    '--min-age' segundos são mantidos, já que podem pertencer a um upload ou a uma transação em andamento
+
+    Exemplo:
+        ./manage.py collect_orphan_images --batch-size 1000
+    """
+
+    help = "Remove os arquivos de imagens sem referência"
+
+    IMAGES_DIRECTORY = "images/profiles"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="quantidade de arquivos por consulta")
+        parser.add_argument("--min-age", type=float, default=3600, help="idade mínima em segundos dos arquivos")
+        parser.add_argument("--dry-run", action="store_true", help="somente lista os arquivos, sem remove-los")
+
+    def handle(self, *args, **options):
+        self.batch_size = options["batch_size"]
+        self.dry_run = options["dry_run"]
+        deadline = time() - options["min_age"]
+
+        removed = self.collect_tombstones(deadline) + self.sweep(deadline)
+
+        self.stdout.write(f"{removed} arquivos {'sem referência' if self.dry_run else 'removidos'}")
+
+    def collect_tombstones(self, deadline: float) -> int:
+        """
+        O log é renomeado antes da leitura, então os registros feitos durante a coleta vão para um novo log.
+        Logs renomeados de uma execução interrompida também são lidos
+
+        Assim como na etapa 'sweep', os arquivos modificados depois de 'deadline' são mantidos (um upload do mesmo
+        conteúdo atualiza a data de modificação) e os seus registros voltam para o log
+
+        Retorna:
+            int: quantidade de arquivos removidos
+        """
+        log = settings.IMAGE_TOMBSTONE_LOG
+
+        if self.dry_run:
+            taken = [log] if os.path.exists(log) else []
+        else:
+            if os.path.exists(log):
+                os.replace(log, f"{log}.{uuid4().hex}.taken")
+
+            taken = sorted(glob.glob(f"{glob.escape(log)}.*.taken"))
+
+        entries = [entry for path in taken for entry in read_tombstones(path)]
+        names = list(dict.fromkeys(name for timestamp, name in entries if timestamp <= deadline))
+        recent = set()
+        removed = 0
+
+        for start in range(0, len(names), self.batch_size):
+            batch = names[start : start + self.batch_size]
+
+            # o mesmo conteúdo pode ter sido enviado novamente depois da remoção
+            referenced = set(ImageBlob.objects.filter(name__in=batch).values_list("name", flat=True))
+
+            for name in batch:
+                if name in referenced:
+                    continue
+
+                if self.is_recent(name, deadline):
+                    recent.add(name)
+                else:
+                    removed += self.remove_unreferenced(name)
+
+        if not self.dry_run:
+            write_tombstones([entry for entry in entries if entry[0] > deadline or entry[1] in recent])
+
+            for path in taken:
+                os.remove(path)
+
+        return removed
+
+    def is_recent(self, name: str, deadline: float) -> bool:
+        try:
+            return os.stat(default_storage.path(name)).st_mtime > deadline
+        except FileNotFoundError:
+            return False
+
+    def remove_unreferenced(self, name: str) -> int:
+        """
+        Remove o arquivo e as suas variantes, verificando novamente a referência logo antes da remoção, já que
+        um upload do mesmo conteúdo pode ter sido concluído depois da consulta do bloco
+
+        Retorna:
+            int: quantidade de arquivos existentes removidos
+        """
+        if ImageBlob.objects.filter(name=name).exists():
+            return 0
+
+        return self.remove([name, *get_variants_names(name)])
+
+    def sweep(self, deadline: float) -> int:
+        """
+        Retorna:
+            int: quantidade de arquivos removidos
+        """
+        directory = default_storage.path(self.IMAGES_DIRECTORY)
+
+        if not os.path.isdir(directory):
+            return 0
+
+        removed = 0
+        batch = []
+
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.stat().st_mtime <= deadline:
+                    batch.append(posixpath.join(self.IMAGES_DIRECTORY, entry.name))
+
+                if len(batch) >= self.batch_size:
+                    removed += self.sweep_batch(batch)
+                    batch = []
+
+        return removed + self.sweep_batch(batch)
+
+    def sweep_batch(self, names: list) -> int:
+        temporaries = [name for name in names if posixpath.basename(name).startswith(TEMPORARY_PREFIX)]
+        roots = {name: get_original_root(name) for name in names if name not in temporaries}
+
+        if not roots:
+            return self.remove(temporaries)
+
+        # o path das imagens originais é a raiz seguida da extensão
+        query = reduce(or_, (Q(name__startswith=f"{root}.") for root in set(roots.values())))
+        referenced = {
+            os.path.splitext(name)[0] for name in ImageBlob.objects.filter(query).values_list("name", flat=True)
+        }
+
+        return self.remove(temporaries + [name for name, root in roots.items() if root not in referenced])
+
+    def remove(self, names: list) -> int:
+        """
+        Retorna:
+            int: quantidade de arquivos existentes removidos
+        """
+        removed = 0
+
+        for name in names:
+            if default_storage.exists(name):
+                removed += 1
+
+                if self.dry_run:
+                    self.stdout.write(name)
+                else:
+                    default_storage.delete(name)
+
+        return removed
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from nupe.file.models import ProfileImage
+from nupe.file.utils.processing import process_image
+
+
+class Command(BaseCommand):
+    """
+    Gera as variantes das imagens que ainda não foram processadas, como as imagens enviadas antes do
+    processamento em segundo plano ou enviadas enquanto um processo foi reiniciado. Com '--failed' as
+    imagens que falharam também são processadas novamente, e com '--all' todas as imagens
+
+    Exemplo:
+        ./manage.py process_images --failed
+    """
+
+    help = "Gera as variantes das imagens pendentes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--failed", action="store_true", help="processa também as imagens que falharam")
+        parser.add_argument("--all", action="store_true", help="processa todas as imagens")
+
+    def handle(self, *args, **options):
+        queryset = ProfileImage.objects.order_by("pk")
+
+        if not options["all"]:
+            status = [ProfileImage.PENDING, ProfileImage.FAILED] if options["failed"] else [ProfileImage.PENDING]
+            queryset = queryset.filter(status__in=status)
+
+        processed = 0
+
+        for profile_image in queryset.iterator():
+            process_image(profile_image)
+            processed += profile_image.status == ProfileImage.PROCESSED
+
+        self.stdout.write(f"{processed} imagens processadas")
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.28 on 2026-10-18 15:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("file", "0001_add__profile_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profileimage",
+            name="status",
+            field=models.CharField(
+                choices=[("P", "Pendente"), ("D", "Processada"), ("F", "Falhou")],
+                default="P",
+                help_text="Pendente = P, Processada = D, Falhou = F",
+                max_length=1,
+            ),
+        ),
+    ]
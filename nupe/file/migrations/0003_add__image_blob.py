@@ -0,0 +1,91 @@
+# Generated by Django 2.2.28 on 2026-10-18 15:49
+
+import hashlib
+import os
+from time import time
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import migrations, models, transaction
+
+# cópia de 'nupe.file.utils.storage.HASH_ALGORITHM' no momento desta migration
+HASH_ALGORITHM = "sha256"
+
+
+def write_tombstones(names: list):
+    """
+    Registra os arquivos repetidos no log de tombstones, no mesmo formato de 'nupe.file.utils.storage', para
+    que sejam removidos junto com as suas variantes pelo comando collect_orphan_images
+    """
+    if not names:
+        return
+
+    log = settings.IMAGE_TOMBSTONE_LOG
+    os.makedirs(os.path.dirname(log), exist_ok=True)
+
+    with open(log, "a", encoding="utf-8") as file:
+        file.write("".join(f"{time()!r}\t{name}\n" for name in names))
+
+
+def create_image_blobs(apps, schema_editor):
+    """
+    Cria as referências das imagens já enviadas, mantendo o path dos arquivos. As imagens com o mesmo conteúdo
+    passam a utilizar o mesmo arquivo, e os arquivos repetidos (e as suas variantes) são removidos depois pelo
+    comando collect_orphan_images, somente se a migration for concluída
+    """
+    ImageBlob = apps.get_model("file", "ImageBlob")
+    ProfileImage = apps.get_model("file", "ProfileImage")
+    blobs = {}
+    duplicates = []
+
+    for profile_image in ProfileImage.objects.order_by("pk").iterator():
+        name = profile_image.image.name
+
+        if not default_storage.exists(name):
+            continue
+
+        digest = hashlib.new(HASH_ALGORITHM)
+
+        with default_storage.open(name, "rb") as file:
+            for chunk in file.chunks():
+                digest.update(chunk)
+
+        blob = blobs.get(digest.hexdigest())
+
+        if blob is None:
+            blob = ImageBlob.objects.create(digest=digest.hexdigest(), name=name, size=default_storage.size(name))
+            blobs[blob.digest] = blob
+        elif blob.name != name:
+            duplicates.append(name)
+
+            # as variantes do arquivo reaproveitado são verificadas pelo comando process_images
+            ProfileImage.objects.filter(pk=profile_image.pk).update(image=blob.name, status="P")
+
+        ImageBlob.objects.filter(pk=blob.pk).update(references=models.F("references") + 1)
+
+    # os arquivos continuam referenciados pelas imagens caso a transação da migration seja desfeita
+    transaction.on_commit(
+        lambda: write_tombstones(list(dict.fromkeys(duplicates))), using=schema_editor.connection.alias
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("file", "0002_add__image_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImageBlob",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("digest", models.CharField(max_length=64, unique=True)),
+                ("name", models.CharField(max_length=255, unique=True)),
+                ("size", models.PositiveIntegerField()),
+                ("references", models.IntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunPython(create_image_blobs, reverse_code=migrations.RunPython.noop),
+    ]
@@ -1 +1 @@
-from nupe.file.models.image_upload import Image, ProfileImage
+from nupe.file.models.image_upload import Image, ImageBlob, ProfileImage
@@ -1,30 +1,153 @@
-import os
+from collections import Counter
 from mimetypes import guess_extension
 from secrets import token_urlsafe
 
-from django.db import models
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from django.db.models import DO_NOTHING, SET_NULL, Case, F, IntegerField, Value, When
+
+from nupe.file.utils.processing import IMAGE_FORMATS, IMAGE_VARIANTS, get_variant_name, strip_metadata
+from nupe.file.utils.storage import append_tombstones, write_content_addressed
 
 
 def make_path_image(instance, _) -> str:
     """
-    Define uma máscara para o path onde a imagem será armazenada e acessada
+    Define uma máscara para o path onde a imagem será armazenada e acessada. O nome do arquivo é substituído
+    pelo hash do conteúdo ao armazenar a imagem (ImageBlobManager.store)
 
     Retorna:
         str: path com o nome mascarado
     """
     extension = guess_extension(instance.image.file.content_type)
 
-    if extension == ".jpe":
+    # a extensão retornada para o 'image/jpeg' depende da versão do python
+    if extension in [".jpe", ".jpg"]:
         extension = ".jpeg"
 
         # if type(instance) is ProfileImage: para futuras models
     return f"images/profiles/{instance.public_id}{extension}"
 
 
+class ImageBlobManager(models.Manager):
+    def store(self, file, name: str):
+        """
+        Armazena o conteúdo de um arquivo enviado pelo hash, reaproveitando o arquivo caso o mesmo conteúdo
+        já tenha sido enviado, e incrementa a quantidade de referências. O registro do arquivo é bloqueado até o
+        fim da transação, então uma remoção concorrente (release) espera o incremento, ou termina antes e o
+        registro é criado novamente
+
+        Argumentos:
+            file (File): arquivo enviado
+
+            name (str): path sugerido para o arquivo (make_path_image)
+
+        Retorna:
+            ImageBlob: objeto com o path do arquivo armazenado
+        """
+        name, digest, size = write_content_addressed(file, name, default_storage)
+
+        with transaction.atomic():
+            blob, created = self.select_for_update().get_or_create(
+                digest=digest, defaults={"name": name, "size": size, "references": 1}
+            )
+
+            if not created:
+                self.filter(pk=blob.pk).update(references=F("references") + 1)
+
+        return blob
+
+    def release(self, names: list):
+        """
+        Decrementa as referências dos arquivos em uma única consulta. Os arquivos que não possuem mais
+        nenhuma referência são registrados no log de tombstones, e são removidos junto com as suas variantes
+        pelo comando collect_orphan_images. Os registros são bloqueados (em ordem) até o fim da transação, então
+        um store concorrente do mesmo conteúdo espera a remoção
+
+        Argumentos:
+            names (list): path dos arquivos das imagens removidas, repetido para cada referência
+        """
+        quantities = Counter(name for name in names if name)
+
+        if not quantities:
+            return
+
+        decrement = Case(
+            *[When(name=name, then=Value(quantity)) for name, quantity in quantities.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        with transaction.atomic():
+            pks = list(
+                self.select_for_update().filter(name__in=quantities).order_by("pk").values_list("pk", flat=True)
+            )
+            self.filter(pk__in=pks).update(references=F("references") - decrement)
+
+            orphans = list(self.filter(pk__in=pks, references__lte=0).values_list("pk", "name"))
+
+            self.filter(pk__in=[pk for pk, _ in orphans]).delete()
+            append_tombstones([name for _, name in orphans])
+
+
+class ImageBlob(models.Model):
+    """
+    Define o conteúdo de uma imagem armazenado uma única vez, identificado pelo hash. As imagens com o mesmo
+    conteúdo compartilham o arquivo, que é removido quando a última imagem que o referencia é removida
+
+    Exemplo:
+        'images/profiles/<sha256>.jpeg (2 referências)'
+
+    Atributos:
+        digest: hash (sha256) do conteúdo
+
+        name: path do arquivo
+
+        size: tamanho do arquivo em bytes
+
+        references: quantidade de imagens que utilizam o arquivo
+
+        created_at: data/hora de criação
+    """
+
+    digest = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveIntegerField()
+    references = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ImageBlobManager()
+
+    def __str__(self):
+        return f"{self.name} ({self.references} referências)"
+
+
 class ImageQuerySet(models.QuerySet):
-    def delete(self, *args, **kwargs):
-        for image in self:
-            image.image.delete()
+    def delete(self):
+        """
+        Remove os objetos em uma única consulta, sem carregar cada objeto, e libera as referências aos arquivos
+        das imagens. As relações com on_delete=SET_NULL são atualizadas com uma consulta por relação e os
+        signals de remoção não são enviados. Os arquivos são removidos depois, pelo comando
+        collect_orphan_images
+        """
+        assert self.query.can_filter(), "Cannot use 'limit' or 'offset' with delete."
+
+        relations = [relation for relation in self.model._meta.related_objects if relation.on_delete != DO_NOTHING]
+
+        # outras regras de remoção (CASCADE, PROTECT) dependem do Collector do Django
+        if any(relation.on_delete != SET_NULL for relation in relations):
+            return super().delete()
+
+        with transaction.atomic():
+            names = list(self.values_list("image", flat=True))
+            pks = self.values("pk")
+
+            for relation in relations:
+                field_name = relation.field.name
+                relation.related_model._base_manager.filter(**{f"{field_name}__in": pks}).update(**{field_name: None})
+
+            deleted = self._chain()._raw_delete(using=self.db)
+            ImageBlob.objects.release(names)
+
+        return deleted, {self.model._meta.label: deleted}
 
 
 class ImageManager(models.Manager):
@@ -50,10 +173,24 @@ class Image(models.Model):
 
         updated_at: data/hora de atualização
 
+        status: status do processamento das variantes da imagem
+
     Propriedades:
-        url: url de acesso à imagem
+        url: url de acesso à imagem original
+
+        variants: url de acesso de cada variante (tamanho e formato) da imagem
     """
 
+    PENDING = "P"
+    PROCESSED = "D"
+    FAILED = "F"
+
+    STATUS_CHOICES = [
+        (PENDING, "Pendente"),
+        (PROCESSED, "Processada"),
+        (FAILED, "Falhou"),
+    ]
+
     image = models.ImageField(upload_to=make_path_image)
     attachment_id = models.CharField(
         max_length=255,
@@ -69,6 +206,9 @@ class Image(models.Model):
     )
     uploaded_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    status = models.CharField(
+        max_length=1, choices=STATUS_CHOICES, default=PENDING, help_text="Pendente = P, Processada = D, Falhou = F"
+    )
 
     objects = ImageManager()
 
@@ -78,18 +218,66 @@ class Image(models.Model):
     def __str__(self):
         return self.url
 
+    def save(self, *args, **kwargs):
+        """
+        Uma nova imagem é armazenada pelo hash do conteúdo antes de salvar o objeto, reaproveitando o arquivo
+        caso o mesmo conteúdo já tenha sido enviado. Os metadados são removidos antes do cálculo do hash, já
+        que a url da imagem original também é pública
+        """
+        with transaction.atomic():
+            previous_name = None
+
+            if self.image and not self.image._committed:
+                if self.pk is not None:
+                    previous_name = type(self).objects.filter(pk=self.pk).values_list("image", flat=True).first()
+
+                name = make_path_image(self, self.image.name)
+                self.image.name = ImageBlob.objects.store(strip_metadata(self.image.file), name).name
+                self.image._committed = True
+
+            super().save(*args, **kwargs)
+
+            # a referência anterior é liberada mesmo quando o conteúdo enviado é o mesmo, já que o store adicionou
+            # uma nova referência ao arquivo
+            ImageBlob.objects.release([previous_name])
+
     def delete(self, using=None, keep_parents=False):
         """
-        Antes de remover o objeto, a imagem é removida do diretório
+        Após remover o objeto, a referência ao arquivo da imagem é liberada. O arquivo é removido do diretório
+        somente quando nenhuma outra imagem possui o mesmo conteúdo
         """
-        os.remove(self.image.path)
+        with transaction.atomic():
+            deleted = super().delete(using=using, keep_parents=keep_parents)
+            ImageBlob.objects.release([self.image.name])
 
-        return super().delete(using=using, keep_parents=keep_parents)
+        return deleted
 
     @property
     def url(self):
         return self.image.url
 
+    @property
+    def variants(self):
+        """
+        Exemplo:
+            {'thumbnail': {'webp': '/media/images/profiles/foo_thumbnail.webp', 'jpeg': ...}, 'medium': {...}}
+
+        Retorna:
+            dict: url de cada variante por tamanho e formato, ou None enquanto a imagem não foi processada
+        """
+        if self.status != self.PROCESSED:
+            return None
+
+        storage = self.image.storage
+
+        return {
+            variant: {
+                extension: storage.url(get_variant_name(self.image.name, variant, extension))
+                for extension in IMAGE_FORMATS
+            }
+            for variant in IMAGE_VARIANTS
+        }
+
 
 class ProfileImage(Image):
     """
@@ -16,10 +16,11 @@ class ProfileImageCreateSerializer(ModelSerializer):
 
         uploaded_at: data/hora do upload (somente leitura)
 
+        status: status do processamento das variantes da imagem (somente leitura)
     """
 
     class Meta:
         model = ProfileImage
-        fields = ["id", "image", "attachment_id", "uploaded_at"]
-        read_only_fields = ["attachment_id", "uploaded_at"]
+        fields = ["id", "image", "attachment_id", "uploaded_at", "status"]
+        read_only_fields = ["attachment_id", "uploaded_at", "status"]
         extra_kwargs = {"image": {"write_only": True}}
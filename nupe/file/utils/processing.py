@@ -0,0 +1,250 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image as PillowImage
+from PIL import ImageOps
+
+logger = logging.getLogger(__name__)
+
+# maior lado em pixels de cada variante, da maior para a menor. A miniatura atende avatares de até 48px em
+# telas de alta densidade (2x)
+IMAGE_VARIANTS = {"medium": 512, "thumbnail": 96}
+
+# opções do Pillow de cada formato das variantes, por extensão
+IMAGE_FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 85, "optimize": True, "progressive": True},
+}
+
+# fundo das imagens com transparência no formato JPEG
+JPEG_BACKGROUND_COLOR = (255, 255, 255)
+
+# opções do Pillow ao regravar a imagem original sem os metadados, por formato. Os demais formatos não possuem
+# EXIF e são armazenados sem alteração. Sem rotação, o JPEG mantém as tabelas de quantização da original
+ORIGINAL_FORMATS = {
+    "JPEG": {"quality": "keep", "comment": b""},
+    "PNG": {},
+    "WEBP": {"quality": 90},
+}
+
+# qualidade do JPEG original quando a orientação do EXIF é aplicada nos pixels
+ROTATED_JPEG_QUALITY = 95
+
+# tag do EXIF com a orientação da imagem
+EXIF_ORIENTATION_TAG = 0x0112
+
+_executor = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Retorna:
+        ThreadPoolExecutor: threads do processo que processam as imagens, criadas somente no primeiro uso
+    """
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_PROCESSING_WORKERS, thread_name_prefix="image-processing"
+        )
+
+    return _executor
+
+
+def get_variant_name(name: str, variant: str, extension: str) -> str:
+    """
+    Exemplo:
+        ('images/profiles/foo.png', 'thumbnail', 'webp') -> 'images/profiles/foo_thumbnail.webp'
+
+    Retorna:
+        str: path da variante de uma imagem
+    """
+    root, _ = os.path.splitext(name)
+
+    return f"{root}_{variant}.{extension}"
+
+
+def get_variants_names(name: str) -> list:
+    """
+    Retorna:
+        list: path de todas as variantes de uma imagem
+    """
+    return [get_variant_name(name, variant, extension) for variant in IMAGE_VARIANTS for extension in IMAGE_FORMATS]
+
+
+def get_original_root(name: str) -> str:
+    """
+    Exemplo:
+        'images/profiles/foo_thumbnail.webp' -> 'images/profiles/foo'
+
+        'images/profiles/foo.png' -> 'images/profiles/foo'
+
+    Retorna:
+        str: path sem extensão da imagem original, a partir do path da própria imagem ou de uma variante
+    """
+    root, extension = os.path.splitext(name)
+
+    if extension[1:] in IMAGE_FORMATS:
+        for variant in IMAGE_VARIANTS:
+            if root.endswith(f"_{variant}"):
+                return root[: -len(variant) - 1]
+
+    return root
+
+
+def strip_metadata(file):
+    """
+    Regrava a imagem original sem os metadados (EXIF, XMP, comentários), que podem conter a localização e o
+    dispositivo em que a foto foi tirada, aplicando a orientação do EXIF nos pixels. Imagens animadas, em
+    formatos sem EXIF ou que não podem ser decodificadas são mantidas sem alteração
+
+    Argumentos:
+        file (File): arquivo enviado
+
+    Retorna:
+        File: arquivo sem os metadados, ou o próprio arquivo enviado
+    """
+    file.seek(0)
+
+    try:
+        with PillowImage.open(file) as source:
+            if source.format not in ORIGINAL_FORMATS or getattr(source, "is_animated", False):
+                return file
+
+            options = {**ORIGINAL_FORMATS[source.format], "icc_profile": source.info.get("icc_profile")}
+            image = source
+
+            if source.getexif().get(EXIF_ORIENTATION_TAG, 1) != 1:
+                image = ImageOps.exif_transpose(source)
+
+                if source.format == "JPEG":
+                    options["quality"] = ROTATED_JPEG_QUALITY
+
+            buffer = BytesIO()
+            image.save(buffer, format=source.format, **options)
+    except (OSError, ValueError, PillowImage.DecompressionBombError):
+        # o processamento das variantes também falha, registra o erro no log e a imagem com o status de falha
+        return file
+
+    return ContentFile(buffer.getvalue(), name=file.name)
+
+
+def schedule_image_processing(image):
+    """
+    Agenda o processamento de uma imagem para depois do commit da transação atual, para que a requisição
+    do upload não espere o processamento. Com IMAGE_PROCESSING_WORKERS igual a 0, a imagem é processada
+    logo após o commit, na própria requisição
+
+    Argumentos:
+        image (Image): objeto de uma model que herda a model Image
+    """
+    label, pk = image._meta.label, image.pk
+
+    def submit():
+        if settings.IMAGE_PROCESSING_WORKERS > 0:
+            get_executor().submit(run_image_processing, label, pk)
+        else:
+            run_image_processing(label, pk)
+
+    transaction.on_commit(submit)
+
+
+def run_image_processing(label: str, pk: int):
+    """
+    Busca e processa a imagem, executado pelas threads de get_executor. A imagem pode ter sido removida
+    antes do processamento
+    """
+    try:
+        model = apps.get_model(label)
+        image = model.objects.filter(pk=pk).first()
+
+        if image is not None:
+            process_image(image)
+    except Exception:
+        # as exceções das threads não são exibidas, somente registradas no log
+        logger.exception("Erro ao processar a imagem %s de %s", pk, label)
+    finally:
+        # cada thread possui as suas conexões com o banco de dados
+        if settings.IMAGE_PROCESSING_WORKERS > 0:
+            connections.close_all()
+
+
+def process_image(image):
+    """
+    Gera as variantes da imagem e atualiza o seu status. Imagens que não podem ser decodificadas recebem o
+    status de falha e continuam disponíveis somente pela url original
+
+    Argumentos:
+        image (Image): objeto de uma model que herda a model Image
+    """
+    storage = image.image.storage
+
+    # as imagens com o mesmo conteúdo compartilham o arquivo e as variantes, que são geradas uma única vez
+    if all(storage.exists(name) for name in get_variants_names(image.image.name)):
+        image.status = image.PROCESSED
+    else:
+        try:
+            variants = render_variants(image.image)
+        except (OSError, ValueError, PillowImage.DecompressionBombError):
+            logger.exception("Não foi possível decodificar a imagem %s", image.image.name)
+            image.status = image.FAILED
+        else:
+            for name, content in variants.items():
+                # as variantes mantém o nome da imagem original, então uma variante incompleta é substituída
+                storage.delete(name)
+                storage.save(name, ContentFile(content))
+
+            image.status = image.PROCESSED
+
+    type(image).objects.filter(pk=image.pk).update(status=image.status)
+
+
+def render_variants(field_file) -> dict:
+    """
+    Decodifica a imagem uma única vez e gera cada variante a partir da anterior, reduzindo somente imagens
+    maiores que a variante. A orientação do EXIF é aplicada nos pixels e os metadados (EXIF, localização)
+    não são copiados para as variantes
+
+    Argumentos:
+        field_file (FieldFile): arquivo da imagem original
+
+    Retorna:
+        dict: conteúdo (bytes) de cada variante por path
+    """
+    largest = max(IMAGE_VARIANTS.values())
+
+    with field_file.open("rb") as file, PillowImage.open(file) as source:
+        # no formato JPEG, decodifica diretamente em uma escala reduzida próxima da maior variante
+        source.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(source)
+        image.load()
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    variants = {}
+
+    for variant, size in IMAGE_VARIANTS.items():
+        image.thumbnail((size, size), PillowImage.LANCZOS)
+
+        for extension, options in IMAGE_FORMATS.items():
+            variants[get_variant_name(field_file.name, variant, extension)] = encode(image, extension, options)
+
+    return variants
+
+
+def encode(image, extension: str, options: dict) -> bytes:
+    if extension == "jpeg" and image.mode == "RGBA":
+        background = PillowImage.new("RGB", image.size, JPEG_BACKGROUND_COLOR)
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+
+    buffer = BytesIO()
+    image.save(buffer, **options)
+
+    return buffer.getvalue()
@@ -0,0 +1,147 @@
+import posixpath
+import re
+
+from django.conf import settings
+
+from nupe.file.utils.processing import get_original_root
+
+# tempo em segundos do cache dos arquivos identificados pelo hash do conteúdo, que nunca são alterados
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+# o nome dos arquivos armazenados pelo hash é o próprio hash (sha256) em hexadecimal
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{64}$")
+
+# tamanho dos blocos lidos ao enviar uma parte do arquivo
+CHUNK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    """
+    O intervalo do cabeçalho 'Range' começa depois do final do arquivo
+    """
+
+
+def is_content_addressed(name: str) -> bool:
+    """
+    Exemplo:
+        'images/profiles/<sha256>_thumbnail.webp' -> True
+
+        'images/profiles/foo.png' -> False
+
+    Retorna:
+        bool: se o arquivo, ou a imagem original da variante, é identificado pelo hash do conteúdo
+    """
+    return bool(CONTENT_ADDRESSED_NAME.match(posixpath.basename(get_original_root(name))))
+
+
+def get_cache_control(name: str) -> str:
+    """
+    Retorna:
+        str: valor do cabeçalho 'Cache-Control' do arquivo. Os arquivos identificados pelo hash mudam de url
+        quando o conteúdo muda, então podem ser mantidos em cache indefinidamente
+    """
+    if is_content_addressed(name):
+        return f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+
+    return f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}"
+
+
+def get_etag(name: str, stat) -> str:
+    """
+    A etag dos arquivos identificados pelo hash é o próprio nome, que não muda quando o arquivo é reaproveitado
+    por outro upload (a data de modificação é atualizada). Os demais arquivos utilizam a data de modificação e o
+    tamanho, no mesmo formato do nginx
+
+    Argumentos:
+        name (str): path do arquivo relativo ao MEDIA_ROOT
+
+        stat (os.stat_result): informações do arquivo
+
+    Retorna:
+        str: etag forte (entre aspas) do arquivo
+    """
+    if is_content_addressed(name):
+        return '"{}"'.format(posixpath.splitext(posixpath.basename(name))[0])
+
+    return f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+
+
+def parse_range(header: str, size: int):
+    """
+    Interpreta o cabeçalho 'Range' (RFC 7233). Somente um intervalo em bytes é suportado, os cabeçalhos com
+    vários intervalos ou inválidos são ignorados e o arquivo completo é enviado
+
+    Exemplo:
+        ('bytes=0-99', 1000) -> (0, 99)
+
+        ('bytes=900-', 1000) -> (900, 999)
+
+        ('bytes=-100', 1000) -> (900, 999)
+
+    Argumentos:
+        header (str): valor do cabeçalho
+
+        size (int): tamanho do arquivo em bytes
+
+    Retorna:
+        tuple: primeiro e último byte (inclusive) do intervalo, ou None caso o cabeçalho seja ignorado
+
+    Raises:
+        RangeNotSatisfiable: caso o intervalo esteja fora do arquivo
+    """
+    unit, _, ranges = (header or "").partition("=")
+
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+
+    first, separator, last = ranges.strip().partition("-")
+
+    if not separator or not (first or last):
+        return None
+
+    if (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+
+    if not first:
+        # sufixo: os últimos 'last' bytes
+        if int(last) == 0 or size == 0:
+            raise RangeNotSatisfiable
+
+        return max(size - int(last), 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+
+    if start >= size:
+        raise RangeNotSatisfiable
+
+    if end < start:
+        return None
+
+    return start, min(end, size - 1)
+
+
+def read_range(file, start: int, length: int):
+    """
+    Lê uma parte do arquivo em blocos e fecha o arquivo ao final
+
+    Argumentos:
+        file (file): arquivo aberto no modo binário
+
+        start (int): posição do primeiro byte
+
+        length (int): quantidade de bytes
+    """
+    try:
+        file.seek(start)
+
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+
+            if not chunk:
+                break
+
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
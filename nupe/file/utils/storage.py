@@ -0,0 +1,111 @@
+import hashlib
+import os
+import posixpath
+from tempfile import NamedTemporaryFile
+from time import time
+
+from django.conf import settings
+
+# algoritmo do hash que identifica o conteúdo dos arquivos
+HASH_ALGORITHM = "sha256"
+
+# prefixo dos arquivos temporários escritos durante o upload
+TEMPORARY_PREFIX = ".upload-"
+
+
+def write_content_addressed(file, name: str, storage) -> tuple:
+    """
+    Escreve o arquivo no diretório de 'name' calculando o hash do conteúdo enquanto os blocos são escritos, e
+    nomeia o arquivo pelo hash mantendo a extensão. Caso já exista um arquivo com o mesmo conteúdo, o arquivo
+    existente é reaproveitado e o arquivo temporário é descartado
+
+    Exemplo:
+        'images/profiles/foo.png' -> 'images/profiles/<sha256 do conteúdo>.png'
+
+    Argumentos:
+        file (File): arquivo enviado
+
+        name (str): path sugerido, somente o diretório e a extensão são utilizados
+
+        storage (FileSystemStorage): storage onde o arquivo é escrito
+
+    Retorna:
+        tuple: path do arquivo, hash do conteúdo e tamanho em bytes
+    """
+    directory = posixpath.dirname(name)
+    _, extension = posixpath.splitext(name)
+    os.makedirs(storage.path(directory), exist_ok=True)
+
+    digest = hashlib.new(HASH_ALGORITHM)
+    size = 0
+
+    # o arquivo temporário fica no mesmo diretório para que seja movido sem ser copiado
+    with NamedTemporaryFile(dir=storage.path(directory), prefix=TEMPORARY_PREFIX, delete=False) as temporary:
+        try:
+            for chunk in file.chunks():
+                digest.update(chunk)
+                temporary.write(chunk)
+                size += len(chunk)
+        except BaseException:
+            os.remove(temporary.name)
+            raise
+
+    final_name = posixpath.join(directory, f"{digest.hexdigest()}{extension}")
+    final_path = storage.path(final_name)
+
+    if os.path.exists(final_path):
+        os.remove(temporary.name)
+        # atualiza a data de modificação, para que o arquivo reaproveitado não seja removido pela coleta dos
+        # arquivos sem referência antes do commit
+        os.utime(final_path)
+    else:
+        os.chmod(temporary.name, settings.FILE_UPLOAD_PERMISSIONS or 0o644)
+        os.replace(temporary.name, final_path)
+
+    return final_name, digest.hexdigest(), size
+
+
+def append_tombstones(names: list):
+    """
+    Registra no log de tombstones (IMAGE_TOMBSTONE_LOG) os arquivos que deixaram de ser utilizados, para que
+    sejam removidos depois pelo comando collect_orphan_images ao invés de durante a requisição
+
+    Argumentos:
+        names (list): path dos arquivos
+    """
+    write_tombstones([(time(), name) for name in names])
+
+
+def write_tombstones(entries: list):
+    """
+    Adiciona os registros ao final do log, uma linha por arquivo com a data/hora (timestamp) do registro
+
+    Argumentos:
+        entries (list): tuplas com o timestamp e o path do arquivo
+    """
+    if not entries:
+        return
+
+    log = settings.IMAGE_TOMBSTONE_LOG
+    os.makedirs(os.path.dirname(log), exist_ok=True)
+
+    # uma única escrita no modo 'append', para que registros de processos diferentes não se misturem
+    with open(log, "a", encoding="utf-8") as file:
+        file.write("".join(f"{timestamp!r}\t{name}\n" for timestamp, name in entries))
+
+
+def read_tombstones(path: str) -> list:
+    """
+    Retorna:
+        list: tuplas com o timestamp e o path de cada arquivo registrado no log
+    """
+    entries = []
+
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            timestamp, _, name = line.rstrip("\n").partition("\t")
+
+            if name:
+                entries.append((float(timestamp), name))
+
+    return entries
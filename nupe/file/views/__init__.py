@@ -1 +1,2 @@
 from nupe.file.views.image_upload import ProfileImageViewSet
+from nupe.file.views.media import serve_media
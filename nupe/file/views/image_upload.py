@@ -4,11 +4,13 @@ from rest_framework.viewsets import GenericViewSet
 
 from nupe.file.models import ProfileImage
 from nupe.file.serializers.image_upload import ProfileImageCreateSerializer
+from nupe.file.utils.processing import schedule_image_processing
 
 
 class ProfileImageViewSet(GenericViewSet, CreateModelMixin, DestroyModelMixin):
     """
-    create: faz o upload da foto de perfil para o banco de dados
+    create: faz o upload da foto de perfil para o banco de dados. As variantes da imagem (miniatura e média, nos
+    formatos WebP e JPEG) são geradas em segundo plano após a resposta
 
     delete: remove a foto de perfil do banco de dados
     """
@@ -22,3 +24,7 @@ class ProfileImageViewSet(GenericViewSet, CreateModelMixin, DestroyModelMixin):
         "create": ["file.add_profileimage"],
         "destroy": ["file.delete_profileimage"],
     }
+
+    def perform_create(self, serializer):
+        profile_image = serializer.save()
+        schedule_image_processing(profile_image)
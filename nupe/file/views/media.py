@@ -0,0 +1,152 @@
+import mimetypes
+import os
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags
+from django.views.decorators.http import require_safe
+
+from nupe.file.utils.serving import RangeNotSatisfiable, get_cache_control, get_etag, parse_range, read_range
+
+# não registrado nas versões antigas do módulo mimetypes
+mimetypes.add_type("image/webp", ".webp")
+
+
+@require_safe
+def serve_media(request, path: str):
+    """
+    Entrega os arquivos de MEDIA_ROOT (fotos de perfil e as suas variantes) com as respostas condicionais
+    (ETag, Last-Modified e status 304) e o cache indefinido (immutable) dos arquivos identificados pelo hash do
+    conteúdo. Os arquivos e diretórios iniciados por '.' (tombstones, uploads em andamento) não são entregues
+
+    O envio do conteúdo depende de MEDIA_SERVE_MODE:
+
+    django: o próprio Django envia o arquivo (wsgi.file_wrapper), com suporte ao cabeçalho 'Range'
+
+    x-accel-redirect: o nginx envia o arquivo a partir da location interna MEDIA_ACCEL_REDIRECT_PREFIX
+
+    x-sendfile: o apache (mod_xsendfile) ou o lighttpd envia o arquivo a partir do path absoluto
+
+    Argumentos:
+        path (str): path do arquivo relativo ao MEDIA_ROOT
+
+    Raises:
+        Http404: caso o arquivo não exista ou não possa ser entregue
+    """
+    if any(part.startswith(".") for part in path.split("/")):
+        raise Http404
+
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        file_stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404
+
+    etag = get_etag(path, file_stat)
+    response = get_conditional_response(request, etag=etag, last_modified=int(file_stat.st_mtime))
+
+    if response is None:
+        try:
+            send = MEDIA_SERVE_MODES[settings.MEDIA_SERVE_MODE]
+        except KeyError:
+            raise ImproperlyConfigured(f"MEDIA_SERVE_MODE deve ser um de: {', '.join(MEDIA_SERVE_MODES)}")
+
+        response = send(request, path, full_path, file_stat, etag)
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(file_stat.st_mtime)
+    response["Cache-Control"] = get_cache_control(path)
+
+    return response
+
+
+def send_with_django(request, path: str, full_path: str, file_stat, etag: str) -> HttpResponse:
+    size = file_stat.st_size
+    content_type = get_content_type(path)
+    byte_range = None
+
+    if if_range_passes(request, file_stat, etag):
+        try:
+            byte_range = parse_range(request.META.get("HTTP_RANGE"), size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416, content_type=content_type)
+            response["Content-Range"] = f"bytes */{size}"
+
+            return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1
+
+    if request.method == "HEAD":
+        response = HttpResponse(content_type=content_type)
+    elif byte_range is None:
+        # o servidor wsgi (gunicorn) envia o arquivo completo com a chamada de sistema sendfile
+        response = FileResponse(open(full_path, "rb"), content_type=content_type)
+    else:
+        response = StreamingHttpResponse(read_range(open(full_path, "rb"), start, length), content_type=content_type)
+
+    if byte_range is not None:
+        response.status_code = 206
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    response["Content-Length"] = length
+    response["Accept-Ranges"] = "bytes"
+
+    return response
+
+
+def send_with_accel_redirect(request, path: str, full_path: str, file_stat, etag: str) -> HttpResponse:
+    """
+    O nginx trata o cabeçalho 'Range' e mantém os cabeçalhos 'Content-Type' e 'Cache-Control' da resposta
+    """
+    response = HttpResponse(content_type=get_content_type(path))
+    response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(path)
+
+    return response
+
+
+def send_with_sendfile(request, path: str, full_path: str, file_stat, etag: str) -> HttpResponse:
+    response = HttpResponse(content_type=get_content_type(path))
+    response["X-Sendfile"] = full_path
+
+    return response
+
+
+MEDIA_SERVE_MODES = {
+    "django": send_with_django,
+    "x-accel-redirect": send_with_accel_redirect,
+    "x-sendfile": send_with_sendfile,
+}
+
+
+def get_content_type(path: str) -> str:
+    content_type, _ = mimetypes.guess_type(path)
+
+    return content_type or "application/octet-stream"
+
+
+def if_range_passes(request, file_stat, etag: str) -> bool:
+    """
+    O cabeçalho 'If-Range' envia o intervalo somente se o arquivo não foi alterado, caso contrário o arquivo
+    completo é enviado (RFC 7233)
+
+    Retorna:
+        bool: se o cabeçalho 'Range' deve ser utilizado
+    """
+    if_range = request.META.get("HTTP_IF_RANGE")
+
+    if not if_range:
+        return True
+
+    if if_range.startswith('"'):
+        return parse_etags(if_range) == [etag]
+
+    return if_range == http_date(file_stat.st_mtime)
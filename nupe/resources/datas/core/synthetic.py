@@ -0,0 +1,116 @@
+female_first_names = [
+    "Ana",
+    "Beatriz",
+    "Bruna",
+    "Camila",
+    "Carolina",
+    "Daniela",
+    "Eduarda",
+    "Fernanda",
+    "Gabriela",
+    "Helena",
+    "Isabela",
+    "Júlia",
+    "Larissa",
+    "Laura",
+    "Letícia",
+    "Luana",
+    "Mariana",
+    "Natália",
+    "Patrícia",
+    "Rafaela",
+    "Sofia",
+    "Tainá",
+    "Valentina",
+    "Vitória",
+]
+
+male_first_names = [
+    "André",
+    "Arthur",
+    "Bernardo",
+    "Bruno",
+    "Caio",
+    "Carlos",
+    "Daniel",
+    "Davi",
+    "Eduardo",
+    "Felipe",
+    "Gabriel",
+    "Guilherme",
+    "Gustavo",
+    "Heitor",
+    "João",
+    "Leonardo",
+    "Lucas",
+    "Luiz",
+    "Mateus",
+    "Miguel",
+    "Pedro",
+    "Rafael",
+    "Thiago",
+    "Vinícius",
+]
+
+last_names = [
+    "Almeida",
+    "Alves",
+    "Barbosa",
+    "Cardoso",
+    "Carvalho",
+    "Castro",
+    "Costa",
+    "Dias",
+    "Fernandes",
+    "Ferreira",
+    "Gomes",
+    "Krüger",
+    "Lima",
+    "Machado",
+    "Martins",
+    "Melo",
+    "Moraes",
+    "Oliveira",
+    "Pereira",
+    "Ribeiro",
+    "Rocha",
+    "Santos",
+    "Schmidt",
+    "Silva",
+    "Souza",
+    "Vieira",
+]
+
+# temas dos motivos de atendimento raízes, os filhos e netos recebem o nome do tema com o caminho na árvore
+attendance_reason_themes = [
+    "Ansiedade",
+    "Desempenho Acadêmico",
+    "Conflito Familiar",
+    "Adaptação ao Curso",
+    "Saúde",
+    "Assistência Estudantil",
+    "Relacionamento com Colegas",
+    "Orientação Vocacional",
+    "Luto",
+    "Frequência",
+]
+
+public_annotations = [
+    "Estudante compareceu ao atendimento.",
+    "Encaminhado para acompanhamento com a coordenação do curso.",
+    "Retorno agendado para a próxima semana.",
+    "Família contatada por telefone.",
+    "Estudante não compareceu, atendimento remarcado.",
+]
+
+private_annotations = [
+    "Relatou dificuldades para dormir nas últimas semanas.",
+    "Demonstrou interesse em trocar de curso.",
+    "Situação financeira da família agravada.",
+    "Sugerido encaminhamento para a rede de saúde do município.",
+]
+
+group_annotations = [
+    "Caso discutido na reunião da equipe multiprofissional.",
+    "Acompanhamento compartilhado com a assistência social.",
+]
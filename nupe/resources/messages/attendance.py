@@ -0,0 +1 @@
+ATTENDANCE_STATISTIC_INVALID_GROUP_BY_MESSAGE = "Agrupamento inválido. Os agrupamentos disponíveis são: {}"
@@ -0,0 +1 @@
+ATTENDANCE_REASON_FATHER_CYCLE_MESSAGE = "O motivo pai não pode ser o próprio motivo nem um de seus descendentes"
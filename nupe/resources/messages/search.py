@@ -0,0 +1 @@
+SEARCH_WITHOUT_TERMS_MESSAGE = "Informe ao menos um termo de busca (nome, cpf ou matrícula)"
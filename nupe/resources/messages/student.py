@@ -0,0 +1,4 @@
+STUDENT_REPEATED_REGISTRATION_MESSAGE = "Esta matrícula está repetida na lista de estudantes"
+STUDENT_REGISTRATION_ALREADY_EXISTS_MESSAGE = "Já existe um estudante com esta matrícula"
+STUDENT_ALREADY_ENROLLED_MESSAGE = "Esta pessoa já é estudante desta formação acadêmica no campus"
+STUDENT_BULK_MAX_LENGTH_MESSAGE = "A lista deve conter no máximo {} estudantes"
@@ -80,20 +80,21 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     # autenticação
-    "DEFAULT_AUTHENTICATION_CLASSES": ("oauth2_provider.contrib.rest_framework.OAuth2Authentication",),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("nupe.account.authentication.CachedOAuth2Authentication",),
     "DEFAULT_PERMISSION_CLASSES": ("drf_action_permissions.DjangoActionPermissions",),
     # render/parser
-    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
-    "DEFAULT_PARSER_CLASSES": ["rest_framework.parsers.JSONParser"],
+    "DEFAULT_RENDERER_CLASSES": ["nupe.core.utils.renderers.ORJSONRenderer"],
+    "DEFAULT_PARSER_CLASSES": ["nupe.core.utils.parsers.ORJSONParser"],
     # filtros
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
         "rest_framework.filters.SearchFilter",
         "rest_framework.filters.OrderingFilter",
     ],
-    # paginação
-    # "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
-    # "PAGE_SIZE": 20,
+    # paginação de todas as listagens, como no schema da API (docs/api/schema.yaml). As respostas das listagens
+    # são objetos com 'count', 'next', 'previous' e 'results', ao invés de listas
+    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "PAGE_SIZE": 20,
     # testes
     "TEST_REQUEST_DEFAULT_FORMAT": "json",
     # schemas - doc
@@ -128,10 +129,55 @@ OAUTH2_PROVIDER = {
     "OAUTH2_BACKEND_CLASS": "oauth2_provider.oauth2_backends.JSONOAuthLibCore",
 }
 
+# tokens de acesso validados mantidos em memória por processo (CachedOAuth2Authentication). O tempo em cache de
+# um token nunca ultrapassa a sua expiração (ACCESS_TOKEN_EXPIRE_SECONDS)
+TOKEN_CACHE_MAX_SIZE = env("TOKEN_CACHE_MAX_SIZE", int, 10000)
+
+# tempo máximo em segundos de um token em memória, também o atraso máximo da revogação em outros processos
+TOKEN_CACHE_TIMEOUT = env("TOKEN_CACHE_TIMEOUT", int, timedelta(minutes=5).seconds)
+
+# também mantém os tokens no cache compartilhado entre os processos (CACHES)
+TOKEN_CACHE_SHARED = env("TOKEN_CACHE_SHARED", bool, False)
+
+# quantidade de autenticações entre os registros da taxa de acerto no log, 0 para não registrar
+TOKEN_CACHE_STATS_INTERVAL = env("TOKEN_CACHE_STATS_INTERVAL", int, 10000)
+
 DATABASES = {"default": env.db()}
 
+# tempo em segundos que uma conexão é reutilizada entre as requisições de uma thread. Com 0, a conexão é fechada
+# ao final de cada requisição
+DB_CONN_MAX_AGE = env("DB_CONN_MAX_AGE", int, 60)
+
+# verifica as conexões reutilizadas antes do uso, descartando as conexões que não respondem
+DB_CONN_HEALTH_CHECKS = env("DB_CONN_HEALTH_CHECKS", bool, True)
+
+# quantidade máxima de conexões do pool de cada processo no PostgreSQL, compartilhado entre as threads do gunicorn
+# ('--threads'). Com 0, cada thread mantém a sua conexão (DB_CONN_MAX_AGE)
+DB_POOL_SIZE = env("DB_POOL_SIZE", int, 0)
+
+DATABASES["default"].update(CONN_MAX_AGE=DB_CONN_MAX_AGE, CONN_HEALTH_CHECKS=DB_CONN_HEALTH_CHECKS)
+
+if DB_POOL_SIZE > 0 and DATABASES["default"]["ENGINE"].startswith("django.db.backends.postgresql"):
+    # a conexão volta para o pool ao final de cada requisição
+    DATABASES["default"].update(ENGINE="nupe.core.backends.postgresql_pool", CONN_MAX_AGE=0, POOL_SIZE=DB_POOL_SIZE)
+
+# compartilhado entre os processos quando configurado com um cache externo. Exemplo: 'memcache://127.0.0.1:11211'
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
+# tempo máximo em segundos das respostas em cache (CachedResponseMixin). Somente com um cache compartilhado entre os
+# processos (CACHES), com o cache em memória as respostas não ficam em cache
+RESPONSE_CACHE_TIMEOUT = env("RESPONSE_CACHE_TIMEOUT", int, timedelta(hours=1).seconds)
+
 AUTH_USER_MODEL = "account.Account"
 
+# as permissões de cada conta são mantidas em cache, invalidadas quando as permissões ou os grupos mudam. Somente
+# com um cache compartilhado entre os processos (CACHES), com o cache em memória as permissões não ficam em cache
+AUTHENTICATION_BACKENDS = ["nupe.account.backends.CachedModelBackend"]
+
+# tempo máximo em segundos das permissões de uma conta em cache, também o atraso máximo da revogação de permissões
+# alteradas sem signals (como 'update' ou alterações direto no banco de dados)
+PERMISSIONS_CACHE_TIMEOUT = env("PERMISSIONS_CACHE_TIMEOUT", int, timedelta(minutes=5).seconds)
+
 LANGUAGE_CODE = "pt-br"
 
 TIME_ZONE = "UTC"
@@ -148,3 +194,20 @@ STATIC_URL = "/static/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media/")
 
 MEDIA_URL = "/media/"
+
+# envio dos arquivos de MEDIA_URL: 'django' (o próprio Django envia o arquivo), 'x-accel-redirect' (nginx) ou
+# 'x-sendfile' (apache com mod_xsendfile, lighttpd)
+MEDIA_SERVE_MODE = env("MEDIA_SERVE_MODE", str, "django")
+
+# location interna (internal) do nginx que aponta para MEDIA_ROOT, utilizada no modo 'x-accel-redirect'
+MEDIA_ACCEL_REDIRECT_PREFIX = env("MEDIA_ACCEL_REDIRECT_PREFIX", str, "/protected-media/")
+
+# tempo máximo em segundos do cache dos arquivos que não são identificados pelo hash do conteúdo
+MEDIA_CACHE_MAX_AGE = env("MEDIA_CACHE_MAX_AGE", int, timedelta(hours=1).seconds)
+
+# quantidade de threads de cada processo que geram as variantes das imagens enviadas. Com 0 as variantes são
+# geradas na própria requisição do upload
+IMAGE_PROCESSING_WORKERS = env("IMAGE_PROCESSING_WORKERS", int, 2)
+
+# arquivos de imagens que deixaram de ser utilizados, removidos pelo comando collect_orphan_images
+IMAGE_TOMBSTONE_LOG = env("IMAGE_TOMBSTONE_LOG", str, os.path.join(MEDIA_ROOT, ".tombstones", "images.log"))
@@ -1 +1,2 @@
 from nupe.tests.integration.account.account import AccountAPITestCase
+from nupe.tests.integration.account.authentication import CachedOAuth2AuthenticationAPITestCase
@@ -1,9 +1,11 @@
 from django.urls import reverse
 from model_bakery import baker
+from rest_framework.renderers import JSONRenderer
 from rest_framework.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_204_NO_CONTENT, HTTP_403_FORBIDDEN
 from rest_framework.test import APITestCase
 
 from nupe.account.models import Account
+from nupe.account.serializers.account import AccountListSerializer
 from nupe.tests.integration.account.setup.account import create_account_with_permissions_and_do_authentication
 
 
@@ -42,6 +44,21 @@ class AccountAPITestCase(APITestCase):
         self.assertIsNone(response.data.get("is_superuser"))
         self.assertIsNone(response.data.get("short_name"))
 
+    def test_list_should_match_model_serializer(self):
+        # conta com e sem local de trabalho
+        baker.make(Account)
+        baker.make(Account, _fill_optional=["local_job"])
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["account.view_account"])
+        url = reverse("account-list")
+
+        response = client.get(path=url)
+
+        # a listagem com o '.values()' deve gerar o mesmo json do AccountListSerializer
+        queryset = Account.objects.order_by("person__first_name", "person__last_name", "id")
+        expected = AccountListSerializer(instance=queryset, many=True)
+        self.assertEqual(JSONRenderer().render(response.data.get("results")), JSONRenderer().render(expected.data))
+
     def test_retrieve_with_permission(self):
         # cria uma conta no banco para detalhar suas informações
         account = baker.make(Account)
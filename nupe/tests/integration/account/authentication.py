@@ -0,0 +1,86 @@
+from contextlib import redirect_stderr
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from drf_spectacular.generators import SchemaGenerator
+from oauth2_provider.models import AccessToken, Application
+from rest_framework.status import HTTP_200_OK, HTTP_401_UNAUTHORIZED
+from rest_framework.test import APIClient, APITestCase
+
+from nupe.account.authentication import token_cache
+from nupe.tests.integration.account.setup.account import create_account_with_permissions
+from nupe.tests.utils import SHARED_CACHES
+
+
+class CachedOAuth2AuthenticationAPITestCase(APITestCase):
+    def setUp(self):
+        token_cache.clear()
+
+        self.account = create_account_with_permissions(permissions=["account.view_account"])
+        self.access_token = AccessToken.objects.create(
+            user=self.account,
+            token="token-de-acesso",
+            application=Application.objects.create(
+                name="nupe",
+                client_type=Application.CLIENT_CONFIDENTIAL,
+                authorization_grant_type=Application.GRANT_PASSWORD,
+            ),
+            expires=timezone.now() + timedelta(hours=1),
+            scope="read write",
+        )
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access_token.token}")
+        self.url = reverse("account-detail", args=[self.account.id])
+
+    @override_settings(CACHES=SHARED_CACHES)
+    def test_authenticate_with_cached_token(self):
+        # as permissões só são mantidas em cache com um cache compartilhado entre os processos
+        cache.clear()
+
+        response = self.client.get(path=self.url)
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(path=self.url)
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+
+        # o token, a conta e as permissões em cache não devem ser consultados no banco de dados
+        tables = ["oauth2_provider_accesstoken", "account_account_user_permissions", "auth_permission"]
+        self.assertEqual([query for query in context if any(table in query["sql"] for table in tables)], [])
+
+        stats = token_cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_schema_should_have_oauth2_security_scheme(self):
+        with redirect_stderr(StringIO()) as warnings:
+            schema = SchemaGenerator().get_schema(request=None, public=True)
+
+        # a autenticação deve ser documentada como o esquema oauth2 do django-oauth-toolkit
+        self.assertIn("oauth2", schema["components"]["securitySchemes"])
+        self.assertNotIn("could not resolve authenticator", warnings.getvalue())
+
+    def test_authenticate_with_revoked_token(self):
+        self.assertEqual(self.client.get(path=self.url).status_code, HTTP_200_OK)
+
+        # deve remover o token revogado do cache
+        self.access_token.revoke()
+
+        self.assertEqual(self.client.get(path=self.url).status_code, HTTP_401_UNAUTHORIZED)
+
+    def test_authenticate_with_expired_token(self):
+        self.access_token.expires = timezone.now() - timedelta(seconds=1)
+        self.access_token.save()
+
+        # o token expirado não deve ser mantido em cache
+        self.assertEqual(self.client.get(path=self.url).status_code, HTTP_401_UNAUTHORIZED)
+        self.assertEqual(token_cache.get_stats()["size"], 0)
@@ -1,9 +1,12 @@
 from nupe.tests.integration.core.attendance import AttendanceAPITestCase
 from nupe.tests.integration.core.course import AcademicEducationAPITestCase, GradeAPITestCase
 from nupe.tests.integration.core.custom_handler_404 import CustomHandler404APITestCase
+from nupe.tests.integration.core.endpoints import EndpointsBenchmarkAPITestCase
 from nupe.tests.integration.core.institution import CampusAPITestCase, InstitutionAPITestCase
 from nupe.tests.integration.core.job import FuctionAPITestCase, SectorAPITestCase
 from nupe.tests.integration.core.location import CityAPITestCase, LocationAPITestCase, StateAPITestCase
 from nupe.tests.integration.core.person import PersonAPITestCase
+from nupe.tests.integration.core.populate import PopulateTestCase
 from nupe.tests.integration.core.reason import AttendanceReasonAPITestCase
 from nupe.tests.integration.core.student import StudentAPITestCase
+from nupe.tests.integration.core.synthetic_data import SyntheticDataTestCase
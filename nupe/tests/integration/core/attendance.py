@@ -1,11 +1,34 @@
+import csv
+import json
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest.mock import patch
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from model_bakery import baker
-from rest_framework.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_204_NO_CONTENT, HTTP_403_FORBIDDEN
+from rest_framework.renderers import JSONRenderer
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_204_NO_CONTENT,
+    HTTP_400_BAD_REQUEST,
+    HTTP_403_FORBIDDEN,
+)
 from rest_framework.test import APITestCase
 
 from nupe.account.models import Account
-from nupe.core.models import AccountAttendance, Attendance
+from nupe.core.models import AccountAttendance, Attendance, AttendanceReason, Person
+from nupe.core.serializers.attendance import AttendanceListSerializer
+from nupe.core.utils.pagination import PageNumberKeysetPagination
+from nupe.core.utils.parsers import ORJSONParser
+from nupe.core.utils.queries import prefetch_attendance_list
+from nupe.core.utils.renderers import ORJSONRenderer
+from nupe.core.views import AttendanceViewSet
 from nupe.tests.integration.account.setup.account import create_account_with_permissions_and_do_authentication
+from nupe.tests.utils import count_queries, mock_attendance_with_relations
 
 
 class AttendanceAPITestCase(APITestCase):
@@ -366,6 +389,40 @@ class AttendanceAPITestCase(APITestCase):
         self.assertIsNone(data.get("attendants"))
         self.assertIsNone(data.get("account_attendances"))
 
+    def test_report_json_should_match_drf_renderer(self):
+        mock_attendance_with_relations()
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_attendance"])
+        url = reverse("attendance-report")
+
+        response = client.get(path=url)
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+
+        # deve renderizar os mesmos bytes do JSONRenderer do DRF
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+        values = {
+            "datetime": datetime(2020, 1, 2, 3, 4, 5, 6),
+            "utc": datetime(2020, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            "date": date(2020, 1, 2),
+            "time": time(3, 4, 5),
+            "decimal": Decimal("1.50"),
+            "timedelta": timedelta(minutes=1),
+            "text": "atenção \u2028",
+            1: [None, True, 0.1],
+        }
+        self.assertEqual(ORJSONRenderer().render(values), JSONRenderer().render(values))
+
+        # assim como o JSONRenderer, não deve renderizar NaN e infinito como 'null'
+        for value in [float("nan"), float("inf"), Decimal("-Infinity")]:
+            with self.assertRaises(ValueError):
+                ORJSONRenderer().render({"results": [{"value": value}]})
+
+        # deve interpretar o json do corpo da requisição
+        self.assertEqual(ORJSONParser().parse(BytesIO(response.content)), json.loads(response.content))
+
     def test_report_without_permission(self):
         client = create_account_with_permissions_and_do_authentication(permissions=[])
         url = reverse("attendance-report")
@@ -403,3 +460,280 @@ class AttendanceAPITestCase(APITestCase):
         # campos que não devem ser retornados
         self.assertIsNone(data.get("_safedelete_policy"))
         self.assertIsNone(data.get("account"))
+
+    def test_list_number_of_queries_does_not_depend_on_attendances(self):
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_attendance"])
+        url = reverse("attendance-list")
+
+        mock_attendance_with_relations()
+        client.get(path=url)  # carrega as permissões do usuário
+
+        queries_with_one = count_queries(client, url)
+
+        mock_attendance_with_relations(quantity=5)
+
+        # as relações aninhadas devem ser carregadas com a mesma quantidade de consultas
+        self.assertEqual(count_queries(client, url), queries_with_one)
+
+    def test_retrieve_number_of_queries_does_not_depend_on_relations(self):
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_attendance"])
+        attendance = mock_attendance_with_relations()[0]
+        url = reverse("attendance-detail", args=[attendance.id])
+
+        client.get(path=url)  # carrega as permissões do usuário
+
+        queries_with_one = count_queries(client, url)
+
+        baker.make(AccountAttendance, attendance=attendance, account=baker.make(Account), _quantity=3)
+        baker.make("core.Responsible", student=attendance.student, _quantity=3)
+
+        # os atendentes e responsáveis devem ser carregados com a mesma quantidade de consultas
+        self.assertEqual(count_queries(client, url), queries_with_one)
+
+    def test_report_number_of_queries_does_not_depend_on_attendances(self):
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_attendance"])
+        url = reverse("attendance-report")
+
+        mock_attendance_with_relations()
+        client.get(path=url)  # carrega as permissões do usuário
+
+        queries_with_one = count_queries(client, url)
+
+        mock_attendance_with_relations(quantity=5)
+
+        # as relações aninhadas devem ser carregadas com a mesma quantidade de consultas
+        self.assertEqual(count_queries(client, url), queries_with_one)
+
+    def test_my_attendances_number_of_queries_does_not_depend_on_attendances(self):
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_attendance"])
+        url = reverse("attendance-my")
+        account = Account.objects.all().first()
+
+        for attendance in mock_attendance_with_relations():
+            baker.make(AccountAttendance, attendance=attendance, account=account)
+
+        client.get(path=url)  # carrega as permissões do usuário
+
+        queries_with_one = count_queries(client, url)
+
+        for attendance in mock_attendance_with_relations(quantity=5):
+            baker.make(AccountAttendance, attendance=attendance, account=account)
+
+        # as relações aninhadas devem ser carregadas com a mesma quantidade de consultas
+        self.assertEqual(count_queries(client, url), queries_with_one)
+
+    def test_retrieve_should_not_return_masked_attendants(self):
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_attendance"])
+        attendance = mock_attendance_with_relations()[0]
+
+        # mascara o atendente do atendimento
+        attendance.attendants.all().first().delete()
+
+        response = client.get(path=reverse("attendance-detail", args=[attendance.id]))
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+
+        # o atendente mascarado não deve ser pré-carregado
+        self.assertEqual(response.data.get("attendants"), [])
+
+    @patch.object(PageNumberKeysetPagination, "page_size", 2)
+    def test_list_cursor_pagination_ordering_by_nullable_field(self):
+        # atendimentos abertos não tem data de fechamento
+        baker.make(Attendance, closed_at=None, _quantity=3)
+        baker.make(Attendance, closed_at=datetime(2020, 10, 1, 12), _quantity=2)
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_attendance"])
+        url = reverse("attendance-list")
+
+        response = client.get(path=url, data={"pagination": "cursor", "ordering": "-closed_at"})
+        ids = [attendance.get("id") for attendance in response.data.get("results")]
+
+        while response.data.get("next"):
+            response = client.get(path=response.data.get("next"))
+            ids += [attendance.get("id") for attendance in response.data.get("results")]
+
+        # os atendimentos sem data de fechamento devem ficar no final
+        closed = Attendance.objects.filter(closed_at__isnull=False).order_by("id")
+        opened = Attendance.objects.filter(closed_at__isnull=True).order_by("id")
+        self.assertEqual(ids, [attendance.id for attendance in list(closed) + list(opened)])
+
+    def test_list_should_match_model_serializer(self):
+        attendance = baker.make(Attendance)
+        baker.make(AccountAttendance, attendance=attendance)
+        baker.make(Attendance)
+
+        # a conta mascarada não deve ser retornada entre os atendentes
+        baker.make(AccountAttendance, attendance=attendance, account=baker.make(Account)).account.delete()
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_attendance"])
+        url = reverse("attendance-list")
+
+        response = client.get(path=url)
+
+        # a listagem com o '.values()' deve gerar o mesmo json do AttendanceListSerializer
+        queryset = prefetch_attendance_list(Attendance.objects.order_by("attendance_severity", "id"))
+        expected = AttendanceListSerializer(instance=queryset, many=True)
+        self.assertEqual(JSONRenderer().render(response.data.get("results")), JSONRenderer().render(expected.data))
+
+        attendants = {data.get("id"): data.get("attendants") for data in response.data.get("results")}
+        self.assertEqual(len(attendants[attendance.id]), 1)
+
+    @patch.object(PageNumberKeysetPagination, "page_size", 2)
+    def test_report_should_serialize_only_the_requested_page(self):
+        mock_attendance_with_relations(quantity=5)
+        Person.objects.filter(account__attendance__isnull=False).update(last_name="Guerreiro")
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_attendance"])
+        url = reverse("attendance-report")
+
+        # a busca em relações m2m torna a queryset 'distinct'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(path=url, data={"search": "Guerreiro"})
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+
+        # a contagem considera todos os atendimentos, mas somente a página é serializada
+        self.assertEqual(response.data.get("count"), 5)
+        self.assertEqual(len(response.data.get("results")), 2)
+
+        # a contagem deve selecionar somente o id, sem as colunas e relações do relatório
+        count_query = [query["sql"] for query in context.captured_queries if "COUNT(" in query["sql"]][-1]
+        self.assertNotIn("attendance_severity", count_query)
+        self.assertNotIn("core_campus", count_query)
+
+        # a página deve ser limitada no banco de dados
+        self.assertTrue(any("LIMIT 2" in query["sql"] for query in context.captured_queries))
+
+    def test_report_export_csv_with_permission(self):
+        attendances = mock_attendance_with_relations(quantity=3)
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_attendance"])
+        url = reverse("attendance-report")
+
+        response = client.get(path=url, data={"format": "csv"})
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response["Content-Type"].startswith("text/csv"))
+
+        rows = list(csv.DictReader(b"".join(response.streaming_content).decode("utf-8").splitlines()))
+
+        # deve exportar todos os atendimentos, sem paginação
+        self.assertEqual(len(rows), len(attendances))
+
+        # os serializers aninhados devem ser achatados em colunas
+        self.assertEqual(
+            {row.get("student.registration") for row in rows}, {a.student.registration for a in attendances}
+        )
+        self.assertIsNotNone(rows[0].get("student.personal_info.cpf"))
+        self.assertEqual(len(json.loads(rows[0].get("account_attendance"))), 1)
+
+    @patch.object(AttendanceViewSet, "export_chunk_size", 2)
+    def test_report_export_ndjson_with_permission(self):
+        mock_attendance_with_relations(quantity=2)
+        baker.make(Attendance, status=Attendance.CLOSED, _quantity=3)
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_attendance"])
+        url = reverse("attendance-report")
+
+        response = client.get(path=url, data={"format": "ndjson", "status": Attendance.CLOSED})
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertTrue(response.streaming)
+
+        # o consumo do conteúdo é quem busca os atendimentos no banco de dados, em blocos
+        with CaptureQueriesContext(connection) as context:
+            rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        # deve respeitar os filtros do relatório
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row.get("status") for row in rows}, {Attendance.CLOSED})
+        self.assertIsNotNone(rows[0].get("student"))
+
+        # as relações são pré-carregadas a cada bloco e não a cada atendimento
+        self.assertLess(len(context.captured_queries), 3 * len(rows))
+
+    def test_report_export_without_permission(self):
+        client = create_account_with_permissions_and_do_authentication()
+        url = reverse("attendance-report")
+
+        response = client.get(path=url, data={"format": "csv"})
+
+        # não deve ter permissão para acessar
+        self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
+
+    def test_stats_with_permission(self):
+        student = baker.make("core.Student", academic_education_campus=baker.make("core.AcademicEducationCampus"))
+        baker.make(Attendance, student=student, attendance_severity=Attendance.LOW, _quantity=3)
+        baker.make(Attendance, student=student, attendance_severity=Attendance.HIGH)
+        baker.make(Attendance, student=student, attendance_severity=Attendance.SERIOUS).delete()
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_attendance"])
+        url = reverse("attendance-stats")
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(path=url, data={"group_by": "campus,attendance_severity"})
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+
+        # os contadores são agregados em uma única consulta, sem percorrer os atendimentos
+        queries = [query["sql"] for query in context.captured_queries]
+        self.assertEqual(len([sql for sql in queries if '"core_attendancestatistic"' in sql]), 1)
+        self.assertFalse(any('"core_attendance"' in sql for sql in queries))
+
+        # deve retornar somente os campos agrupados e os atendimentos não mascarados
+        campus_id = student.academic_education_campus.campus_id
+        self.assertEqual(
+            response.data,
+            [
+                {"campus": campus_id, "attendance_severity": Attendance.HIGH, "total": 1},
+                {"campus": campus_id, "attendance_severity": Attendance.LOW, "total": 3},
+            ],
+        )
+
+        # deve filtrar os agrupamentos
+        response = client.get(path=url, data={"group_by": "attendance_severity", "severity": Attendance.LOW})
+
+        self.assertEqual(response.data, [{"attendance_severity": Attendance.LOW, "total": 3}])
+
+    def test_stats_with_invalid_group_by(self):
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_attendance"])
+        url = reverse("attendance-stats")
+
+        response = client.get(path=url, data={"group_by": "student"})
+
+        # não deve permitir agrupar por campos que não são pré-agregados
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIsNotNone(response.data.get("group_by"))
+
+    def test_stats_without_permission(self):
+        client = create_account_with_permissions_and_do_authentication()
+        url = reverse("attendance-stats")
+
+        response = client.get(path=url)
+
+        # não deve ter permissão para acessar
+        self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
+
+    def test_filter_attendance_reason_ancestor(self):
+        # árvore com um motivo raiz, um filho e um neto, e um motivo de outra árvore
+        root = baker.make(AttendanceReason)
+        son = baker.make(AttendanceReason, father_reason=root)
+        grandson = baker.make(AttendanceReason, father_reason=son)
+        other = baker.make(AttendanceReason)
+
+        attendances = [baker.make(Attendance, attendance_reason=reason) for reason in [root, son, grandson, other]]
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_attendance"])
+        url = reverse("attendance-list")
+
+        response = client.get(path=url, data={"attendance_reason_ancestor": son.id})
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+
+        # deve retornar os atendimentos do motivo fornecido e dos seus descendentes
+        attendances_ids = {result.get("id") for result in response.data.get("results")}
+        self.assertEqual(attendances_ids, {attendances[1].id, attendances[2].id})
+
+        response = client.get(path=url, data={"attendance_reason_ancestor": root.id})
+        self.assertEqual(response.data.get("count"), 3)
@@ -1,3 +1,5 @@
+from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
 from model_bakery import baker
 from rest_framework.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_204_NO_CONTENT, HTTP_403_FORBIDDEN
@@ -6,9 +8,15 @@ from rest_framework.test import APITestCase
 from nupe.core.models import AcademicEducation, Grade
 from nupe.resources.datas.core.course import ACADEMIC_EDUCATION_NAME, GRADE_NAME
 from nupe.tests.integration.account.setup.account import create_account_with_permissions_and_do_authentication
+from nupe.tests.utils import SHARED_CACHES
 
 
+@override_settings(CACHES=SHARED_CACHES)
 class GradeAPITestCase(APITestCase):
+    def setUp(self):
+        # as respostas em cache de outros testes não devem ser reutilizadas
+        cache.clear()
+
     def test_list_with_permission(self):
         # cria um grau no banco para retornar no list
         baker.make(Grade)
@@ -166,6 +174,21 @@ class GradeAPITestCase(APITestCase):
         # não deve ter permissão para acessar
         self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
 
+    def test_cached_list_filtered_by_academic_education_should_be_invalidated(self):
+        grade = baker.make(Grade)
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_grade"])
+        url = reverse("grade-list")
+
+        response = client.get(path=url, data={"academic_education_name": ACADEMIC_EDUCATION_NAME})
+        self.assertEqual(response.data.get("count"), 0)
+
+        # o cadastro de uma formação acadêmica deve invalidar a resposta em cache do filtro
+        baker.make(AcademicEducation, name=ACADEMIC_EDUCATION_NAME, grade=grade)
+
+        response = client.get(path=url, data={"academic_education_name": ACADEMIC_EDUCATION_NAME})
+        self.assertEqual(response.data.get("count"), 1)
+
 
 class AcademicEducationAPITestCase(APITestCase):
     def test_list_with_permission(self):
@@ -0,0 +1,48 @@
+from unittest.mock import patch
+
+from model_bakery import baker
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.status import HTTP_200_OK
+from rest_framework.test import APITestCase
+
+from nupe.account.models import Account
+from nupe.core.utils.benchmark import (
+    BASELINE_PATH,
+    compare_query_counts,
+    compare_with_baseline,
+    get_endpoints,
+    load_baseline,
+    measure_endpoints,
+    seed_data,
+)
+
+
+class EndpointsBenchmarkAPITestCase(APITestCase):
+    def setUp(self):
+        # superusuário, as permissões não geram consultas
+        self.account = baker.make(Account, is_superuser=True)
+        self.client.force_authenticate(user=self.account)
+
+    def test_all_read_actions_should_be_measured(self):
+        names = [endpoint.name for endpoint in get_endpoints()]
+
+        # actions de todos os routers, somente as implementadas pelas viewsets
+        self.assertIn("student-list", names)
+        self.assertIn("account-current", names)
+        self.assertIn("attendance-report", names)
+        self.assertNotIn("profile_image-list", names)
+
+    def test_query_count_should_not_depend_on_objects(self):
+        seed_data(scale=2, account=self.account)
+
+        with patch.object(PageNumberPagination, "page_size", 1):
+            results = measure_endpoints(self.client, repeat=1)
+
+        seed_data(scale=2, account=self.account)
+        scaled_results = measure_endpoints(self.client, repeat=1)
+
+        self.assertEqual([name for name, result in scaled_results.items() if result["status"] != HTTP_200_OK], [])
+
+        # nenhuma action deve ter consultas N+1 nem mais consultas que a baseline
+        self.assertEqual(compare_query_counts(results, scaled_results), [])
+        self.assertEqual(compare_with_baseline(scaled_results, load_baseline(BASELINE_PATH)), [])
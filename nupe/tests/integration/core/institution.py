@@ -1,3 +1,5 @@
+from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
 from model_bakery import baker
 from rest_framework.status import (
@@ -12,9 +14,15 @@ from rest_framework.test import APITestCase
 from nupe.core.models import Campus, Institution
 from nupe.resources.datas.core.institution import CAMPUS_NAME, INSTITUTION_NAME, VALID_CNPJ
 from nupe.tests.integration.account.setup.account import create_account_with_permissions_and_do_authentication
+from nupe.tests.utils import SHARED_CACHES
 
 
+@override_settings(CACHES=SHARED_CACHES)
 class InstitutionAPITestCase(APITestCase):
+    def setUp(self):
+        # as respostas em cache de outros testes não devem ser reutilizadas
+        cache.clear()
+
     def test_list_with_permission(self):
         # cria uma instituição no banco para retornar no list
         baker.make(Institution)
@@ -169,6 +177,21 @@ class InstitutionAPITestCase(APITestCase):
         # não deve ter permissão para acessar
         self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
 
+    def test_cached_list_filtered_by_campus_should_be_invalidated(self):
+        institution = baker.make(Institution)
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_institution"])
+        url = reverse("institution-list")
+
+        response = client.get(path=url, data={"campus_name": CAMPUS_NAME})
+        self.assertEqual(response.data.get("count"), 0)
+
+        # o cadastro de um campus deve invalidar a resposta em cache do filtro
+        baker.make(Campus, name=CAMPUS_NAME, institution=institution)
+
+        response = client.get(path=url, data={"campus_name": CAMPUS_NAME})
+        self.assertEqual(response.data.get("count"), 1)
+
 
 class CampusAPITestCase(APITestCase):
     def test_list_with_permission(self):
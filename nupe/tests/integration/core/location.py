@@ -1,13 +1,24 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from model_bakery import baker
-from rest_framework.status import HTTP_200_OK, HTTP_403_FORBIDDEN
+from rest_framework.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED, HTTP_403_FORBIDDEN
 from rest_framework.test import APITestCase
 
 from nupe.core.models import City, Location, State
+from nupe.core.views.location import LocationViewSet
 from nupe.tests.integration.account.setup.account import create_account_with_permissions_and_do_authentication
+from nupe.tests.utils import SHARED_CACHES
 
 
+@override_settings(CACHES=SHARED_CACHES)
 class CityAPITestCase(APITestCase):
+    def setUp(self):
+        # as respostas em cache de outros testes não devem ser reutilizadas
+        cache.clear()
+
     def test_list_with_permission(self):
         # cria uma cidade no banco para retornar no list
         baker.make(City)
@@ -73,7 +84,12 @@ class CityAPITestCase(APITestCase):
         self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
 
 
+@override_settings(CACHES=SHARED_CACHES)
 class StateAPITestCase(APITestCase):
+    def setUp(self):
+        # as respostas em cache de outros testes não devem ser reutilizadas
+        cache.clear()
+
     def test_list_with_permission(self):
         # cria um estado no banco para retornar no list
         baker.make(State)
@@ -141,7 +157,12 @@ class StateAPITestCase(APITestCase):
         self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
 
 
+@override_settings(CACHES=SHARED_CACHES)
 class LocationAPITestCase(APITestCase):
+    def setUp(self):
+        # as respostas em cache de outros testes não devem ser reutilizadas
+        cache.clear()
+
     def test_list_with_permission(self):
         # cria uma localização no banco para retornar no list
         baker.make(Location)
@@ -208,3 +229,75 @@ class LocationAPITestCase(APITestCase):
 
         # não deve ter permissão para acessar
         self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
+
+    def test_list_should_be_cached_until_save(self):
+        location = baker.make(Location)
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_location"])
+        url = reverse("location-list")
+
+        response = client.get(path=url)
+        etag = response["ETag"]
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+
+        # a resposta em cache não deve consultar as localizações no banco de dados
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(path=url)
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(any("core_location" in query["sql"] for query in context.captured_queries))
+
+        # deve retornar somente o status 304 quando a etag não mudou
+        response = client.get(path=url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+        # alterar uma model relacionada deve invalidar a resposta em cache
+        location.city.name = "Araquari"
+        location.city.save()
+
+        response = client.get(path=url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.data.get("results")[0].get("name"), str(Location.objects.get()))
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_local_cache_should_not_cache_responses(self):
+        baker.make(Location)
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_location"])
+        url = reverse("location-list")
+
+        etag = client.get(path=url)["ETag"]
+
+        # o cache em memória não é invalidado nos outros processos, as localizações devem ser consultadas
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(path=url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertTrue(any("core_location" in query["sql"] for query in context.captured_queries))
+
+        # a etag continua sendo calculada a cada requisição
+        self.assertEqual(response.status_code, HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_cache_timeout_should_be_read_on_each_request(self):
+        with override_settings(RESPONSE_CACHE_TIMEOUT=5):
+            self.assertEqual(LocationViewSet().get_cache_timeout(), 5)
+
+    def test_cached_list_without_permission(self):
+        baker.make(Location)
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_location"])
+        url = reverse("location-list")
+        client.get(path=url)
+
+        client = create_account_with_permissions_and_do_authentication(email="other@example.com")
+
+        response = client.get(path=url)
+
+        # as permissões devem ser verificadas mesmo com a resposta em cache
+        self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
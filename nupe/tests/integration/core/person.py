@@ -1,8 +1,10 @@
 import os.path
 from datetime import datetime
+from unittest.mock import patch
 
 from django.urls import reverse
 from model_bakery import baker
+from rest_framework.renderers import JSONRenderer
 from rest_framework.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
@@ -13,9 +15,12 @@ from rest_framework.status import (
 from rest_framework.test import APITestCase
 
 from nupe.core.models import Person
+from nupe.core.serializers.person import PersonListSerializer
+from nupe.core.utils.pagination import PageNumberKeysetPagination
 from nupe.resources.datas.core.person import CPF, FIRST_NAME, GENDER, LAST_NAME, OLDER_BIRTHDAY_DATE
+from nupe.resources.datas.file.image_upload import PROFILE_IMAGE_JPEG
 from nupe.tests.integration.account.setup.account import create_account_with_permissions_and_do_authentication
-from nupe.tests.utils import mock_profile_image
+from nupe.tests.utils import collect_orphan_images, mock_profile_image
 
 
 class PersonAPITestCase(APITestCase):
@@ -55,6 +60,19 @@ class PersonAPITestCase(APITestCase):
         self.assertIsNone(response.data.get("responsibles"))
         self.assertIsNone(response.data.get("age"))
 
+    def test_list_should_match_model_serializer(self):
+        baker.make(Person, contact=None)
+        baker.make(Person, first_name="Júlia", last_name="Souza")
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_person"])
+        url = reverse("person-list")
+
+        response = client.get(path=url)
+
+        # a listagem com o '.values()' deve gerar o mesmo json do PersonListSerializer
+        expected = PersonListSerializer(instance=Person.objects.order_by("first_name", "last_name", "id"), many=True)
+        self.assertEqual(JSONRenderer().render(response.data.get("results")), JSONRenderer().render(expected.data))
+
     def test_retrieve_with_permission(self):
         # cria uma pessoa no banco para detalhar suas informações
         person = baker.make(Person)
@@ -78,6 +96,7 @@ class PersonAPITestCase(APITestCase):
         self.assertIsNotNone(response.data.get("gender"))
         self.assertIsNot(response.data.get("contact", False), False)
         self.assertIsNot(response.data.get("profile_image", False), False)
+        self.assertIsNot(response.data.get("profile_image_variants", False), False)
 
         # campos que não devem ser retornados
         self.assertIsNone(response.data.get("_safedelete_policy"))
@@ -188,7 +207,8 @@ class PersonAPITestCase(APITestCase):
         client = create_account_with_permissions_and_do_authentication(permissions=["core.change_person"])
         url = reverse("person-detail", args=[person.cpf])
 
-        new_mocked_image = mock_profile_image()
+        # a nova imagem deve ter outro conteúdo, imagens iguais compartilham o mesmo arquivo
+        new_mocked_image = mock_profile_image(filename=PROFILE_IMAGE_JPEG)
         person_update_data = {
             "profile_image": new_mocked_image.attachment_id,
         }
@@ -201,6 +221,7 @@ class PersonAPITestCase(APITestCase):
         self.assertEqual(Person.objects.get(pk=person.id).profile_image, new_mocked_image)
 
         # a imagem antiga deve ser excluída do diretório
+        collect_orphan_images()
         self.assertIs(os.path.exists(mocked_image.image.path), False)
 
         # E a nova imagem deve estar no diretório, substituindo a antiga
@@ -429,3 +450,65 @@ class PersonAPITestCase(APITestCase):
 
         # não deve ter permissão para acessar
         self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
+
+    def test_search_with_permission(self):
+        joao = baker.make(Person, first_name="Joaquim", last_name="D'Ávila", cpf="12345678909")
+        maria = baker.make(Person, first_name="Maria", last_name="Joaquina")
+        baker.make(Person, first_name="Ana", last_name="Silva")
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_person"])
+        url = reverse("person-search")
+
+        # deve ignorar os acentos e as diferenças entre maiúsculas e minúsculas
+        response = client.get(path=url, data={"q": "JOAQUIM dávila"})
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual([person.get("id") for person in response.data.get("results")], [joao.id])
+
+        # deve ordenar pela relevância, o início do nome antes do meio do sobrenome
+        response = client.get(path=url, data={"q": "joaq"})
+
+        self.assertEqual([person.get("id") for person in response.data.get("results")], [joao.id, maria.id])
+
+        # deve encontrar pelo cpf formatado
+        response = client.get(path=url, data={"q": "123.456.789-09"})
+
+        self.assertEqual([person.get("id") for person in response.data.get("results")], [joao.id])
+
+    @patch.object(PageNumberKeysetPagination, "page_size", 2)
+    def test_search_cursor_pagination_with_permission(self):
+        # relevâncias na ordem inversa da ordenação da listagem (nome e sobrenome)
+        first_name = baker.make(Person, first_name="Zélia", last_name="Souza")
+        word = baker.make(Person, first_name="Maria", last_name="Zélia")
+        middle = baker.make(Person, first_name="Ana", last_name="Azelia")
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_person"])
+        url = reverse("person-search")
+
+        response = client.get(path=url, data={"q": "zelia", "pagination": "cursor"})
+        persons = [person.get("id") for person in response.data.get("results")]
+
+        while response.data.get("next"):
+            response = client.get(path=response.data.get("next"))
+            persons += [person.get("id") for person in response.data.get("results")]
+
+        # o cursor deve manter a ordenação pela relevância entre as páginas
+        self.assertEqual(persons, [first_name.id, word.id, middle.id])
+
+    def test_search_without_terms(self):
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_person"])
+        url = reverse("person-search")
+
+        response = client.get(path=url, data={"q": " .- "})
+
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIsNotNone(response.data.get("q"))
+
+    def test_search_without_permission(self):
+        client = create_account_with_permissions_and_do_authentication()
+        url = reverse("person-search")
+
+        response = client.get(path=url, data={"q": "joao"})
+
+        # não deve ter permissão para acessar
+        self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
@@ -0,0 +1,26 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+
+from nupe.core.models import Attendance, AttendanceReason, AttendanceStatistic, Person, Student
+from nupe.resources.datas.core.populate import attendances, persons, students
+
+
+class PopulateTestCase(TestCase):
+    def populate(self):
+        call_command("populate", stdout=StringIO())
+
+    def test_populate_should_be_idempotent(self):
+        self.populate()
+        self.populate()
+
+        self.assertEqual(Person.objects.filter(cpf__in=[person["cpf"] for person in persons]).count(), len(persons))
+        self.assertEqual(Student.objects.count(), len(students))
+        self.assertEqual(Attendance.objects.count(), len(attendances))
+        self.assertEqual(AttendanceReason.objects.filter(father_reason=None).count(), 4)
+
+        # o bulk_create não dispara signals, o documento de busca e os contadores são mantidos pelo comando
+        self.assertFalse(Person.objects.filter(search_document="").exists())
+        self.assertEqual(AttendanceStatistic.objects.aggregate(total=Sum("total"))["total"], len(attendances))
@@ -1,10 +1,17 @@
 from django.urls import reverse
 from model_bakery import baker
-from rest_framework.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_204_NO_CONTENT, HTTP_403_FORBIDDEN
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_204_NO_CONTENT,
+    HTTP_400_BAD_REQUEST,
+    HTTP_403_FORBIDDEN,
+)
 from rest_framework.test import APITestCase
 
 from nupe.core.models import AttendanceReason
 from nupe.tests.integration.account.setup.account import create_account_with_permissions_and_do_authentication
+from nupe.tests.utils import count_queries
 
 
 class AttendanceReasonAPITestCase(APITestCase):
@@ -203,3 +210,100 @@ class AttendanceReasonAPITestCase(APITestCase):
         self.assertIn(sons[0].id, attendance_reasons_ids)
         self.assertIn(sons[1].id, attendance_reasons_ids)
         self.assertIn(sons[2].id, attendance_reasons_ids)
+
+    def test_tree_with_permission(self):
+        # árvore com dois motivos raízes, filhos e netos
+        fathers = baker.make(AttendanceReason, _quantity=2)
+        sons = baker.make(AttendanceReason, father_reason=fathers[0], _quantity=2)
+        grandson = baker.make(AttendanceReason, father_reason=sons[0])
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_attendancereason"])
+        url = reverse("attendance_reason-tree")
+
+        response = client.get(path=url)
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+
+        # deve retornar somente os motivos raízes no primeiro nível, com os descendentes aninhados
+        tree = {node.get("id"): node for node in response.data}
+        self.assertEqual(set(tree), {fathers[0].id, fathers[1].id})
+        self.assertEqual(tree[fathers[1].id].get("sons_reasons"), [])
+
+        sons_nodes = {node.get("id"): node for node in tree[fathers[0].id].get("sons_reasons")}
+        self.assertEqual(set(sons_nodes), {sons[0].id, sons[1].id})
+        self.assertEqual(sons_nodes[sons[0].id].get("father_reason"), fathers[0].id)
+        self.assertEqual([node.get("id") for node in sons_nodes[sons[0].id].get("sons_reasons")], [grandson.id])
+
+        # campos que devem ser retornados
+        node = sons_nodes[sons[0].id]["sons_reasons"][0]
+        self.assertEqual(node.get("name"), grandson.name)
+        self.assertEqual(node.get("description"), grandson.description)
+
+    def test_tree_filter_ancestor(self):
+        father = baker.make(AttendanceReason)
+        son = baker.make(AttendanceReason, father_reason=father)
+        grandson = baker.make(AttendanceReason, father_reason=son)
+        baker.make(AttendanceReason, father_reason=father)
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_attendancereason"])
+        url = reverse("attendance_reason-tree")
+
+        response = client.get(path=url, data={"ancestor": son.id})
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+
+        # deve retornar somente a subárvore do motivo fornecido
+        self.assertEqual([node.get("id") for node in response.data], [son.id])
+        self.assertEqual([node.get("id") for node in response.data[0].get("sons_reasons")], [grandson.id])
+
+    def test_tree_number_of_queries_does_not_depend_on_depth(self):
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_attendancereason"])
+        url = reverse("attendance_reason-tree")
+
+        father = baker.make(AttendanceReason)
+        client.get(path=url)  # carrega as permissões do usuário
+
+        queries_with_one_level = count_queries(client, url)
+
+        for _ in range(3):
+            father = baker.make(AttendanceReason, father_reason=father)
+
+        # todos os níveis devem ser buscados na mesma consulta
+        self.assertEqual(count_queries(client, url), queries_with_one_level)
+
+    def test_path_should_follow_father_changes(self):
+        father = baker.make(AttendanceReason)
+        son = baker.make(AttendanceReason, father_reason=father)
+        grandson = baker.make(AttendanceReason, father_reason=son)
+
+        self.assertEqual(AttendanceReason.objects.get(pk=grandson.id).path, f"/{father.id}/{son.id}/{grandson.id}/")
+
+        # os descendentes devem acompanhar a troca do motivo pai
+        new_father = baker.make(AttendanceReason)
+        son.father_reason = new_father
+        son.save()
+
+        self.assertEqual(
+            AttendanceReason.objects.get(pk=grandson.id).path, f"/{new_father.id}/{son.id}/{grandson.id}/"
+        )
+
+    def test_partial_update_father_reason_cycle(self):
+        attendance_reason = baker.make(AttendanceReason)
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.change_attendancereason"])
+        url = reverse("attendance_reason-detail", args=[attendance_reason.id])
+
+        response = client.patch(path=url, data={"father_reason": attendance_reason.id})
+
+        # o motivo não pode ser pai de si mesmo
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIsNotNone(response.data.get("father_reason"))
+
+    def test_tree_without_permission(self):
+        client = create_account_with_permissions_and_do_authentication()
+
+        url = reverse("attendance_reason-tree")
+        response = client.get(path=url)
+
+        # não deve ter permissão para acessar
+        self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
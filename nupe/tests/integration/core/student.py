@@ -1,18 +1,28 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from model_bakery import baker
+from rest_framework.renderers import JSONRenderer
 from rest_framework.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
     HTTP_204_NO_CONTENT,
     HTTP_400_BAD_REQUEST,
     HTTP_403_FORBIDDEN,
+    HTTP_404_NOT_FOUND,
 )
 from rest_framework.test import APITestCase
 
-from nupe.core.models import Student
+from nupe.core.models import AccountAttendance, Attendance, Student
+from nupe.core.serializers.student import StudentListSerializer
+from nupe.core.utils.pagination import AttendanceTimelinePagination, PageNumberKeysetPagination
 from nupe.resources.datas.core.person import OLDER_BIRTHDAY_DATE
 from nupe.resources.datas.core.student import INGRESS_DATE, REGISTRATION
 from nupe.tests.integration.account.setup.account import create_account_with_permissions_and_do_authentication
+from nupe.tests.utils import count_queries, mock_attendance_with_relations
 
 
 class StudentAPITestCase(APITestCase):
@@ -674,3 +684,376 @@ class StudentAPITestCase(APITestCase):
 
         # não deve ter permissão para acessar
         self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
+
+    @patch.object(PageNumberKeysetPagination, "page_size", 2)
+    def test_list_cursor_pagination_with_permission(self):
+        # estudantes com o mesmo nome, para que a ordenação seja desempatada pelo id
+        baker.make(Student, person__first_name="Luis", person__last_name="Guerreiro", _quantity=3)
+        baker.make(Student, person__first_name="Ana", _quantity=2)
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_student"])
+        url = reverse("student-list")
+
+        response = client.get(path=url, data={"pagination": "cursor"})
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertIsNone(response.data.get("previous"))
+        self.assertIsNone(response.data.get("count"))
+
+        registrations = [student.get("registration") for student in response.data.get("results")]
+
+        while response.data.get("next"):
+            response = client.get(path=response.data.get("next"))
+            registrations += [student.get("registration") for student in response.data.get("results")]
+
+        # deve percorrer todos os estudantes na mesma ordem da listagem, sem repetir nenhum
+        expected = Student.objects.order_by("person__first_name", "person__last_name", "id")
+        self.assertEqual(registrations, [student.registration for student in expected])
+
+        # deve voltar para a página anterior
+        previous_response = client.get(path=response.data.get("previous"))
+        self.assertEqual(len(previous_response.data.get("results")), 2)
+        self.assertEqual(previous_response.data.get("results")[-1].get("registration"), registrations[-2])
+
+    @patch.object(PageNumberKeysetPagination, "page_size", 2)
+    def test_list_cursor_pagination_with_masked_students_between_pages(self):
+        baker.make(Student, _quantity=6)
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_student"])
+        url = reverse("student-list")
+        expected = list(Student.objects.order_by("person__first_name", "person__last_name", "id"))
+
+        response = client.get(path=url, data={"pagination": "cursor"})
+
+        # mascara o último estudante da página atual e o primeiro da próxima página
+        expected[1].delete()
+        expected[2].delete()
+
+        response = client.get(path=response.data.get("next"))
+
+        # a próxima página deve continuar a partir do último estudante retornado, mesmo que mascarado
+        registrations = [student.get("registration") for student in response.data.get("results")]
+        self.assertEqual(registrations, [expected[3].registration, expected[4].registration])
+
+    def test_list_invalid_cursor_with_permission(self):
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_student"])
+        url = reverse("student-list")
+
+        response = client.get(path=url, data={"cursor": "foo"})
+
+        self.assertEqual(response.status_code, HTTP_404_NOT_FOUND)
+
+    def test_list_should_match_model_serializer(self):
+        baker.make(Student, graduated=True, _quantity=2)
+        baker.make(Student, graduated=False)
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_student"])
+        url = reverse("student-list")
+
+        response = client.get(path=url)
+
+        # a listagem com o '.values()' deve gerar o mesmo json do StudentListSerializer
+        queryset = Student.objects.order_by("person__first_name", "person__last_name", "id")
+        expected = StudentListSerializer(instance=queryset, many=True)
+        self.assertEqual(JSONRenderer().render(response.data.get("results")), JSONRenderer().render(expected.data))
+
+    def test_search_with_permission(self):
+        student = baker.make(
+            Student, registration="2020123", person=baker.make("core.Person", first_name="Júlia", last_name="Souza")
+        )
+        other = baker.make(
+            Student, registration="1999123", person=baker.make("core.Person", first_name="Luis", last_name="Julio")
+        )
+        baker.make(Student, registration="2020999", person=baker.make("core.Person", first_name="Ana")).delete()
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_student"])
+        url = reverse("student-search")
+
+        # deve ignorar os acentos e ordenar pela relevância
+        response = client.get(path=url, data={"q": "julia"})
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual([data.get("registration") for data in response.data.get("results")], [student.registration])
+
+        response = client.get(path=url, data={"q": "jul"})
+
+        registrations = [data.get("registration") for data in response.data.get("results")]
+        self.assertEqual(registrations, [student.registration, other.registration])
+
+        # deve encontrar pelo início da matrícula, sem retornar os estudantes mascarados
+        response = client.get(path=url, data={"q": "2020"})
+
+        self.assertEqual([data.get("registration") for data in response.data.get("results")], [student.registration])
+
+        # todos os termos devem ser encontrados
+        response = client.get(path=url, data={"q": "julia 1999"})
+
+        self.assertEqual(response.data.get("results"), [])
+
+    @patch.object(PageNumberKeysetPagination, "page_size", 2)
+    def test_search_cursor_pagination_with_permission(self):
+        # relevâncias diferentes da ordenação da listagem (nome e sobrenome)
+        exact = baker.make(Student, registration="julia", person__first_name="Zélia")
+        first_name = baker.make(Student, person__first_name="Júlia", person__last_name="Souza")
+        word = baker.make(Student, person__first_name="Bruna", person__last_name="Julia")
+        middle = baker.make(Student, person__first_name="Ana", person__last_name="Mejulia")
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_student"])
+        url = reverse("student-search")
+
+        response = client.get(path=url, data={"q": "julia", "pagination": "cursor"})
+        registrations = [data.get("registration") for data in response.data.get("results")]
+
+        while response.data.get("next"):
+            response = client.get(path=response.data.get("next"))
+            registrations += [data.get("registration") for data in response.data.get("results")]
+
+        # o cursor deve manter a ordenação pela relevância entre as páginas
+        expected = [exact.registration, first_name.registration, word.registration, middle.registration]
+        self.assertEqual(registrations, expected)
+
+    def test_search_without_permission(self):
+        client = create_account_with_permissions_and_do_authentication()
+        url = reverse("student-search")
+
+        response = client.get(path=url, data={"q": "julia"})
+
+        # não deve ter permissão para acessar
+        self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
+
+    def test_bulk_create_with_permission(self):
+        older_persons = baker.make("Person", birthday_date=OLDER_BIRTHDAY_DATE, _quantity=3)
+        under_age_person = baker.make("Person")
+        academic_education_campus = baker.make("AcademicEducationCampus")
+
+        students_data = [
+            {
+                "registration": f"{REGISTRATION}{index}",
+                "person": person.id,
+                "academic_education_campus": academic_education_campus.id,
+                "ingress_date": INGRESS_DATE,
+            }
+            for index, person in enumerate(older_persons)
+        ]
+        students_data.append(
+            {
+                "registration": f"{REGISTRATION}9",
+                "person": under_age_person.id,
+                "responsibles": [older_persons[0].id, older_persons[0].id],
+                "ingress_date": INGRESS_DATE,
+            }
+        )
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.add_student"])
+        url = reverse("student-bulk-create")
+
+        response = client.post(path=url, data=students_data, format="json")
+
+        self.assertEqual(response.status_code, HTTP_201_CREATED)
+
+        # os estudantes devem ser criados no banco de dados, na mesma ordem da lista
+        self.assertEqual(Student.objects.count(), 4)
+        self.assertEqual(
+            [data.get("id") for data in response.data],
+            [Student.objects.get(registration=data["registration"]).id for data in students_data],
+        )
+
+        # os responsáveis repetidos devem ser cadastrados somente uma vez
+        student = Student.objects.get(registration=f"{REGISTRATION}9")
+        self.assertEqual(list(student.responsibles_persons.all()), [older_persons[0]])
+        self.assertIsNone(student.academic_education_campus)
+
+        # a quantidade de consultas não deve depender da quantidade de estudantes
+        persons = baker.make("Person", birthday_date=OLDER_BIRTHDAY_DATE, _quantity=21)
+        students_data = [
+            {"registration": f"{REGISTRATION}{index}0", "person": person.id, "ingress_date": INGRESS_DATE}
+            for index, person in enumerate(persons)
+        ]
+
+        with CaptureQueriesContext(connection) as one_student_context:
+            client.post(path=url, data=students_data[:1], format="json")
+
+        with CaptureQueriesContext(connection) as many_students_context:
+            response = client.post(path=url, data=students_data[1:], format="json")
+
+        self.assertEqual(response.status_code, HTTP_201_CREATED)
+        self.assertEqual(len(many_students_context.captured_queries), len(one_student_context.captured_queries))
+        self.assertEqual(Student.objects.count(), 25)
+
+    def test_bulk_create_invalid_with_permission(self):
+        older_person = baker.make("Person", birthday_date=OLDER_BIRTHDAY_DATE)
+        under_age_person = baker.make("Person")
+        academic_education_campus = baker.make("AcademicEducationCampus")
+        student = baker.make(
+            Student, registration="123", person=older_person, academic_education_campus=academic_education_campus
+        )
+
+        students_data = [
+            # válido, exceto pela matrícula repetida no último estudante
+            {"registration": f"{REGISTRATION}1", "person": older_person.id, "ingress_date": INGRESS_DATE},
+            # matrícula já cadastrada
+            {"registration": student.registration, "person": older_person.id, "ingress_date": INGRESS_DATE},
+            # menor de idade sem responsável
+            {"registration": f"{REGISTRATION}2", "person": under_age_person.id, "ingress_date": INGRESS_DATE},
+            # pessoa já é estudante da formação acadêmica
+            {
+                "registration": f"{REGISTRATION}3",
+                "person": older_person.id,
+                "academic_education_campus": academic_education_campus.id,
+                "ingress_date": INGRESS_DATE,
+            },
+            # matrícula repetida na lista, pessoa e responsável inexistentes
+            {"registration": f"{REGISTRATION}1", "person": 0, "responsibles": [0], "ingress_date": INGRESS_DATE},
+        ]
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.add_student"])
+        url = reverse("student-bulk-create")
+
+        response = client.post(path=url, data=students_data, format="json")
+
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+
+        # nenhum estudante deve ser criado
+        self.assertEqual(Student.objects.count(), 1)
+
+        # deve emitir os erros na posição de cada estudante
+        self.assertEqual(len(response.data), len(students_data))
+        self.assertEqual(
+            [sorted(errors) for errors in response.data[:4]],
+            [["registration"], ["registration"], ["responsibles"], ["person"]],
+        )
+        self.assertEqual(sorted(response.data[4]), ["person", "registration", "responsibles"])
+
+    def test_bulk_create_without_permission(self):
+        client = create_account_with_permissions_and_do_authentication()
+        url = reverse("student-bulk-create")
+
+        response = client.post(path=url, data=[], format="json")
+
+        # não deve ter permissão para acessar
+        self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
+
+    def create_timeline(self, student: Student, opened_at: list) -> list:
+        """
+        Cria os atendimentos do estudante com as datas de abertura fornecidas, que o 'auto_now_add' não permite
+        definir no cadastro
+        """
+        attendances = baker.make(Attendance, student=student, _quantity=len(opened_at))
+
+        for attendance, value in zip(attendances, opened_at):
+            Attendance.objects.filter(pk=attendance.pk).update(opened_at=value)
+
+        return attendances
+
+    def test_timeline_with_permission(self):
+        student = baker.make(Student)
+        now = datetime(2020, 10, 18, 12, 0, 0, 123456)
+        older, newer, masked = self.create_timeline(student, [now - timedelta(days=1), now, now])
+        masked.delete()
+
+        # atendimento de outro estudante
+        baker.make(Attendance)
+
+        account_attendance = baker.make(
+            AccountAttendance,
+            attendance=newer,
+            public_annotation="Retorno agendado.",
+            private_annotation="Anotação particular.",
+            group_annotation="Anotação de grupo.",
+        )
+        baker.make(AccountAttendance, attendance=newer).delete()
+
+        client = create_account_with_permissions_and_do_authentication(
+            permissions=["core.view_student", "core.view_attendance"]
+        )
+        url = reverse("student-timeline", args=[student.registration])
+
+        response = client.get(path=url)
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+
+        # somente os atendimentos não mascarados do estudante, dos mais recentes para os mais antigos
+        results = response.data.get("results")
+        self.assertEqual([data.get("id") for data in results], [newer.id, older.id])
+        self.assertEqual(results[0].get("opened_at"), "2020-10-18T12:00:00.123456")
+        self.assertEqual(results[0].get("attendance_reason"), newer.attendance_reason.name)
+        self.assertEqual(results[1].get("account_attendances"), [])
+
+        # somente a anotação pública das anotações não mascaradas
+        account_attendances = results[0].get("account_attendances")
+        self.assertEqual(len(account_attendances), 1)
+        self.assertEqual(account_attendances[0].get("id"), account_attendance.id)
+        self.assertEqual(account_attendances[0].get("public_annotation"), "Retorno agendado.")
+        self.assertEqual(account_attendances[0].get("attendant"), account_attendance.account.full_name)
+        self.assertIsNone(account_attendances[0].get("private_annotation"))
+        self.assertIsNone(account_attendances[0].get("group_annotation"))
+
+    @patch.object(AttendanceTimelinePagination, "page_size", 2)
+    def test_timeline_cursor_pagination_with_permission(self):
+        student = baker.make(Student)
+        now = datetime(2020, 10, 18, 12, 0, 0, 123456)
+
+        # datas repetidas e separadas por microssegundos, que o cursor não pode truncar
+        self.create_timeline(
+            student, [now, now, now - timedelta(microseconds=1), now - timedelta(microseconds=2), now, now]
+        )
+
+        client = create_account_with_permissions_and_do_authentication(
+            permissions=["core.view_student", "core.view_attendance"]
+        )
+        url = reverse("student-timeline", args=[student.registration])
+
+        response = client.get(path=url, data={"ordering": "id"})
+
+        ids = [data.get("id") for data in response.data.get("results")]
+
+        while response.data.get("next"):
+            response = client.get(path=response.data.get("next"))
+            ids += [data.get("id") for data in response.data.get("results")]
+
+        # deve percorrer todos os atendimentos sem repetir nenhum, ignorando a ordenação da listagem
+        expected = Attendance.objects.filter(student=student).order_by("-opened_at", "-id")
+        self.assertEqual(ids, [attendance.id for attendance in expected])
+
+        # deve voltar para a página anterior
+        previous_response = client.get(path=response.data.get("previous"))
+        self.assertEqual([data.get("id") for data in previous_response.data.get("results")], ids[2:4])
+
+    def test_timeline_number_of_queries_does_not_depend_on_attendances(self):
+        client = create_account_with_permissions_and_do_authentication(
+            permissions=["core.view_student", "core.view_attendance"]
+        )
+        attendance = mock_attendance_with_relations()[0]
+        url = reverse("student-timeline", args=[attendance.student.registration])
+
+        client.get(path=url)  # carrega as permissões do usuário
+
+        queries_with_one = count_queries(client, url)
+
+        for _ in range(3):
+            other = baker.make(Attendance, student=attendance.student)
+            baker.make(AccountAttendance, attendance=other, _quantity=2)
+
+        # os atendimentos e as anotações devem ser carregados com a mesma quantidade de consultas
+        self.assertEqual(count_queries(client, url), queries_with_one)
+
+    def test_timeline_not_found_with_permission(self):
+        client = create_account_with_permissions_and_do_authentication(
+            permissions=["core.view_student", "core.view_attendance"]
+        )
+        url = reverse("student-timeline", args=[REGISTRATION])
+
+        response = client.get(path=url)
+
+        self.assertEqual(response.status_code, HTTP_404_NOT_FOUND)
+
+    def test_timeline_without_permission(self):
+        student = baker.make(Student)
+
+        client = create_account_with_permissions_and_do_authentication(permissions=["core.view_student"])
+        url = reverse("student-timeline", args=[student.registration])
+
+        response = client.get(path=url)
+
+        # não deve ter permissão para acessar sem a permissão de visualizar os atendimentos
+        self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
@@ -0,0 +1,83 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError
+from django.db.models import Q, Sum
+from django.test import TestCase
+from model_bakery import baker
+from validate_docbr import CPF
+
+from nupe.core.management.commands.generate_synthetic_data import CPF_MULTIPLIER, MAX_PERSONS_PER_SEED, generate_cpf
+from nupe.core.models import Attendance, AttendanceReason, AttendanceStatistic, Person, Student
+from nupe.resources.datas.core.person import CPF as PERSON_CPF
+
+
+class SyntheticDataTestCase(TestCase):
+    def generate(self, **options):
+        call_command("generate_synthetic_data", attendances=41, seed=1, chunk_size=3, stdout=StringIO(), **options)
+
+    def test_generate_cpf(self):
+        self.assertEqual(generate_cpf(int(PERSON_CPF[:9])), PERSON_CPF)
+
+    def test_generated_data_should_be_consistent(self):
+        self.generate()
+
+        students = Student.objects.filter(registration__startswith="901")
+        attendances = Attendance.objects.filter(student__in=students)
+
+        self.assertEqual(students.count(), 11)
+        self.assertEqual(attendances.count(), 41)
+
+        # todos os atendimentos possuem atendentes e são posteriores ao ingresso do estudante
+        self.assertFalse(attendances.filter(attendants=None).exists())
+
+        for opened_at, ingress_date in attendances.values_list("opened_at", "student__ingress_date"):
+            self.assertGreaterEqual(opened_at.date(), ingress_date)
+
+        # árvores com os filhos e netos dos motivos raízes
+        reasons = AttendanceReason.objects.filter(name__contains=" 1-")
+        self.assertEqual(reasons.filter(father_reason=None).count(), 10)
+        self.assertEqual(reasons.count(), 10 + 40 + 120)
+
+        # pessoas com cpfs válidos e documento de busca preenchido, sem signals
+        persons = Person.objects.filter(student_registration__in=students)
+        self.assertTrue(all(CPF().validate(cpf) for cpf in persons.values_list("cpf", flat=True)))
+        self.assertFalse(persons.filter(search_document="").exists())
+
+        # contadores recalculados ao final
+        self.assertEqual(
+            AttendanceStatistic.objects.aggregate(total=Sum("total"))["total"], Attendance.objects.count()
+        )
+
+    def test_default_seed_should_generate_valid_cpfs(self):
+        call_command("generate_synthetic_data", attendances=41, chunk_size=3, stdout=StringIO())
+
+        # cpfs de todas as pessoas geradas: estudantes, responsáveis e atendentes. A primeira posição da faixa da
+        # semente 0 corresponde ao número base 000000000, que deve ser pulado
+        persons = Person.objects.filter(
+            Q(student_registration__registration__startswith="900")
+            | Q(responsible__student__registration__startswith="900")
+            | Q(account__email__startswith="atendente.0.")
+        )
+        cpfs = list(persons.values_list("cpf", flat=True).distinct())
+
+        self.assertGreater(len(cpfs), 11)
+        self.assertNotIn(generate_cpf(0), cpfs)
+        self.assertTrue(all(CPF().validate(cpf) for cpf in cpfs))
+
+    def test_same_seed_should_not_be_generated_twice(self):
+        self.generate()
+
+        with self.assertRaises(CommandError):
+            self.generate()
+
+        # a transação da segunda execução é desfeita
+        self.assertEqual(Attendance.objects.filter(student__registration__startswith="901").count(), 41)
+
+    def test_other_integrity_errors_should_not_be_reported_as_existing_seed(self):
+        # pessoa cadastrada com o mesmo cpf da primeira pessoa gerada pela semente
+        baker.make(Person, cpf=generate_cpf(MAX_PERSONS_PER_SEED * CPF_MULTIPLIER % 10 ** 9))
+
+        with self.assertRaises(IntegrityError):
+            self.generate()
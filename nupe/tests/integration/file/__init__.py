@@ -1 +1,2 @@
 from nupe.tests.integration.file.image_upload import ProfileImageAPITestCase
+from nupe.tests.integration.file.media import MediaAPITestCase
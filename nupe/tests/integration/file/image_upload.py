@@ -47,6 +47,9 @@ class ProfileImageAPITestCase(APITestCase):
             self.assertIsNotNone(response.data.get("attachment_id"))
             self.assertIsNotNone(response.data.get("uploaded_at"))
 
+            # as variantes devem ser geradas somente após a resposta
+            self.assertEqual(response.data.get("status"), ProfileImage.PENDING)
+
             # campos que não devem ser retornados
             self.assertIsNone(response.data.get("image"))
 
@@ -0,0 +1,105 @@
+import os
+from shutil import rmtree
+
+from django.conf import settings
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from nupe.resources.datas.file.image_upload import PROFILE_IMAGE_PNG
+from nupe.tests.utils import mock_profile_image
+
+
+class MediaAPITestCase(APITestCase):
+    def setUp(self):
+        self.profile_image = mock_profile_image()
+
+        with open(self.profile_image.image.path, "rb") as file:
+            self.content = file.read()
+
+    def tearDown(self):
+        os.remove(PROFILE_IMAGE_PNG)
+        rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def test_retrieve_content_addressed(self):
+        response = self.client.get(path=self.profile_image.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.getvalue(), self.content)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+        # o path identificado pelo hash do conteúdo nunca muda de conteúdo
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIsNotNone(response.get("Last-Modified"))
+
+        # deve retornar 304 sem conteúdo quando o arquivo em cache está atualizado
+        for header in [
+            {"HTTP_IF_NONE_MATCH": response["ETag"]},
+            {"HTTP_IF_MODIFIED_SINCE": response["Last-Modified"]},
+        ]:
+            not_modified = self.client.get(path=self.profile_image.url, **header)
+
+            self.assertEqual(not_modified.status_code, 304)
+            self.assertEqual(not_modified.content, b"")
+            self.assertEqual(not_modified["ETag"], response["ETag"])
+
+    def test_retrieve_range(self):
+        response = self.client.get(path=self.profile_image.url, HTTP_RANGE="bytes=0-9")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.getvalue(), self.content[:10])
+        self.assertEqual(response["Content-Range"], f"bytes 0-9/{len(self.content)}")
+        self.assertEqual(response["Content-Length"], "10")
+
+        # sufixo: os últimos bytes do arquivo
+        response = self.client.get(path=self.profile_image.url, HTTP_RANGE="bytes=-5")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.getvalue(), self.content[-5:])
+
+        # deve enviar o arquivo completo quando a versão em 'If-Range' está desatualizada
+        response = self.client.get(path=self.profile_image.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"foo"')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.getvalue(), self.content)
+
+        # intervalo depois do final do arquivo
+        response = self.client.get(path=self.profile_image.url, HTTP_RANGE=f"bytes={len(self.content)}-")
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.content)}")
+
+    def test_retrieve_hidden_or_missing(self):
+        os.makedirs(os.path.join(settings.MEDIA_ROOT, ".tombstones"), exist_ok=True)
+        open(os.path.join(settings.MEDIA_ROOT, ".tombstones", "images.log"), "w").close()
+
+        # arquivos iniciados por '.' e fora do MEDIA_ROOT não devem ser entregues
+        for path in [".tombstones/images.log", "images/../.tombstones/images.log", "images/profiles/foo.png"]:
+            response = self.client.get(path=f"{settings.MEDIA_URL}{path}")
+
+            self.assertEqual(response.status_code, 404)
+
+        response = self.client.post(path=self.profile_image.url)
+
+        # somente leitura
+        self.assertEqual(response.status_code, 405)
+
+    @override_settings(MEDIA_SERVE_MODE="x-accel-redirect")
+    def test_retrieve_with_accel_redirect(self):
+        response = self.client.get(path=self.profile_image.url)
+
+        # o conteúdo deve ser enviado pelo nginx
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(
+            response["X-Accel-Redirect"], f"{settings.MEDIA_ACCEL_REDIRECT_PREFIX}{self.profile_image.image.name}"
+        )
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertIn("immutable", response["Cache-Control"])
+
+    @override_settings(MEDIA_SERVE_MODE="x-sendfile")
+    def test_retrieve_with_sendfile(self):
+        response = self.client.get(path=self.profile_image.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Sendfile"], self.profile_image.image.path)
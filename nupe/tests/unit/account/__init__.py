@@ -0,0 +1 @@
+from nupe.tests.unit.account.backends import CachedModelBackendTestCase
@@ -0,0 +1,98 @@
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from nupe.account.models import Account
+from nupe.tests.integration.account.setup.account import create_account_with_permissions
+from nupe.tests.utils import SHARED_CACHES
+
+
+@override_settings(CACHES=SHARED_CACHES)
+class CachedModelBackendTestCase(TestCase):
+    def setUp(self):
+        # as permissões em cache de outros testes não devem ser reutilizadas
+        cache.clear()
+
+        self.account = create_account_with_permissions(permissions=["core.view_student"])
+        self.permission = Permission.objects.get(content_type__app_label="core", codename="add_student")
+
+    def has_perm(self, perm: str) -> bool:
+        # cada requisição carrega um novo objeto da conta
+        return Account.objects.get(pk=self.account.pk).has_perm(perm)
+
+    def test_cached_permissions(self):
+        self.assertIs(self.has_perm("core.view_student"), True)
+
+        account = Account.objects.get(pk=self.account.pk)
+
+        # as permissões em cache não devem ser consultadas no banco de dados
+        with CaptureQueriesContext(connection) as context:
+            self.assertIs(account.has_perms(["core.view_student"]), True)
+            self.assertIs(account.has_perm("core.add_student"), False)
+
+        self.assertEqual(len(context), 0)
+
+    def test_invalidate_account_permissions(self):
+        self.assertIs(self.has_perm("core.add_student"), False)
+
+        # deve invalidar ao alterar as permissões da conta
+        self.account.user_permissions.add(self.permission)
+        self.assertIs(self.has_perm("core.add_student"), True)
+
+        self.permission.user_set.remove(self.account)
+        self.assertIs(self.has_perm("core.add_student"), False)
+
+        # deve invalidar ao alterar os grupos da conta
+        group = Group.objects.create(name="atendentes")
+        group.permissions.add(self.permission)
+        self.account.groups.add(group)
+        self.assertIs(self.has_perm("core.add_student"), True)
+
+        self.account.groups.clear()
+        self.assertIs(self.has_perm("core.add_student"), False)
+
+    def test_invalidate_demoted_superuser_permissions(self):
+        self.account.is_superuser = True
+        self.account.save()
+        self.assertIs(self.has_perm("core.delete_student"), True)
+
+        # o superusuário tem todas as permissões em cache, que não devem ser reutilizadas após o rebaixamento
+        Account.objects.get(pk=self.account.pk).get_all_permissions()
+
+        self.account.is_superuser = False
+        self.account.save()
+        self.assertIs(self.has_perm("core.delete_student"), False)
+
+    def test_permissions_key_should_depend_on_account_status(self):
+        # uma alteração de status sem o signal (ex.: 'update') não reutiliza as permissões do status anterior
+        Account.objects.filter(pk=self.account.pk).update(is_superuser=True)
+        self.assertIn("core.delete_student", Account.objects.get(pk=self.account.pk).get_all_permissions())
+
+        Account.objects.filter(pk=self.account.pk).update(is_superuser=False)
+        self.assertIs(self.has_perm("core.delete_student"), False)
+
+    def test_invalidate_group_permissions(self):
+        group = Group.objects.create(name="atendentes")
+        self.account.groups.add(group)
+        self.assertIs(self.has_perm("core.add_student"), False)
+
+        # deve invalidar as permissões de todas as contas do grupo
+        group.permissions.add(self.permission)
+        self.assertIs(self.has_perm("core.add_student"), True)
+
+        group.delete()
+        self.assertIs(self.has_perm("core.add_student"), False)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_local_cache_should_not_be_used(self):
+        self.assertIs(self.has_perm("core.view_student"), True)
+
+        account = Account.objects.get(pk=self.account.pk)
+
+        # o cache em memória não é invalidado nos outros processos, as permissões devem ser consultadas
+        with CaptureQueriesContext(connection) as context:
+            self.assertIs(account.has_perm("core.view_student"), True)
+
+        self.assertGreater(len(context), 0)
@@ -0,0 +1 @@
+from nupe.tests.unit.core.backends import PostgreSQLPoolDatabaseWrapperTestCase
@@ -0,0 +1,97 @@
+from unittest import skipIf, skipUnless
+from unittest.mock import MagicMock, patch
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import SimpleTestCase
+
+try:
+    from psycopg2 import ProgrammingError
+
+    from nupe.core.backends.postgresql_pool.base import DatabaseWrapper
+except (ImportError, ImproperlyConfigured):
+    # o backend do pool depende do psycopg2, instalado somente com o PostgreSQL
+    DatabaseWrapper = None
+
+
+class FakeConnection:
+    """
+    Conexão com o mesmo comportamento de transação do psycopg2: uma conexão nova não está em autocommit, uma
+    consulta abre uma transação e o 'set_session' não pode ser executado dentro de uma transação
+    """
+
+    closed = 0
+
+    def __init__(self):
+        self.autocommit = False
+        self.isolation_level = None
+        self.in_transaction = False
+
+    def cursor(self):
+        cursor = MagicMock()
+        cursor.__enter__.return_value.execute.side_effect = self.execute
+
+        return cursor
+
+    def execute(self, sql):
+        if not self.autocommit:
+            self.in_transaction = True
+
+    def rollback(self):
+        self.in_transaction = False
+
+    def set_session(self, isolation_level):
+        if self.in_transaction:
+            raise ProgrammingError("set_session cannot be used inside a transaction")
+
+        self.isolation_level = isolation_level
+
+
+@skipIf(DatabaseWrapper is None, "o backend do pool depende do psycopg2")
+class PostgreSQLPoolDatabaseWrapperTestCase(SimpleTestCase):
+    def get_database_wrapper(self, settings_dict: dict = None):
+        return DatabaseWrapper(
+            {
+                "ENGINE": "nupe.core.backends.postgresql_pool",
+                "NAME": "nupe",
+                "USER": "",
+                "PASSWORD": "",
+                "HOST": "",
+                "PORT": "",
+                "OPTIONS": {},
+                "AUTOCOMMIT": True,
+                "CONN_MAX_AGE": 0,
+                "CONN_HEALTH_CHECKS": True,
+                "POOL_SIZE": 2,
+                "TIME_ZONE": None,
+                "TEST": {},
+                **(settings_dict or {}),
+            }
+        )
+
+    def test_health_check_should_not_leave_transaction_open(self):
+        fake_connection = FakeConnection()
+        pool = MagicMock(**{"getconn.return_value": fake_connection})
+        wrapper = self.get_database_wrapper({"OPTIONS": {"isolation_level": 1}})
+
+        with patch("nupe.core.backends.postgresql_pool.base.get_pool", return_value=pool):
+            self.assertIs(wrapper.get_new_connection({}), fake_connection)
+
+        # a verificação é desfeita, então o nível de isolamento pode ser alterado
+        self.assertIs(fake_connection.in_transaction, False)
+        self.assertEqual(fake_connection.isolation_level, 1)
+        pool.putconn.assert_not_called()
+
+    @skipUnless(connection.vendor == "postgresql", "depende de um banco de dados PostgreSQL")
+    def test_pooled_connection_with_health_checks(self):
+        wrapper = self.get_database_wrapper({**connection.settings_dict, "POOL_SIZE": 1, "CONN_HEALTH_CHECKS": True})
+
+        # a segunda conexão é a mesma conexão do pool, verificada antes do uso
+        for _ in range(2):
+            wrapper.ensure_connection()
+
+            with wrapper.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                self.assertEqual(cursor.fetchone(), (1,))
+
+            wrapper.close()
@@ -1,4 +1,8 @@
-from nupe.tests.unit.core.models.attendance import AccountAttendanceTestCase, AttendanceTestCase
+from nupe.tests.unit.core.models.attendance import (
+    AccountAttendanceTestCase,
+    AttendanceStatisticTestCase,
+    AttendanceTestCase,
+)
 from nupe.tests.unit.core.models.course import (
     AcademicEducationCampusTestCase,
     AcademicEducationTestCase,
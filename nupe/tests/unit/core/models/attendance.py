@@ -1,7 +1,20 @@
+from unittest import skipUnless
+
+from django.db import IntegrityError, connection
+from django.db.models import Sum
 from django.test import TestCase
 from model_bakery import baker
+from safedelete.models import HARD_DELETE
 
-from nupe.core.models import AccountAttendance, Attendance
+from nupe.core.models import (
+    AcademicEducationCampus,
+    AccountAttendance,
+    Attendance,
+    AttendanceReason,
+    AttendanceStatistic,
+    Student,
+)
+from nupe.tests.utils import explain_query_plan
 
 
 class AttendanceTestCase(TestCase):
@@ -26,6 +39,25 @@ class AttendanceTestCase(TestCase):
         """
         self.assertEqual(str(attendance), str_expected)
 
+    @skipUnless(connection.vendor == "sqlite", "o plano de consulta depende do banco de dados")
+    def test_filter_by_student_should_use_index(self):
+        self.assertNotIn("SCAN", explain_query_plan(Attendance.objects.filter(student=1)))
+
+        # o safedelete percorre as relações sem o filtro 'deleted', pelo índice completo da chave estrangeira,
+        # já que os objetos mascarados não estão no índice parcial
+        query_plan = explain_query_plan(Attendance.all_objects.filter(student=1))
+        self.assertNotIn("core_attendance_st_op_live_idx", query_plan)
+        self.assertIn("core_attendance_student_id", query_plan)
+
+    @skipUnless(connection.vendor == "sqlite", "o plano de consulta depende do banco de dados")
+    def test_student_timeline_should_be_ordered_by_partial_index(self):
+        queryset = Attendance.objects.filter(student=1).order_by("-opened_at", "-id")
+        query_plan = explain_query_plan(queryset)
+
+        # a ordenação da linha do tempo é percorrida pelo índice, sem ordenar os atendimentos do estudante
+        self.assertIn("core_attendance_st_op_live_idx", query_plan)
+        self.assertNotIn("TEMP B-TREE", query_plan)
+
 
 class AccountAttendanceTestCase(TestCase):
     def test_has_all_attributes(self):
@@ -45,3 +77,163 @@ class AccountAttendanceTestCase(TestCase):
             f"Atendente: {account_attendance.account.full_name}, Anotação: {account_attendance.public_annotation}"
         )
         self.assertEqual(str(account_attendance), str_expected)
+
+
+class AttendanceStatisticTestCase(TestCase):
+    def setUp(self):
+        self.student = baker.make(Student, academic_education_campus=baker.make(AcademicEducationCampus))
+        self.attendance_reason = baker.make(AttendanceReason)
+
+    def make_attendance(self, **kwargs) -> Attendance:
+        return baker.make(Attendance, student=self.student, attendance_reason=self.attendance_reason, **kwargs)
+
+    def get_totals(self) -> dict:
+        return {
+            (statistic.attendance_severity, statistic.status): statistic.total
+            for statistic in AttendanceStatistic.objects.filter(total__gt=0)
+        }
+
+    def get_campus_totals(self) -> dict:
+        statistics = AttendanceStatistic.objects.filter(total__gt=0).order_by().values("campus_id")
+
+        return {
+            statistic["campus_id"]: statistic["sum_total"] for statistic in statistics.annotate(sum_total=Sum("total"))
+        }
+
+    def test_has_all_attributes(self):
+        self.assertIs(hasattr(AttendanceStatistic, "month"), True)
+        self.assertIs(hasattr(AttendanceStatistic, "campus"), True)
+        self.assertIs(hasattr(AttendanceStatistic, "attendance_reason"), True)
+        self.assertIs(hasattr(AttendanceStatistic, "attendance_severity"), True)
+        self.assertIs(hasattr(AttendanceStatistic, "status"), True)
+        self.assertIs(hasattr(AttendanceStatistic, "total"), True)
+
+    # custom signals
+    def test_signals_create_should_increment(self):
+        attendance = self.make_attendance(attendance_severity=Attendance.LOW)
+        self.make_attendance(attendance_severity=Attendance.LOW)
+
+        statistic = AttendanceStatistic.objects.get()
+
+        # deve contabilizar os dois atendimentos no mesmo agrupamento
+        self.assertEqual(statistic.total, 2)
+        self.assertEqual(statistic.month, attendance.opened_at.date().replace(day=1))
+        self.assertEqual(statistic.campus_id, self.student.academic_education_campus.campus_id)
+        self.assertEqual(statistic.attendance_reason_id, self.attendance_reason.id)
+        self.assertEqual(statistic.status, Attendance.OPEN)
+
+    def test_signals_update_should_move_between_groups(self):
+        attendance = self.make_attendance(attendance_severity=Attendance.LOW, status=Attendance.OPEN)
+
+        attendance.status = Attendance.CLOSED
+        attendance.save()
+
+        # deve descontar do agrupamento anterior e contabilizar no novo
+        self.assertEqual(self.get_totals(), {(Attendance.LOW, Attendance.CLOSED): 1})
+
+        # salvar sem alterar os campos agrupados não deve alterar os contadores
+        attendance.save()
+
+        self.assertEqual(self.get_totals(), {(Attendance.LOW, Attendance.CLOSED): 1})
+
+    def test_signals_delete_and_undelete(self):
+        attendance = self.make_attendance(attendance_severity=Attendance.HIGH, status=Attendance.OPEN)
+
+        attendance.delete()
+
+        # atendimentos mascarados não devem ser contabilizados
+        self.assertEqual(self.get_totals(), {})
+
+        attendance.undelete()
+
+        self.assertEqual(self.get_totals(), {(Attendance.HIGH, Attendance.OPEN): 1})
+
+        attendance.delete(force_policy=HARD_DELETE)
+
+        self.assertEqual(self.get_totals(), {})
+
+    def test_signals_delete_student_should_cascade(self):
+        self.make_attendance(attendance_severity=Attendance.HIGH, status=Attendance.OPEN)
+
+        # o atendimento é mascarado em cascata pelo safedelete
+        self.student.delete()
+
+        self.assertEqual(self.get_totals(), {})
+
+    def test_rebuild(self):
+        self.make_attendance(attendance_severity=Attendance.LOW, status=Attendance.OPEN, _quantity=2)
+        self.make_attendance(attendance_severity=Attendance.SERIOUS, status=Attendance.CLOSED)
+        self.make_attendance(attendance_severity=Attendance.MEDIUM).delete()
+
+        # alterações que não disparam signals
+        Attendance.objects.update(status=Attendance.ON_HOLD)
+
+        self.assertEqual(
+            self.get_totals(), {(Attendance.LOW, Attendance.OPEN): 2, (Attendance.SERIOUS, Attendance.CLOSED): 1}
+        )
+
+        AttendanceStatistic.objects.rebuild()
+
+        # deve recalcular a partir dos atendimentos não mascarados
+        self.assertEqual(
+            self.get_totals(), {(Attendance.LOW, Attendance.ON_HOLD): 2, (Attendance.SERIOUS, Attendance.ON_HOLD): 1}
+        )
+
+    def test_signals_change_student_campus_should_move_statistics(self):
+        self.make_attendance(_quantity=2)
+        campus_id = self.student.academic_education_campus.campus_id
+
+        self.student.academic_education_campus = baker.make(AcademicEducationCampus)
+        self.student.save()
+
+        # os atendimentos devem ser contabilizados somente no campus atual do estudante
+        self.assertEqual(self.get_campus_totals(), {self.student.academic_education_campus.campus_id: 2})
+        self.assertIs(AttendanceStatistic.objects.filter(campus=campus_id).exclude(total=0).exists(), False)
+
+        self.student.academic_education_campus = None
+        self.student.save()
+
+        self.assertEqual(self.get_campus_totals(), {None: 2})
+
+    def test_signals_change_academic_education_campus_should_move_statistics(self):
+        self.make_attendance()
+        academic_education_campus = self.student.academic_education_campus
+
+        academic_education_campus.campus = baker.make("core.Campus")
+        academic_education_campus.save()
+
+        self.assertEqual(self.get_campus_totals(), {academic_education_campus.campus_id: 1})
+
+    def test_signals_delete_academic_education_campus_should_move_statistics(self):
+        self.make_attendance()
+        academic_education_campus = self.student.academic_education_campus
+
+        # os estudantes são atualizados em lote, sem disparar os signals da model Student
+        academic_education_campus.delete()
+
+        self.assertEqual(self.get_campus_totals(), {None: 1})
+
+        academic_education_campus.undelete()
+
+        self.assertEqual(self.get_campus_totals(), {academic_education_campus.campus_id: 1})
+
+        academic_education_campus.delete(force_policy=HARD_DELETE)
+
+        self.assertEqual(self.get_campus_totals(), {None: 1})
+
+    def test_null_campus_should_be_unique(self):
+        self.student.academic_education_campus = None
+        self.student.save()
+        attendance = self.make_attendance()
+
+        statistic = AttendanceStatistic.objects.get()
+
+        # 'unique_together' não impede valores nulos, a restrição condicional impede agrupamentos duplicados
+        with self.assertRaises(IntegrityError):
+            AttendanceStatistic.objects.create(
+                month=statistic.month,
+                campus=None,
+                attendance_reason=attendance.attendance_reason,
+                attendance_severity=statistic.attendance_severity,
+                status=statistic.status,
+            )
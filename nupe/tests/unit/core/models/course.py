@@ -1,5 +1,8 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from model_bakery import baker
+from safedelete.models import HARD_DELETE
 
 from nupe.core.models import AcademicEducation, AcademicEducationCampus, Grade, Student
 
@@ -79,3 +82,37 @@ class AcademicEducationCampusTestCase(TestCase):
 
         student = Student.objects.get(pk=student.id)
         self.assertIsNone(student.academic_education_campus)
+
+    def test_signals_should_not_depend_on_students_quantity(self):
+        query_counts = []
+
+        for quantity in [1, 30]:
+            academic_education_campus = baker.make(AcademicEducationCampus)
+            baker.make(Student, academic_education_campus=academic_education_campus, _quantity=quantity)
+
+            with CaptureQueriesContext(connection) as delete_context:
+                academic_education_campus.delete()
+
+            with CaptureQueriesContext(connection) as undelete_context:
+                academic_education_campus.undelete()
+
+            query_counts.append((len(delete_context.captured_queries), len(undelete_context.captured_queries)))
+
+            # todos os estudantes devem ser restaurados
+            self.assertEqual(academic_education_campus.students.count(), quantity)
+
+        # a quantidade de consultas não deve depender da quantidade de estudantes
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    def test_signals_hard_delete_should_set_related_as_none(self):
+        academic_education_campus = baker.make(AcademicEducationCampus)
+        student = baker.make(Student, academic_education_campus=academic_education_campus)
+        deleted_student = baker.make(Student, academic_education_campus=academic_education_campus)
+        deleted_student.delete()
+
+        academic_education_campus.delete(force_policy=HARD_DELETE)
+
+        # todos os estudantes, inclusive os mascarados, devem perder a relação
+        for student in Student.all_objects.filter(pk__in=[student.id, deleted_student.id]):
+            self.assertIsNone(student.academic_education_campus)
+            self.assertIsNone(student._academic_education_campus_deleted_id)
@@ -1,3 +1,6 @@
+from unittest import skipUnless
+
+from django.db import connection
 from django.test import TestCase
 from model_bakery import baker
 
@@ -17,6 +20,7 @@ class PersonTestCase(TestCase):
         self.assertIs(hasattr(Person, "profile_image"), True)
         self.assertIs(hasattr(Person, "created_at"), True)
         self.assertIs(hasattr(Person, "updated_at"), True)
+        self.assertIs(hasattr(Person, "search_document"), True)
         self.assertIs(hasattr(Person, "student_registrations"), True)
         self.assertIs(hasattr(Person, "dependents"), True)
         self.assertIs(hasattr(Person, "responsibles"), True)
@@ -37,3 +41,22 @@ class PersonTestCase(TestCase):
 
         age_expected = calculate_age(birthday_date=person.birthday_date)
         self.assertEqual(person.age, age_expected)
+
+    # custom signals
+    def test_signals_pre_save_should_build_search_document(self):
+        person = baker.make(Person, first_name="João Pedro", last_name="D'Ávila", cpf="123.456.789-09")
+
+        self.assertEqual(person.search_document, "joao pedro davila 12345678909")
+
+        person.last_name = "Conceição"
+        person.save()
+
+        # deve manter o documento atualizado
+        self.assertEqual(Person.objects.get(pk=person.pk).search_document, "joao pedro conceicao 12345678909")
+
+    @skipUnless(connection.vendor == "sqlite", "o plano de consulta depende do banco de dados")
+    def test_iexact_should_use_case_insensitive_index(self):
+        plan = Person.objects.filter(first_name__iexact="luis").explain()
+
+        # o filtro 'iexact' deve utilizar o índice criado pela migration ao invés de percorrer a tabela
+        self.assertIn("core_person_first_name_upper_idx", plan)
@@ -1,7 +1,11 @@
+from unittest import skipUnless
+
+from django.db import connection
 from django.test import TestCase
 from model_bakery import baker
 
 from nupe.core.models import Responsible, Student
+from nupe.tests.utils import explain_query_plan
 
 
 class StudentTestCase(TestCase):
@@ -33,6 +37,15 @@ class StudentTestCase(TestCase):
         self.assertEqual(student.age, student.person.age)
         self.assertEqual(student.academic_education, str(student.academic_education_campus.academic_education))
 
+    @skipUnless(connection.vendor == "sqlite", "o plano de consulta depende do banco de dados")
+    def test_filter_by_academic_education_campus_should_use_index(self):
+        # os signals da model AcademicEducationCampus atualizam os estudantes sem o filtro 'deleted', pelo índice
+        # completo da chave estrangeira
+        query_plan = explain_query_plan(Student.all_objects.filter(academic_education_campus=1))
+
+        self.assertNotIn("SCAN", query_plan)
+        self.assertIn("core_student_academic_education_campus_id", query_plan)
+
 
 class ResponsibleTestCase(TestCase):
     def test_has_all_attributes(self):
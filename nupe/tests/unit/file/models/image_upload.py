@@ -1,12 +1,30 @@
 import os
+from io import BytesIO
 from shutil import rmtree
+from time import time
+from unittest import skipUnless
+from unittest.mock import patch
 
 from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+from PIL import Image as PillowImage
 
-from nupe.file.models.image_upload import ProfileImage
+from nupe.file.management.commands.collect_orphan_images import Command
+from nupe.file.models.image_upload import ImageBlob, ProfileImage
+from nupe.file.utils.processing import IMAGE_FORMATS, IMAGE_VARIANTS, get_variant_name, process_image
 from nupe.resources.datas.file.image_upload import PROFILE_IMAGE_JPEG, PROFILE_IMAGE_PNG
-from nupe.tests.utils import mock_profile_image
+from nupe.tests.utils import collect_orphan_images, mock_profile_image
+
+# identificador da orientação no EXIF
+ORIENTATION_TAG = 0x0112
+
+# identificador das informações de localização no EXIF
+GPS_INFO_TAG = 0x8825
 
 
 class ProfileImageTestCase(TestCase):
@@ -49,6 +67,11 @@ class ProfileImageTestCase(TestCase):
 
         mocked_image.delete()
 
+        # a remoção do arquivo deve ser adiada para a coleta dos arquivos sem referência
+        self.assertIs(os.path.exists(mocked_image.image.path), True)
+
+        collect_orphan_images()
+
         # Deve ser removida do diretório
         self.assertIs(os.path.exists(mocked_image.image.path), False)
 
@@ -58,8 +81,202 @@ class ProfileImageTestCase(TestCase):
         self.assertIs(os.path.exists(mocked_images[0].image.path), True)
         self.assertIs(os.path.exists(mocked_images[1].image.path), True)
 
-        ProfileImage.objects.all().delete()
+        # os objetos devem ser removidos em uma única consulta, sem carregar cada objeto
+        with CaptureQueriesContext(connection) as context:
+            ProfileImage.objects.all().delete()
+
+        self.assertIs(ProfileImage.objects.exists(), False)
+        self.assertEqual(len([query for query in context.captured_queries if "DELETE" in query["sql"]]), 2)
+        self.assertIs(
+            any('SELECT "file_profileimage"."id",' in query["sql"] for query in context.captured_queries), False
+        )
+
+        collect_orphan_images()
 
         # Devem ser removidas do diretório
         self.assertIs(os.path.exists(mocked_images[0].image.path), False)
         self.assertIs(os.path.exists(mocked_images[1].image.path), False)
+
+    def test_process_image_should_create_variants_without_exif(self):
+        exif = PillowImage.Exif()
+        exif[ORIENTATION_TAG] = 6  # rotacionada em 90 graus
+        buffer = BytesIO()
+        PillowImage.new("RGB", (1200, 800), color="blue").save(buffer, format="JPEG", exif=exif.tobytes())
+
+        profile_image = baker.make(
+            ProfileImage,
+            image=SimpleUploadedFile(name="exif.jpeg", content=buffer.getvalue(), content_type="image/jpeg"),
+        )
+
+        # as variantes não devem existir antes do processamento
+        self.assertEqual(profile_image.status, ProfileImage.PENDING)
+        self.assertIsNone(profile_image.variants)
+
+        process_image(profile_image)
+
+        profile_image = ProfileImage.objects.get(pk=profile_image.pk)
+        self.assertEqual(profile_image.status, ProfileImage.PROCESSED)
+        self.assertEqual(set(profile_image.variants), set(IMAGE_VARIANTS))
+
+        for variant, size in IMAGE_VARIANTS.items():
+            for extension in IMAGE_FORMATS:
+                name = get_variant_name(profile_image.image.name, variant, extension)
+                self.assertEqual(profile_image.variants[variant][extension], profile_image.image.storage.url(name))
+
+                with PillowImage.open(profile_image.image.storage.path(name)) as variant_image:
+                    # deve aplicar a orientação, reduzir a imagem e remover o EXIF
+                    self.assertEqual(variant_image.size, (size * 2 // 3, size))
+                    self.assertEqual(len(variant_image.getexif()), 0)
+
+        # deve remover as variantes junto com a imagem
+        variant_path = profile_image.image.storage.path(
+            get_variant_name(profile_image.image.name, "thumbnail", "webp")
+        )
+        profile_image.delete()
+        collect_orphan_images()
+
+        self.assertIs(os.path.exists(variant_path), False)
+
+    def test_should_strip_metadata_from_original(self):
+        exif = PillowImage.Exif()
+        exif[ORIENTATION_TAG] = 6  # rotacionada em 90 graus
+        exif[GPS_INFO_TAG] = {2: (26.0, 19.0, 0.0)}  # latitude
+        buffer = BytesIO()
+        PillowImage.new("RGB", (120, 80), color="blue").save(
+            buffer, format="JPEG", exif=exif.tobytes(), comment=b"foo bar"
+        )
+
+        profile_image = baker.make(
+            ProfileImage,
+            image=SimpleUploadedFile(name="exif.jpeg", content=buffer.getvalue(), content_type="image/jpeg"),
+        )
+
+        # a imagem original também é pública, não deve manter a localização nem os comentários
+        with PillowImage.open(profile_image.image.path) as original:
+            self.assertEqual(original.format, "JPEG")
+            self.assertEqual(original.size, (80, 120))
+            self.assertEqual(len(original.getexif()), 0)
+            self.assertIsNone(original.info.get("comment"))
+
+        # o mesmo conteúdo deve continuar compartilhando o arquivo
+        other = baker.make(
+            ProfileImage,
+            image=SimpleUploadedFile(name="exif.jpeg", content=buffer.getvalue(), content_type="image/jpeg"),
+        )
+
+        self.assertEqual(other.image.name, profile_image.image.name)
+
+    def test_process_invalid_image_should_fail(self):
+        mocked_image = baker.make(
+            ProfileImage, image=SimpleUploadedFile(name="invalid.png", content=b"foo bar", content_type="image/png"),
+        )
+
+        with self.assertLogs("nupe.file.utils.processing", level="ERROR"):
+            process_image(mocked_image)
+
+        # deve manter somente a imagem original
+        self.assertEqual(ProfileImage.objects.get(pk=mocked_image.pk).status, ProfileImage.FAILED)
+        self.assertIsNone(mocked_image.variants)
+
+    def test_same_content_should_share_file(self):
+        mocked_images = mock_profile_image(quantity=2)
+        path = mocked_images[0].image.path
+
+        # imagens com o mesmo conteúdo devem utilizar o mesmo arquivo
+        self.assertEqual(mocked_images[0].image.name, mocked_images[1].image.name)
+        self.assertEqual(ImageBlob.objects.get(name=mocked_images[0].image.name).references, 2)
+
+        # o arquivo deve ser mantido enquanto alguma imagem o utilizar
+        mocked_images[0].delete()
+
+        self.assertIs(os.path.exists(path), True)
+        self.assertEqual(ImageBlob.objects.get(name=mocked_images[1].image.name).references, 1)
+
+        mocked_images[1].delete()
+        collect_orphan_images()
+
+        self.assertIs(os.path.exists(path), False)
+        self.assertIs(ImageBlob.objects.exists(), False)
+
+    def test_upload_same_content_again_should_keep_references(self):
+        mocked_image = mock_profile_image()
+        name = mocked_image.image.name
+
+        # o mesmo conteúdo enviado novamente para a mesma imagem não deve adicionar uma referência
+        with open(PROFILE_IMAGE_PNG, "rb") as file:
+            mocked_image.image = SimpleUploadedFile(
+                name=PROFILE_IMAGE_PNG, content=file.read(), content_type="image/png"
+            )
+
+        mocked_image.save()
+
+        self.assertEqual(mocked_image.image.name, name)
+        self.assertEqual(ImageBlob.objects.get(name=name).references, 1)
+
+        mocked_image.delete()
+
+        self.assertIs(ImageBlob.objects.exists(), False)
+
+    @skipUnless(connection.features.has_select_for_update, "depende do bloqueio de registros do banco de dados")
+    def test_store_and_release_should_lock_blob(self):
+        mocked_image = mock_profile_image()
+
+        # uma remoção concorrente não deve remover o registro entre a consulta e o incremento das referências
+        with CaptureQueriesContext(connection) as context:
+            with open(PROFILE_IMAGE_PNG, "rb") as file:
+                ImageBlob.objects.store(ContentFile(file.read()), mocked_image.image.name)
+
+            ImageBlob.objects.release([mocked_image.image.name])
+
+        locks = [query for query in context if "FOR UPDATE" in query["sql"] and '"file_imageblob"' in query["sql"]]
+        self.assertEqual(len(locks), 2)
+
+    def test_collect_orphan_images_should_keep_referenced_and_recent_files(self):
+        mocked_image = mock_profile_image()
+        storage = mocked_image.image.storage
+        orphan = storage.save("images/profiles/orphan.png", ContentFile(b"foo"))
+        orphan_variant = storage.save("images/profiles/orphan_thumbnail.webp", ContentFile(b"foo"))
+
+        # os arquivos recentes podem pertencer a um upload em andamento
+        collect_orphan_images(min_age=3600)
+
+        self.assertIs(storage.exists(orphan), True)
+
+        collect_orphan_images()
+
+        # somente os arquivos sem referência devem ser removidos
+        self.assertIs(storage.exists(orphan), False)
+        self.assertIs(storage.exists(orphan_variant), False)
+        self.assertIs(storage.exists(mocked_image.image.name), True)
+
+    def test_collect_orphan_images_should_keep_tombstoned_files_uploaded_again(self):
+        mocked_image = mock_profile_image()
+        path = mocked_image.image.path
+        mocked_image.delete()
+
+        # o mesmo conteúdo enviado novamente atualiza a data de modificação, antes de salvar a referência
+        os.utime(path, (time() + 60, time() + 60))
+        collect_orphan_images()
+
+        self.assertIs(os.path.exists(path), True)
+
+        # o registro deve voltar para o log e ser coletado na próxima execução
+        os.utime(path, (time() - 60, time() - 60))
+        collect_orphan_images()
+
+        self.assertIs(os.path.exists(path), False)
+
+    def test_collect_orphan_images_should_recheck_references_before_remove(self):
+        mocked_image = mock_profile_image()
+        name, path = mocked_image.image.name, mocked_image.image.path
+        mocked_image.delete()
+
+        def upload_during_collect(*args):
+            # upload do mesmo conteúdo concluído depois da consulta do bloco
+            ImageBlob.objects.create(digest="foo", name=name, size=1, references=1)
+            return False
+
+        with patch.object(Command, "is_recent", side_effect=upload_during_collect):
+            collect_orphan_images()
+
+        self.assertIs(os.path.exists(path), True)
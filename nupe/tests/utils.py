@@ -1,12 +1,26 @@
 import os
+from io import StringIO
+from tempfile import gettempdir
 
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from model_bakery import baker
 from PIL import Image
 
+from nupe.core.models import AccountAttendance, Attendance, Responsible
 from nupe.file.models import ProfileImage
 from nupe.resources.datas.file.image_upload import PROFILE_IMAGE_INVALID, PROFILE_IMAGE_PNG
 
+# cache em arquivos, compartilhado entre os processos como um cache externo, utilizado com o override_settings
+SHARED_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(gettempdir(), "nupe-tests-cache"),
+    }
+}
+
 
 def mock_profile_image(filename: str = PROFILE_IMAGE_PNG, quantity: int = 1) -> ProfileImage:
     """
@@ -32,6 +46,13 @@ def mock_profile_image(filename: str = PROFILE_IMAGE_PNG, quantity: int = 1) ->
     return profile_images
 
 
+def collect_orphan_images(min_age: float = 0):
+    """
+    Executa o comando collect_orphan_images, que remove os arquivos das imagens removidas
+    """
+    call_command("collect_orphan_images", min_age=min_age, stdout=StringIO())
+
+
 def create_image(filename: str = PROFILE_IMAGE_PNG) -> str:
     """
     Cria uma imagem qualquer
@@ -53,3 +74,60 @@ def create_invalid_image():
     if not os.path.exists(PROFILE_IMAGE_INVALID):
         with open(PROFILE_IMAGE_INVALID, "w") as invalid_image:
             invalid_image.write("foo bar")
+
+
+def mock_attendance_with_relations(quantity: int = 1) -> list:
+    """
+    Cria um ou mais atendimentos com todas as relações percorridas pelos serializers preenchidas
+
+    Retorna:
+        [Attendance]: objetos da model
+    """
+    attendances = []
+
+    for _ in range(quantity):
+        student = baker.make(
+            "core.Student",
+            person=baker.make("core.Person", profile_image=None),
+            academic_education_campus=baker.make("core.AcademicEducationCampus"),
+        )
+        baker.make(Responsible, student=student)
+
+        attendance = baker.make(Attendance, student=student)
+        baker.make(
+            AccountAttendance, attendance=attendance, account=baker.make("account.Account", _fill_optional=True)
+        )
+
+        attendances.append(attendance)
+
+    return attendances
+
+
+def count_queries(client, path: str) -> int:
+    """
+    Faz uma requisição GET e conta quantas consultas foram feitas no banco de dados
+
+    Retorna:
+        int: quantidade de consultas
+    """
+    with CaptureQueriesContext(connection) as context:
+        client.get(path=path)
+
+    return len(context.captured_queries)
+
+
+def explain_query_plan(queryset) -> str:
+    """
+    Executa a queryset e retorna o plano de consulta do SQLite da consulta executada, incluindo os filtros
+    adicionados pelo safedelete na execução
+
+    Retorna:
+        str: plano de consulta
+    """
+    with CaptureQueriesContext(connection) as context:
+        list(queryset)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {context.captured_queries[-1]['sql']}")
+
+        return " ".join(str(row[-1]) for row in cursor.fetchall())
@@ -1,7 +1,9 @@
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework.permissions import AllowAny
@@ -10,9 +12,7 @@ from nupe.account.router import router as account_router
 from nupe.core.router import router as core_router
 from nupe.core.views import custom_handler_404
 from nupe.file.router import router as file_router
-
-from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
-
+from nupe.file.views import serve_media
 
 # quando DEBUG = False, retorna um json ao invés de renderizar um template
 handler404 = custom_handler_404
@@ -32,7 +32,9 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     # RF.SIS.001, RF.SIS.002
     path("oauth/", include("oauth2_provider.urls", namespace="oauth2_provider")),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    # fotos de perfil e as suas variantes, também em produção (MEDIA_SERVE_MODE)
+    re_path(r"^{}(?P<path>.*)$".format(re.escape(settings.MEDIA_URL.lstrip("/"))), serve_media, name="media"),
+]
 
 
 # informações a serem exibidas no template do swagger